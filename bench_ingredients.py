@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Ingredient Dictionary Benchmark
+Compares the compiled, memoized alias and emoji matchers with the old substring loops
+
+Usage: python3 bench_ingredients.py [--count 5000] [--rounds 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import ingredients
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PREFIXES = ['', 'fresh ', 'diced ', 'organic ', 'low fat ', 'chopped ', 'frozen ', 'shredded ']
+SUFFIXES = ['', ' (boneless, skinless)', ' fillets', ' 500g', ' to taste', ' finely sliced']
+
+
+def legacy_get_emoji(ingredient_name):
+    """The original first-key-wins scan over EMOJI_MAP"""
+    name_lower = ingredient_name.lower()
+
+    for key, emoji in ingredients.EMOJI_MAP.items():
+        if key in name_lower:
+            return emoji
+
+    return '🛒'
+
+
+def legacy_normalize(name):
+    """The original exact-then-first-contained scan over INGREDIENT_ALIASES"""
+    lower_name = name.lower().strip()
+    if lower_name in ingredients.INGREDIENT_ALIASES:
+        return ingredients.INGREDIENT_ALIASES[lower_name]
+    for alias, standard in ingredients.INGREDIENT_ALIASES.items():
+        if alias in lower_name:
+            return standard
+    return re.sub(r'\b\w', lambda m: m.group().upper(), name)
+
+
+def ingredient_names(count):
+    """Realistic ingredient names: recipe ingredients, aliases and emoji keys with modifiers"""
+    with open(os.path.join(BASE_DIR, 'data', 'recipes.json'), 'r') as f:
+        recipe_names = {ing['name'] for recipe in json.load(f) for ing in recipe.get('ingredients', [])}
+
+    base = (sorted(recipe_names) + sorted(ingredients.INGREDIENT_ALIASES) + sorted(ingredients.EMOJI_MAP)
+            + ['tinned lychees', 'xanthan gum', 'nori sheets'])
+    rng = random.Random(42)
+    return [
+        f"{rng.choice(PREFIXES)}{rng.choice(base)}{rng.choice(SUFFIXES)}".title()
+        for _ in range(count)
+    ]
+
+
+def time_calls(func, names, rounds):
+    """Best wall time over rounds for looking up every name once"""
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for name in names:
+            func(name)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def clear_caches():
+    ingredients.normalize_ingredient_name.cache_clear()
+    ingredients.ALIAS_MATCHER.longest.cache_clear()
+    ingredients.EMOJI_MATCHER.longest.cache_clear()
+
+
+def emoji_regressions():
+    """
+    Dictionary keys whose emoji differs from the longest-match lookup on the name as written
+
+    That lookup was get_emoji before the alias table was shared; matching
+    on canonical names must not change any emoji it already found.
+    """
+    regressions = []
+    for key in sorted(set(ingredients.EMOJI_MAP) | set(ingredients.INGREDIENT_ALIASES)):
+        old = ingredients.EMOJI_MATCHER.match(key.lower())
+        new = ingredients.ingredient_emoji(key)
+        if old and old != new:
+            regressions.append((key, old, new))
+    return regressions
+
+
+def uncached(func):
+    def call(name):
+        clear_caches()
+        return func(name)
+    return call
+
+
+def report(title, legacy, compiled, names, rounds):
+    timings = (
+        ("legacy loop", time_calls(legacy, names, rounds)),
+        ("compiled, no cache", time_calls(uncached(compiled), names, rounds)),
+    )
+    clear_caches()
+    timings += (("compiled + LRU", time_calls(compiled, names, rounds)),)
+
+    print(title)
+    for label, elapsed in timings:
+        print(f"  {label:<20} {elapsed * 1000:8.2f}ms  {elapsed / len(names) * 1e6:7.2f}µs/lookup")
+
+    changed = sorted({(name.lower(), legacy(name), compiled(name)) for name in names if legacy(name) != compiled(name)})
+    print(f"  {len(changed)} names now match a longer key, e.g.:")
+    for name, old, new in changed[:8]:
+        print(f"    {name:<40} {old} -> {new}")
+    print()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--count', type=int, default=5000, help='number of ingredient names')
+    parser.add_argument('--rounds', type=int, default=5, help='timing rounds (best is reported)')
+    args = parser.parse_args()
+
+    names = ingredient_names(args.count)
+    unique = len(set(name.lower() for name in names))
+    print(f"{len(names)} lookups ({unique} distinct names)\n")
+
+    report("Canonical names", legacy_normalize, ingredients.normalize_ingredient_name, names, args.rounds)
+    report("Emoji", legacy_get_emoji, ingredients.ingredient_emoji, names, args.rounds)
+
+    regressions = emoji_regressions()
+    print(f"{len(regressions)} dictionary keys get a different emoji than before")
+    for key, old, new in regressions:
+        print(f"  {key:<40} {old} -> {new}")
+    if regressions:
+        sys.exit(1)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Meal Plan Generator Benchmark
+Plans a week from synthetic recipe libraries and compares it with the old shuffle-and-deal plan
+
+Usage: python3 bench_planner.py [--sizes 50,1000,10000] [--rounds 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from planner import DEFAULT_TARGETS, MEAL_TYPES, RecipeFeatures, meal_ingredients
+
+PANTRY = ['chicken breast', 'chicken thighs', 'beef mince', 'steak', 'bacon', 'eggs', 'rice', 'pasta', 'noodles',
+          'potatoes', 'sweet potato', 'wraps', 'burger buns', 'cheddar', 'mozzarella', 'cottage cheese', 'greek yogurt',
+          'red onion', 'garlic', 'bell peppers', 'spinach', 'broccoli', 'carrots', 'cucumber', 'tomatoes', 'lettuce',
+          'soy sauce', 'sweet chilli sauce', 'honey', 'oats', 'protein powder', 'peanut butter', 'banana', 'berries',
+          'chocolate', 'olive oil', 'paprika', 'cumin', 'lime', 'avocado']
+
+
+def make_recipes(count):
+    """Synthetic recipes: meals of 300-800 calories and some snacks, 5-10 ingredients each"""
+    rng = random.Random(42)
+    vocabulary = PANTRY + [f"ingredient {i}" for i in range(count // 5)]
+    recipes = []
+    for i in range(1, count + 1):
+        snack = rng.random() < 0.15
+        calories = rng.randint(120, 300) if snack else rng.randint(300, 800)
+        recipes.append({
+            "id": i,
+            "name": f"Recipe {i}",
+            "calories": calories,
+            "protein": round(calories * rng.uniform(0.02, 0.1)),
+            "carbs": rng.randint(10, 80),
+            "fat": rng.randint(5, 40),
+            "tags": ['snack'] if snack else ['high protein'],
+            "ingredients": [{"name": name.title(), "amount": 100, "unit": "g", "perServing": True}
+                            for name in rng.sample(vocabulary, rng.randint(5, 10))]
+        })
+    return recipes
+
+
+def shuffle_plan(recipes, start, days):
+    """The old generator: shuffle the library and deal it round-robin into the slots"""
+    shuffled = random.sample(recipes, len(recipes))
+    slots = [f"{(start + timedelta(days=day)).isoformat()}-{meal_type}"
+             for day in range(days) for meal_type in MEAL_TYPES]
+    return {slot_key: shuffled[i % len(shuffled)]['id'] for i, slot_key in enumerate(slots)}
+
+
+def plan_quality(plan, by_id, no_repeat_days=3):
+    """(mean calorie miss %, mean protein shortfall %, distinct ingredients, repeats within the window)"""
+    days = {}
+    last_seen = {}
+    repeats = 0
+    for slot_key, recipe_id in sorted(plan.items()):
+        day = date.fromisoformat(slot_key[:10])
+        recipe = by_id[recipe_id]
+        totals = days.setdefault(day, [0, 0])
+        totals[0] += recipe['calories']
+        totals[1] += recipe['protein']
+        if recipe_id in last_seen and (day - last_seen[recipe_id]).days < no_repeat_days:
+            repeats += 1
+        last_seen[recipe_id] = day
+
+    calorie_miss = sum(abs(c - DEFAULT_TARGETS['calories']) for c, _ in days.values()) / len(days) / DEFAULT_TARGETS['calories']
+    protein_short = sum(max(DEFAULT_TARGETS['protein'] - p, 0) for _, p in days.values()) / len(days) / DEFAULT_TARGETS['protein']
+    ingredients = set().union(*(meal_ingredients(by_id[recipe_id]) for recipe_id in plan.values()))
+    return calorie_miss * 100, protein_short * 100, len(ingredients), repeats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--sizes', default='50,1000,10000', help='comma separated recipe library sizes')
+    parser.add_argument('--days', type=int, default=7, help='days to plan')
+    parser.add_argument('--rounds', type=int, default=5, help='timing rounds (best is reported)')
+    args = parser.parse_args()
+
+    start = date.today() - timedelta(days=date.today().weekday())
+    print(f"{'recipes':>8} {'planner':<8} {'build ms':>9} {'plan ms':>8} {'kcal miss':>10} {'protein short':>14} "
+          f"{'ingredients':>12} {'repeats':>8}")
+
+    for size in (int(size) for size in args.sizes.split(',')):
+        recipes = make_recipes(size)
+        by_id = {recipe['id']: recipe for recipe in recipes}
+
+        features = RecipeFeatures()
+        features.apply_changes([(recipe['id'], None, recipe) for recipe in recipes])
+        started = time.perf_counter()
+        with features.lock:
+            features.build()
+        build_ms = (time.perf_counter() - started) * 1000
+
+        plan_ms = None
+        for seed in range(args.rounds):
+            started = time.perf_counter()
+            plan = features.plan(start, args.days, seed=seed)
+            elapsed = (time.perf_counter() - started) * 1000
+            plan_ms = elapsed if plan_ms is None else min(plan_ms, elapsed)
+
+        random.seed(0)
+        for label, result, timing in (("greedy", plan, (build_ms, plan_ms)),
+                                      ("shuffle", shuffle_plan(recipes, start, args.days), None)):
+            calorie_miss, protein_short, ingredients, repeats = plan_quality(result, by_id)
+            build, elapsed = (f"{timing[0]:9.1f}", f"{timing[1]:8.2f}") if timing else (f"{'':9}", f"{'':8}")
+            print(f"{size:>8} {label:<8} {build} {elapsed} {calorie_miss:9.1f}% {protein_short:13.1f}% "
+                  f"{ingredients:>12} {repeats:>8}")
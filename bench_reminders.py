@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Reminders Throughput Benchmark
+Measures push, sync and clear through the server API against the fake backend
+
+Usage: python3 bench_reminders.py [--latency 0.02] [--workers 8] [--sizes 10,100,1000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def wait_for_job(client, job_id):
+    """Poll a reminders job until it finishes"""
+    while True:
+        job = client.get(f'/api/reminders/jobs/{job_id}').get_json()['job']
+        if job['status'] == 'done':
+            return job
+        time.sleep(0.005)
+
+
+def make_ingredients(count, variant=0):
+    """Synthetic aggregated ingredients; variant changes every tenth amount"""
+    return [{
+        "name": f"Ingredient {i}",
+        "amount": 100 + (variant if i % 10 == 0 else 0),
+        "unit": "g",
+        "meals": ["Bench Meal"]
+    } for i in range(count)]
+
+
+def run(sizes, latency, workers):
+    workdir = tempfile.mkdtemp(prefix='reminders-bench-')
+    os.environ['REMINDERS_BACKEND'] = 'fake'
+    os.environ['REMINDERS_FAKE_FILE'] = os.path.join(workdir, 'reminders.json')
+    os.environ['REMINDERS_FAKE_LATENCY'] = str(latency)
+    os.environ['REMINDERS_MAX_WORKERS'] = str(workers)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import server
+    from reminder_jobs import ReminderJobQueue
+    from reminders_ledger import ReminderLedger
+
+    # Keep benchmark jobs out of the real outbox and ledger
+    server.reminder_ledger = ReminderLedger(os.path.join(workdir, 'ledger.json'))
+    server.reminder_jobs = ReminderJobQueue(
+        os.path.join(workdir, 'outbox.json'), server.add_to_reminders, workers,
+        on_result=server.reminder_ledger.record_result
+    )
+    client = server.app.test_client()
+
+    print(f"Fake remindctl latency: {latency * 1000:.0f}ms, workers: {workers}")
+    print(f"{'items':>6}  {'push/s':>10}  {'sync/s':>10}  {'clear/s':>10}")
+
+    for size in sizes:
+        ingredients = make_ingredients(size)
+
+        started = time.monotonic()
+        response = client.post('/api/shopping-list', json={"ingredients": ingredients})
+        wait_for_job(client, response.get_json()['jobId'])
+        push_rate = size / (time.monotonic() - started)
+
+        # Re-sync with a tenth of the amounts changed
+        started = time.monotonic()
+        response = client.post('/api/reminders/sync', json={"ingredients": make_ingredients(size, variant=1)})
+        job_id = response.get_json()['jobId']
+        if job_id:
+            wait_for_job(client, job_id)
+        sync_rate = size / (time.monotonic() - started)
+
+        started = time.monotonic()
+        client.post('/api/reminders/clear', json={"listName": "Shopping List"})
+        clear_rate = size / (time.monotonic() - started)
+
+        print(f"{size:>6}  {push_rate:>10.1f}  {sync_rate:>10.1f}  {clear_rate:>10.1f}")
+
+    server.reminder_jobs.stop(timeout=5)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds per simulated remindctl call')
+    parser.add_argument('--workers', type=int, default=8, help='REMINDERS_MAX_WORKERS')
+    parser.add_argument('--sizes', default='10,100,1000', help='comma separated item counts')
+    args = parser.parse_args()
+
+    run([int(n) for n in args.sizes.split(',')], args.latency, args.workers)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Meal Plan Storage Benchmark
+Compares the JSON file, the JSON journal store (fsync per write or coalesced) and SQLite at years of history
+
+Usage: python3 bench_storage.py [--years 1,5] [--recipes 50] [--writes 100]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from plan_sqlite import SQLiteMealPlanStore
+from plan_store import MealPlanStore
+
+MEAL_TYPES = ('breakfast', 'lunch', 'dinner', 'snacks')
+
+DEFAULTS = {
+    "mealPlan": {},
+    "currentWeekOffset": 0,
+    "servingsCount": 1,
+    "favoriteRecipes": [],
+    "customGroceryItems": [],
+    "recipes": {},
+    "lastUpdated": None,
+    "version": 0,
+    "slotVersions": {},
+    "fieldVersions": {}
+}
+
+
+def make_recipes(count):
+    """Synthetic recipes roughly the size of the ones in index.html"""
+    return {str(i): {
+        "id": i,
+        "name": f"Recipe {i}",
+        "image": f"https://images.example.com/{i}.jpg?w=400&h=300&fit=crop",
+        "calories": 300 + i % 400,
+        "protein": 20 + i % 30,
+        "carbs": 30 + i % 50,
+        "fat": 10 + i % 20,
+        "servings": 4,
+        "tags": ["high protein", "meal prep"],
+        "source": "TikTok @bench",
+        "url": f"https://www.tiktok.com/@bench/video/{i}",
+        "ingredients": [{"name": f"Ingredient {j}", "amount": 50 + j, "unit": "g", "perServing": True}
+                        for j in range(i % 5, i % 5 + 8)],
+        "directions": [f"Step {j} of recipe {i}, with enough words to look like a real direction" for j in range(5)]
+    } for i in range(1, count + 1)}
+
+
+def make_plan(years, recipe_count):
+    """Every meal slot filled for the given number of years up to today"""
+    rng = random.Random(42)
+    end = date.today()
+    start = end - timedelta(days=365 * years)
+    plan = {}
+    day = start
+    while day <= end:
+        for meal_type in MEAL_TYPES:
+            plan[f"{day.isoformat()}-{meal_type}"] = {"recipeId": rng.randint(1, recipe_count)}
+        day += timedelta(days=1)
+    data = dict(DEFAULTS, mealPlan=plan, recipes=make_recipes(recipe_count), favoriteRecipes=[1, 2, 3])
+    return data, start
+
+
+def timed(func, repeat=1):
+    """Mean milliseconds per call"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def disk_kb(workdir):
+    return sum(os.path.getsize(os.path.join(workdir, name)) for name in os.listdir(workdir)) / 1024
+
+
+class JsonFile:
+    """The original storage: the whole plan rewritten to one file on every save"""
+
+    def __init__(self, path, data=None):
+        self.path = path
+        if data is not None:
+            self.write(data)
+        with open(path, 'r') as f:
+            self.data = json.load(f)
+
+    def write(self, data):
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def apply(self, ops):
+        for op in ops:
+            self.data['mealPlan'][op['slot']] = op['meal']
+        self.write(self.data)
+
+    def slots_between(self, start, end):
+        return {k: v for k, v in self.data['mealPlan'].items() if start <= k[:10] <= end}
+
+
+def open_store(engine, workdir, data=None):
+    """Open (and with data, first create) a store of the given engine"""
+    if engine == 'json file':
+        return JsonFile(os.path.join(workdir, 'meal_plan.json'), data)
+    if engine in ('json journal', 'json coalesce'):
+        snapshot_file = os.path.join(workdir, 'meal_plan.json')
+        if data is not None:
+            with open(snapshot_file, 'w') as f:
+                json.dump(data, f, indent=2)
+        return MealPlanStore(snapshot_file, os.path.join(workdir, 'meal_plan.journal'), DEFAULTS, compact_every=10 ** 9,
+                             durability='coalesce' if engine == 'json coalesce' else 'fsync')
+    return SQLiteMealPlanStore(os.path.join(workdir, 'meal_plan.db'), DEFAULTS,
+                               import_data=(lambda: data) if data is not None else None)
+
+
+def run(years_list, recipe_count, writes):
+    print(f"{'engine':<13} {'years':>5} {'slots':>6} {'open ms':>9} {'write ms':>9} {'week ms':>8} {'disk KB':>9}")
+
+    for years in years_list:
+        data, start = make_plan(years, recipe_count)
+        rng = random.Random(7)
+        slot_keys = list(data['mealPlan'])
+
+        for engine in ('json file', 'json journal', 'json coalesce', 'sqlite'):
+            workdir = tempfile.mkdtemp(prefix='storage-bench-')
+            try:
+                open_store(engine, workdir, data)
+                open_ms = timed(lambda: open_store(engine, workdir))
+                store = open_store(engine, workdir)
+
+                def write_slot():
+                    slot_key = rng.choice(slot_keys)
+                    store.apply([{"op": "upsert", "slot": slot_key, "meal": {"recipeId": rng.randint(1, recipe_count)}}])
+
+                def read_week():
+                    day = start + timedelta(days=rng.randint(0, 365 * years - 7))
+                    store.slots_between(day.isoformat(), (day + timedelta(days=6)).isoformat())
+
+                write_ms = timed(write_slot, writes)
+                if hasattr(store, 'flush'):
+                    store.flush()
+                week_ms = timed(read_week, 200)
+                print(f"{engine:<13} {years:>5} {len(slot_keys):>6} {open_ms:>9.1f} {write_ms:>9.2f} "
+                      f"{week_ms:>8.3f} {disk_kb(workdir):>9.0f}")
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--years', default='1,5', help='comma separated years of history')
+    parser.add_argument('--recipes', type=int, default=50, help='distinct recipes in the plan')
+    parser.add_argument('--writes', type=int, default=100, help='single-slot writes to time')
+    args = parser.parse_args()
+
+    run([int(n) for n in args.years.split(',')], args.recipes, args.writes)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Ingredient Dictionary
+Canonical ingredient names with their aliases and emoji, each table compiled into one longest-match pattern
+"""
+
+import re
+from functools import lru_cache
+
+# Alias (contained in a lowercased ingredient name) -> canonical name
+INGREDIENT_ALIASES = {
+    'chicken thighs (boneless, skinless)': 'Chicken Thighs',
+    'boneless skinless chicken thighs': 'Chicken Thighs',
+    'boneless chicken thighs': 'Chicken Thighs',
+    'chicken thighs': 'Chicken Thighs',
+    'chicken thigh': 'Chicken Thighs',
+    'chicken breast': 'Chicken Breast',
+    'chicken breasts': 'Chicken Breast',
+    'bell peppers': 'Bell Peppers',
+    'bell pepper': 'Bell Peppers',
+    'capsicum': 'Bell Peppers',
+    'red bell pepper': 'Bell Peppers',
+    'green bell pepper': 'Bell Peppers',
+    'yellow bell pepper': 'Bell Peppers',
+    'red onion': 'Red Onion',
+    'red onions': 'Red Onion',
+    'white onion': 'White Onion',
+    'white onions': 'White Onion',
+    'onion': 'Onion',
+    'onions': 'Onion',
+    'garlic': 'Garlic',
+    'garlic cloves': 'Garlic',
+    'minced garlic': 'Garlic',
+    'sesame seeds': 'Sesame Seeds',
+    'honey': 'Honey',
+    'yogurt': 'Yogurt',
+    'low fat yogurt': 'Yogurt',
+    'greek yogurt': 'Yogurt',
+    'mayo': 'Mayonnaise',
+    'mayonnaise': 'Mayonnaise',
+    'light mayo': 'Mayonnaise',
+    'soy sauce': 'Soy Sauce',
+    'light soy sauce': 'Soy Sauce',
+    'dark soy sauce': 'Soy Sauce',
+    'cucumber': 'Cucumber',
+    'cucumbers': 'Cucumber',
+    'carrots': 'Carrots',
+    'grated carrots': 'Carrots',
+    'carrot': 'Carrots',
+    'rice vinegar': 'Rice Vinegar',
+    'sriracha': 'Sriracha',
+    'wraps': 'Wraps',
+    'tortilla wraps': 'Wraps',
+    'low carb wraps': 'Wraps',
+    'flour wraps': 'Wraps',
+    'tortillas': 'Tortillas',
+    'corn tortillas': 'Tortillas',
+    'cheese': 'Cheese',
+    'cheddar cheese': 'Cheddar Cheese',
+    'mozzarella cheese': 'Mozzarella',
+    'feta cheese': 'Feta Cheese',
+    'parmesan cheese': 'Parmesan',
+    'olive oil': 'Olive Oil',
+    'butter': 'Butter',
+    'salt': 'Salt',
+    'pepper': 'Black Pepper',
+    'black pepper': 'Black Pepper',
+}
+
+# Emoji for ingredient names containing each key
+EMOJI_MAP = {
+    'chicken': '🍗',
+    'beef': '🥩',
+    'steak': '🥩',
+    'pork': '🥓',
+    'turkey': '🦃',
+    'salmon': '🐟',
+    'shrimp': '🦐',
+    'fish': '🐟',
+    'egg': '🥚',
+    'eggs': '🥚',
+    'rice': '🍚',
+    'pasta': '🍝',
+    'noodle': '🍜',
+    'bread': '🍞',
+    'tortilla': '🌯',
+    'wrap': '🌯',
+    'cheese': '🧀',
+    'cheddar': '🧀',
+    'mozzarella': '🧀',
+    'feta': '🧀',
+    'parmesan': '🧀',
+    'milk': '🥛',
+    'yogurt': '🥛',
+    'butter': '🧈',
+    'cream': '🥛',
+    'onion': '🧅',
+    'garlic': '🧄',
+    'tomato': '🍅',
+    'tomatoes': '🍅',
+    'pepper': '🫑',
+    'peppers': '🫑',
+    'capsicum': '🫑',
+    'cucumber': '🥒',
+    'lettuce': '🥬',
+    'spinach': '🥬',
+    'kale': '🥬',
+    'cabbage': '🥬',
+    'broccoli': '🥦',
+    'carrot': '🥕',
+    'carrots': '🥕',
+    'potato': '🥔',
+    'potatoes': '🥔',
+    'sweet potato': '🍠',
+    'corn': '🌽',
+    'avocado': '🥑',
+    'eggplant': '🍆',
+    'mushroom': '🍄',
+    'olive': '🫒',
+    'olives': '🫒',
+    'lemon': '🍋',
+    'lime': '🍋',
+    'apple': '🍎',
+    'banana': '🍌',
+    'orange': '🍊',
+    'berry': '🫐',
+    'berries': '🫐',
+    'grape': '🍇',
+    'watermelon': '🍉',
+    'pineapple': '🍍',
+    'coconut': '🥥',
+    'kiwi': '🥝',
+    'mango': '🥭',
+    'peach': '🍑',
+    'cherry': '🍒',
+    'strawberry': '🍓',
+    'blueberry': '🫐',
+    'oil': '🫒',
+    'olive oil': '🫒',
+    'vinegar': '🍶',
+    'soy sauce': '🍶',
+    'sugar': '🧂',
+    'salt': '🧂',
+    'pepper_spice': '🌶️',
+    'chili': '🌶️',
+    'chilli': '🌶️',
+    'spice': '🌶️',
+    'herb': '🌿',
+    'cilantro': '🌿',
+    'coriander': '🌿',
+    'parsley': '🌿',
+    'basil': '🌿',
+    'rosemary': '🌿',
+    'thyme': '🌿',
+    'oregano': '🌿',
+    'honey': '🍯',
+    'peanut butter': '🥜',
+    'nut': '🥜',
+    'almond': '🥜',
+    'seed': '🌱',
+    'sesame': '🌱',
+    'chocolate': '🍫',
+    'coffee': '☕',
+    'tea': '🍵',
+    'juice': '🧃',
+    'water': '💧',
+    'wine': '🍷',
+    'beer': '🍺',
+    'soda': '🥤',
+    'mayo': '🥄',
+    'mayonnaise': '🥄',
+    'ketchup': '🍅',
+    'mustard': '🌭',
+    'sriracha': '🌶️',
+    'hot sauce': '🌶️',
+    'tahini': '🥣',
+    'quinoa': '🌾',
+    'oats': '🌾',
+    'flour': '🌾',
+    'bean': '🫘',
+    'beans': '🫘',
+    'chickpea': '🫘',
+    'lentil': '🫘',
+    'tofu': '🧊',
+    'edamame': '🫛',
+    'asparagus': '🌱',
+    'ginger': '🫚',
+    'cinnamon': '🧂',
+    'cumin': '🧂',
+    'paprika': '🧂',
+    'seaweed': '🌿',
+}
+
+DEFAULT_EMOJI = '🛒'  # Default shopping cart
+
+
+def compile_trie_pattern(keys):
+    """
+    Compile keys into a single regex shaped like a prefix trie
+    
+    Shared prefixes are only tested once and the optional tails are greedy, so
+    each position yields its longest key. The lookahead reports a match at
+    every position, so overlapping keys ("sweet potato" and "potato") are all
+    seen and the longest can win.
+    """
+    trie = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[''] = True
+    
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+    
+    return re.compile('(?=(' + build(trie) + '))')
+
+
+class TermMatcher:
+    """
+    Substring lookup over a {key: value} table, compiled once
+    
+    longest() returns the longest key found in a lowercased text (earliest
+    wins ties), or None, and match() its value. A key equal to the whole
+    text is always the longest, so exact matches win as they did in the
+    old loops. Results are memoized per text.
+    """
+    
+    def __init__(self, table, cache_size=4096):
+        self.table = {key.lower(): value for key, value in table.items()}
+        self.pattern = compile_trie_pattern(self.table)
+        self.longest = lru_cache(maxsize=cache_size)(self._longest)
+    
+    def _longest(self, text_lower):
+        best = None
+        for found in self.pattern.finditer(text_lower):
+            key = found.group(1)
+            if best is None or len(key) > len(best):
+                best = key
+        return best
+    
+    def match(self, text_lower):
+        key = self.longest(text_lower)
+        return self.table[key] if key else None
+
+
+ALIAS_MATCHER = TermMatcher(INGREDIENT_ALIASES)
+EMOJI_MATCHER = TermMatcher(EMOJI_MAP)
+
+
+@lru_cache(maxsize=4096)
+def normalize_ingredient_name(name):
+    """Canonical name for an ingredient name variation (title-cased when no alias matches)"""
+    canonical = ALIAS_MATCHER.match(name.lower().strip())
+    if canonical:
+        return canonical
+    return re.sub(r'\b\w', lambda m: m.group().upper(), name)
+
+
+def ingredient_emoji(name):
+    """
+    Emoji for an ingredient, from the longer key found in the name as written or its canonical name
+    
+    The name as written wins ties, so an alias that drops a qualifier
+    ("Peanut Butter" -> Butter) can't replace a more specific key; the
+    canonical name is only used when it holds a longer key.
+    """
+    written = EMOJI_MATCHER.longest(name.lower())
+    canonical = EMOJI_MATCHER.longest(normalize_ingredient_name(name).lower())
+    key = canonical if canonical and len(canonical) > len(written or '') else written
+    return EMOJI_MATCHER.table[key] if key else DEFAULT_EMOJI
+
+
+def describe_ingredients(names):
+    """[{"name", "canonical", "emoji"}] for a batch of ingredient names"""
+    return [{
+        "name": name,
+        "canonical": normalize_ingredient_name(name),
+        "emoji": ingredient_emoji(name)
+    } for name in names]
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Job Queue Base
+In-memory job table with a numbered progress event log per job, shared by the background queues
+"""
+
+import threading
+
+# Finished jobs kept around so clients can still poll their results
+KEEP_FINISHED_JOBS = 50
+
+
+class JobQueueBase:
+    """
+    Jobs keyed by id, each with a list of progress events, under one condition
+
+    Subclasses keep their job dicts (with "id", "status" and "finishedAt")
+    in self.jobs and list their final statuses in FINISHED. add_event
+    appends a numbered event and wakes waiting clients, which poll
+    snapshot() or block in wait_for_events() and resume from the last seq
+    they saw. The oldest finished jobs beyond KEEP_FINISHED_JOBS are pruned
+    whenever a job is added.
+    """
+
+    FINISHED = ('done',)
+
+    def __init__(self):
+        self.jobs = {}
+        self.events = {}
+        self.cond = threading.Condition()
+
+    def add_job(self, job):
+        """Start tracking a job with an empty event log (caller holds the lock)"""
+        self.jobs[job['id']] = job
+        self.events[job['id']] = []
+        self.prune()
+
+    def add_event(self, job, **fields):
+        """Append a progress event numbered from 1 and wake waiters (caller holds the lock)"""
+        events = self.events.setdefault(job['id'], [])
+        events.append({"seq": len(events) + 1, **fields})
+        self.cond.notify_all()
+
+    def finished(self, job):
+        return job['status'] in self.FINISHED
+
+    def snapshot(self, job_id):
+        """Return a copy of a job, or None if unknown"""
+        with self.cond:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait_for_events(self, job_id, after_seq, timeout=15):
+        """
+        Block until a job has events newer than after_seq, or it finishes
+
+        Returns (events, finished), or (None, True) for an unknown job
+        """
+        with self.cond:
+            if job_id not in self.jobs:
+                return None, True
+
+            def ready():
+                return len(self.events[job_id]) > after_seq or self.finished(self.jobs[job_id])
+
+            self.cond.wait_for(ready, timeout=timeout)
+            if job_id not in self.jobs:
+                return None, True
+            return list(self.events[job_id][after_seq:]), self.finished(self.jobs[job_id])
+
+    def prune(self):
+        """Drop the oldest finished jobs beyond KEEP_FINISHED_JOBS (caller holds the lock)"""
+        finished = [job for job in self.jobs.values() if self.finished(job)]
+        finished.sort(key=lambda job: job['finishedAt'] or '')
+        for job in finished[:max(0, len(finished) - KEEP_FINISHED_JOBS)]:
+            del self.jobs[job['id']]
+            self.events.pop(job['id'], None)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Nutrition Summaries
+Per-day, per-week and per-month macro totals for meal plan slots, vectorized with NumPy
+"""
+
+from datetime import date
+
+import numpy as np
+
+from plan_views import MACROS, week_key
+
+# Groupings nutrition_summary can produce
+GROUPS = ('day', 'week', 'month')
+
+
+def recipe_matrix(recipes):
+    """(row per recipe id, (recipes + 1) x macros matrix); the last row is all zeros for unknown recipes"""
+    rows = {recipe_id: index for index, recipe_id in enumerate(recipes)}
+    matrix = np.zeros((len(rows) + 1, len(MACROS)), dtype=np.float64)
+    for recipe_id, index in rows.items():
+        recipe = recipes[recipe_id]
+        matrix[index] = [float(recipe.get(macro) or 0) for macro in MACROS]
+    return rows, matrix
+
+
+def slot_macros(slots, recipes):
+    """
+    Dates and per-person macros of stored slots
+
+    Slots are references ({"recipeId": id, ...overrides}); the macros are
+    gathered from the recipe matrix in one indexing step, then the few
+    slots overriding a macro are patched. Returns (datetime64[D] array,
+    slots x macros matrix).
+    """
+    rows, matrix = recipe_matrix(recipes)
+    unknown = len(rows)
+    days = []
+    indexes = []
+    patches = []
+
+    for slot_key, slot in slots.items():
+        if not isinstance(slot, dict):
+            continue
+        position = len(days)
+        days.append(slot_key[:10])
+        indexes.append(rows.get(str(slot.get('recipeId')), unknown))
+        # Full meals (no recipeId) and per-slot overrides carry their own macros
+        for column, macro in enumerate(MACROS):
+            if macro in slot:
+                patches.append((position, column, float(slot[macro] or 0)))
+
+    values = matrix[np.asarray(indexes, dtype=np.intp)]
+    if patches:
+        positions, columns, amounts = zip(*patches)
+        values[list(positions), list(columns)] = amounts
+
+    try:
+        dates = np.array(days, dtype='datetime64[D]')
+    except ValueError:
+        # Some slot key doesn't start with a date; parse one by one and drop those
+        dates = np.array([day if is_date(day) else 'NaT' for day in days], dtype='datetime64[D]')
+    valid = ~np.isnat(dates)
+    return dates[valid], values[valid]
+
+
+def is_date(text):
+    try:
+        date.fromisoformat(text)
+        return True
+    except ValueError:
+        return False
+
+
+def group_sums(keys, values):
+    """(unique keys in order, per-key column sums of values, rows per key)"""
+    labels, inverse = np.unique(keys, return_inverse=True)
+    sums = np.column_stack([
+        np.bincount(inverse, weights=values[:, column], minlength=len(labels))
+        for column in range(values.shape[1])
+    ])
+    return labels, sums, np.bincount(inverse, minlength=len(labels))
+
+
+def nutrition_summary(slots, recipes, servings=1, groups=GROUPS):
+    """
+    Macro totals and averages for a set of stored slots
+
+    Recipe macros are per person: "totals" are scaled to `servings` people
+    and "dailyAverage" is per person per day that has meals. Each grouping
+    in groups ("day", "week" as ISO week keys, "month" as YYYY-MM) lists
+    its periods with their totals, averages, meal and day counts.
+    """
+    days, values = slot_macros(slots, recipes)
+    day_labels, day_sums, day_meals = group_sums(days, values)
+    # Meal counts ride along as an extra column when days are rolled up
+    day_rows = np.column_stack([day_sums, day_meals])
+
+    # Week (Monday) and month of every day with meals; 1970-01-01 was a Thursday
+    day_numbers = day_labels.astype(np.int64)
+    mondays = day_labels - ((day_numbers + 3) % 7).astype('timedelta64[D]')
+    months = day_labels.astype('datetime64[M]')
+
+    def periods(keys, label):
+        labels, sums, day_counts = group_sums(keys, day_rows)
+        # Round whole columns at once; only the dicts are built per period
+        totals = np.rint(sums[:, :-1] * servings).astype(np.int64).tolist()
+        averages = np.rint(sums[:, :-1] / np.maximum(day_counts, 1)[:, None]).astype(np.int64).tolist()
+        return [{
+            "period": label(key),
+            "meals": meals,
+            "days": day_count,
+            "totals": dict(zip(MACROS, total)),
+            "dailyAverage": dict(zip(MACROS, average))
+        } for key, meals, day_count, total, average in zip(
+            labels.tolist(), sums[:, -1].astype(np.int64).tolist(), day_counts.tolist(), totals, averages
+        )]
+
+    result = {
+        "servings": servings,
+        "mealCount": int(len(values)),
+        "dayCount": int(len(day_labels)),
+        "totals": {macro: round(float(values[:, column].sum()) * servings) for column, macro in enumerate(MACROS)},
+        "dailyAverage": {
+            macro: round(float(values[:, column].sum()) / len(day_labels)) if len(day_labels) else 0
+            for column, macro in enumerate(MACROS)
+        }
+    }
+    if 'day' in groups:
+        result['days'] = periods(day_labels, lambda day: day.isoformat())
+    if 'week' in groups:
+        result['weeks'] = periods(mondays, week_key)
+    if 'month' in groups:
+        result['months'] = periods(months, lambda month: f"{month.year}-{month.month:02d}")
+    return result
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Meal Plan Archive
+Past ISO weeks moved out of the live plan into one gzipped file per week
+"""
+
+import gzip
+import json
+import os
+import threading
+from datetime import date, timedelta
+
+from plan_store import referenced_recipes
+from plan_views import week_key
+
+
+def week_start(key):
+    """Monday of an ISO week key"""
+    year, week = key.split('-W')
+    return date.fromisocalendar(int(year), int(week), 1)
+
+
+class PlanArchive:
+    """
+    Gzipped partitions of archived meal plan weeks, e.g. 2024-W07.json.gz
+
+    Each partition holds the week's slots plus the recipes they reference,
+    so reading a range opens only the weeks it covers. Partitions are
+    written atomically (temp file plus rename) and cached once read.
+    """
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        os.makedirs(archive_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.cache = {}
+
+    def path(self, key):
+        return os.path.join(self.archive_dir, f"{key}.json.gz")
+
+    def weeks(self):
+        """Archived week keys, oldest first"""
+        return sorted(name[:-len('.json.gz')] for name in os.listdir(self.archive_dir) if name.endswith('.json.gz'))
+
+    def archived_before(self):
+        """
+        Monday after the newest archived week (YYYY-MM-DD), or None when nothing is archived
+
+        Weeks are archived whole, so no live slot is dated before it.
+        """
+        weeks = self.weeks()
+        return (week_start(weeks[-1]) + timedelta(days=7)).isoformat() if weeks else None
+
+    def read(self, key):
+        """{"mealPlan", "recipes"} of one archived week (empty when not archived)"""
+        path = self.path(key)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return {"mealPlan": {}, "recipes": {}}
+
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            partition = json.load(f)
+        with self.lock:
+            self.cache[key] = (mtime, partition)
+        return partition
+
+    def write(self, key, slots, recipes):
+        """Replace one week's partition, or remove it when no slots are left"""
+        path = self.path(key)
+        with self.lock:
+            self.cache.pop(key, None)
+        if not slots:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+
+        partition = {"mealPlan": slots, "recipes": referenced_recipes({"mealPlan": slots, "recipes": recipes})}
+        tmp_file = path + '.tmp'
+        with gzip.open(tmp_file, 'wt', encoding='utf-8') as f:
+            json.dump(partition, f, separators=(',', ':'))
+        with open(tmp_file, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+
+    def clear(self):
+        """Remove every partition"""
+        with self.lock:
+            self.cache = {}
+        for key in self.weeks():
+            os.remove(self.path(key))
+
+    def slots_between(self, start, end):
+        """Archived slots and their recipes for [start, end] (YYYY-MM-DD), opening only those weeks"""
+        slots = {}
+        recipes = {}
+        first, last = week_key(date.fromisoformat(start)), week_key(date.fromisoformat(end))
+        for key in self.weeks():
+            # Week keys sort chronologically
+            if not first <= key <= last:
+                continue
+            partition = self.read(key)
+            slots.update((slot_key, slot) for slot_key, slot in partition['mealPlan'].items()
+                         if start <= slot_key[:10] <= end)
+            recipes.update(partition['recipes'])
+        return slots, recipes
+
+    def archive_ops(self, data, before):
+        """
+        Move every slot dated before `before` into the archive (caller holds the store's write locks)
+
+        Live slots overwrite archived ones of the same week and live
+        tombstones delete them, then the partitions are written. Returns
+        the "archive" operations that drop those slots and tombstones from
+        the live plan.
+        """
+        plan = data.get('mealPlan', {})
+        recipes = data.get('recipes', {})
+        by_week = {}
+        for slot_key in set(plan) | set(data.get('slotVersions', {})):
+            try:
+                day = date.fromisoformat(slot_key[:10])
+            except ValueError:
+                continue
+            if day.isoformat() < before:
+                by_week.setdefault(week_key(day), []).append(slot_key)
+
+        ops = []
+        for key, slot_keys in sorted(by_week.items()):
+            partition = self.read(key)
+            slots = dict(partition['mealPlan'])
+            all_recipes = dict(partition['recipes'], **recipes)
+            for slot_key in slot_keys:
+                if slot_key in plan:
+                    slots[slot_key] = plan[slot_key]
+                else:
+                    slots.pop(slot_key, None)
+            self.write(key, slots, all_recipes)
+            ops += [{"op": "archive", "slot": slot_key} for slot_key in sorted(slot_keys)]
+        return ops
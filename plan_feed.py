@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Meal Plan Change Feed
+Recent plan versions as slot-level change events, for streaming to clients
+"""
+
+import threading
+from collections import deque
+
+from plan_store import PLAN_FIELDS
+
+# Versions kept for reconnecting clients; older cursors reload the whole plan
+KEEP_EVENTS = 500
+
+
+class PlanChangeFeed:
+    """
+    Ring buffer of meal plan change events keyed by plan version
+
+    Subscribed to a meal plan store, it records one event per change the
+    store reports: {"version", "since", "lastUpdated", "mealPlan", "recipes",
+    "fields"}, where mealPlan maps each changed slot to its stored reference
+    (None when deleted), recipes holds the recipes those references use and
+    fields the top-level fields changed since "since". The persisted plan
+    version is the cursor, so it stays valid across restarts and matches
+    the version clients send as expectedVersion.
+
+    Waiting clients block on one shared condition rather than polling.
+    """
+
+    def __init__(self, store, keep=KEEP_EVENTS):
+        self.store = store
+        self.events = deque(maxlen=keep)
+        self.cond = threading.Condition()
+        with store.lock:
+            self.version = store.data.get('version', 0)
+            store.subscribe(self.publish)
+
+    def publish(self, changes):
+        """Store listener: record the new version (called with the store lock held)"""
+        data = self.store.data
+        version = data.get('version', 0)
+        if version == self.version and not changes:
+            return
+
+        slots = {slot_key: data['mealPlan'].get(slot_key) for slot_key, _, _ in changes}
+        recipes = data.get('recipes', {})
+        recipe_ids = {str(slot['recipeId']) for slot in slots.values() if isinstance(slot, dict) and 'recipeId' in slot}
+        field_versions = data.get('fieldVersions', {})
+
+        with self.cond:
+            self.events.append({
+                "version": version,
+                "since": self.version,
+                "lastUpdated": data.get('lastUpdated'),
+                "mealPlan": slots,
+                "recipes": {key: recipes[key] for key in recipe_ids if key in recipes},
+                "fields": {
+                    field: data.get(field) for field in PLAN_FIELDS
+                    if field_versions.get(field, 0) > self.version
+                }
+            })
+            self.version = version
+            self.cond.notify_all()
+
+    def events_after(self, cursor):
+        """
+        Events newer than the cursor version (caller holds self.cond)
+
+        Returns None when the cursor is no longer covered by the buffer (or
+        is ahead of it), meaning the client has to reload the whole plan.
+        """
+        if cursor == self.version:
+            return []
+        if cursor > self.version or not self.events or self.events[0]['since'] > cursor:
+            return None
+        return [event for event in self.events if event['version'] > cursor]
+
+    def wait_for_events(self, cursor, timeout=15):
+        """Block until there are events newer than the cursor, returns them (None to reload)"""
+        with self.cond:
+            self.cond.wait_for(lambda: self.events_after(cursor) != [], timeout=timeout)
+            return self.events_after(cursor)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+SQLite Meal Plan Store
+Slots, recipes, favorites and custom grocery items in a WAL-mode database
+"""
+
+import copy
+import json
+import sqlite3
+from contextlib import contextmanager
+
+from plan_store import DURABILITY_MODES, PLAN_FIELDS, PlanStoreBase, VersionConflict, apply_ops, migrate_plan
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS slots (
+    slot_key TEXT PRIMARY KEY,
+    day TEXT NOT NULL,
+    meal_type TEXT NOT NULL,
+    slot TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS slots_by_day ON slots (day, meal_type);
+CREATE TABLE IF NOT EXISTS recipes (
+    id TEXT PRIMARY KEY,
+    recipe TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS favorites (
+    position INTEGER PRIMARY KEY,
+    recipe_id NOT NULL
+);
+CREATE TABLE IF NOT EXISTS custom_grocery_items (
+    position INTEGER PRIMARY KEY,
+    item TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Scalar fields kept as JSON values in the settings table
+SETTINGS_FIELDS = ('currentWeekOffset', 'servingsCount', 'lastUpdated', 'version', 'fieldVersions')
+
+# Deleted slots stay as rows holding this value, keeping their version as a tombstone
+TOMBSTONE = 'null'
+
+
+def dumps(value):
+    return json.dumps(value, separators=(',', ':'))
+
+
+class SQLiteMealPlanStore(PlanStoreBase):
+    """
+    Meal plan stored in SQLite (WAL mode)
+
+    Reads of the whole plan are served from memory like the JSON store;
+    each write is one BEGIN IMMEDIATE transaction touching only the changed
+    rows, so several processes can share the database. slots_between uses
+    the (day, meal_type) index. import_data, if given, is called for the
+    initial contents when the database is empty.
+
+    durability='fsync' syncs every commit (synchronous=FULL); 'coalesce'
+    leaves syncing to WAL checkpoints (synchronous=NORMAL), which keeps
+    the database consistent but can lose the latest commits on power loss.
+    """
+
+    def __init__(self, db_file, defaults, import_data=None, durability='fsync'):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        super().__init__(defaults)
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=FULL' if durability == 'fsync' else 'PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        if 'version' not in {column[1] for column in self.conn.execute('PRAGMA table_info(slots)')}:
+            self.conn.execute('ALTER TABLE slots ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+
+        with self._exclusive():
+            if import_data and self.conn.execute('SELECT COUNT(*) FROM settings').fetchone()[0] == 0:
+                data = import_data()
+                migrate_plan(data)
+                self._write_all(data)
+                print(f"Imported {len(data.get('mealPlan', {}))} meal plan slots into {db_file}")
+            self.data = self.load()
+        self.data_version = self._data_version()
+
+    def load(self):
+        """Read every table into the in-memory plan"""
+        data = copy.deepcopy(self.defaults)
+        data['mealPlan'] = {}
+        data['slotVersions'] = {}
+        for slot_key, slot, version in self.conn.execute('SELECT slot_key, slot, version FROM slots ORDER BY slot_key'):
+            if slot != TOMBSTONE:
+                data['mealPlan'][slot_key] = json.loads(slot)
+            data['slotVersions'][slot_key] = version
+        data['recipes'] = {
+            recipe_id: json.loads(recipe)
+            for recipe_id, recipe in self.conn.execute('SELECT id, recipe FROM recipes')
+        }
+        data['favoriteRecipes'] = [
+            recipe_id for recipe_id, in self.conn.execute('SELECT recipe_id FROM favorites ORDER BY position')
+        ]
+        data['customGroceryItems'] = [
+            json.loads(item) for item, in self.conn.execute('SELECT item FROM custom_grocery_items ORDER BY position')
+        ]
+        for key, value in self.conn.execute('SELECT key, value FROM settings'):
+            data[key] = json.loads(value)
+        data['version'] = data.get('version') or 0
+        data['fieldVersions'] = data.get('fieldVersions') or {}
+        return data
+
+    @contextmanager
+    def _exclusive(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except VersionConflict:
+            self.conn.execute('ROLLBACK')
+            raise
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            # Memory must not get ahead of the database
+            self.data = self.load()
+            raise
+        else:
+            self.conn.execute('COMMIT')
+
+    def _commit(self, ops, version, at):
+        changes = apply_ops(self.data, ops, version)
+        self.data['lastUpdated'] = at
+        self._write_ops(ops)
+        return changes
+
+    def _replace(self, data):
+        for table in ('slots', 'recipes', 'favorites', 'custom_grocery_items', 'settings'):
+            self.conn.execute(f'DELETE FROM {table}')
+        self._write_all(data)
+
+    def slots_between(self, start, end):
+        """Stored slots whose date falls in [start, end] (YYYY-MM-DD strings), keyed by slot"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT slot_key, slot FROM slots WHERE day BETWEEN ? AND ? AND slot != ? ORDER BY day, meal_type',
+                (start, end, TOMBSTONE)
+            )
+            return {slot_key: json.loads(slot) for slot_key, slot in rows}
+
+    def _data_version(self):
+        # Changes only when another connection commits
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _changed_externally(self):
+        return self._data_version() != self.data_version
+
+    def _reload(self):
+        self.data_version = self._data_version()
+        return self.load()
+
+    def _write_ops(self, ops):
+        """Write the final state of every row the operations touched (caller holds the transaction)"""
+        recipes = self.data['recipes']
+        slot_keys = set()
+        recipe_ids = set()
+        fields = set()
+
+        for op in ops:
+            kind = op.get('op')
+            if kind in ('upsert', 'delete', 'archive'):
+                slot_keys.add(op['slot'])
+                meal = op.get('meal')
+                # Full recipe objects may have added a recipe while being normalized
+                if isinstance(meal, dict) and 'recipeId' not in meal and meal.get('id') is not None:
+                    recipe_ids.add(str(meal['id']))
+            elif kind == 'recipe':
+                recipe_ids.add(str(op['recipe']['id']))
+            elif kind == 'set' and op.get('field') in PLAN_FIELDS:
+                fields.add(op['field'])
+
+        for recipe_id in recipe_ids:
+            if recipe_id in recipes:
+                self.conn.execute('INSERT OR REPLACE INTO recipes (id, recipe) VALUES (?, ?)',
+                                  (recipe_id, dumps(recipes[recipe_id])))
+
+        self._write_slots(self.data, slot_keys)
+        self._write_fields(self.data, fields | {'lastUpdated', 'version', 'fieldVersions'})
+
+    def _write_all(self, data):
+        """Insert a whole plan into empty tables (caller holds the transaction)"""
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO recipes (id, recipe) VALUES (?, ?)',
+            [(recipe_id, dumps(recipe)) for recipe_id, recipe in data.get('recipes', {}).items()]
+        )
+        self._write_slots(data, set(data.get('mealPlan', {})) | set(data.get('slotVersions', {})))
+        self._write_fields(data, set(PLAN_FIELDS) | set(SETTINGS_FIELDS))
+
+    def _write_slots(self, data, slot_keys):
+        """Write slots, tombstones for the ones no longer planned, and drop archived ones"""
+        plan = data.get('mealPlan', {})
+        versions = data.get('slotVersions', {})
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO slots (slot_key, day, meal_type, slot, version) VALUES (?, ?, ?, ?, ?)',
+            [(slot_key, slot_key[:10], slot_key[11:],
+              dumps(plan[slot_key]) if slot_key in plan else TOMBSTONE, versions.get(slot_key, 0))
+             for slot_key in slot_keys if slot_key in plan or slot_key in versions]
+        )
+        self.conn.executemany(
+            'DELETE FROM slots WHERE slot_key = ?',
+            [(slot_key,) for slot_key in slot_keys if slot_key not in plan and slot_key not in versions]
+        )
+
+    def _write_fields(self, data, fields):
+        """Rewrite the rows behind some top-level fields"""
+        if 'favoriteRecipes' in fields:
+            self.conn.execute('DELETE FROM favorites')
+            self.conn.executemany(
+                'INSERT INTO favorites (position, recipe_id) VALUES (?, ?)',
+                list(enumerate(data.get('favoriteRecipes') or []))
+            )
+        if 'customGroceryItems' in fields:
+            self.conn.execute('DELETE FROM custom_grocery_items')
+            self.conn.executemany(
+                'INSERT INTO custom_grocery_items (position, item) VALUES (?, ?)',
+                [(position, dumps(item)) for position, item in enumerate(data.get('customGroceryItems') or [])]
+            )
+        for field in SETTINGS_FIELDS:
+            if field in fields:
+                self.conn.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                                  (field, dumps(data.get(field))))
@@ -0,0 +1,736 @@
+#!/usr/bin/env python3
+"""
+Meal Plan Store
+Snapshot file plus an append-only journal of slot-level changes
+
+Slots reference recipes by id ({"recipeId": 17, ...overrides}) and each
+planned recipe is stored once under "recipes".
+
+Every write creates a new plan "version". slotVersions and fieldVersions
+record the version that last changed each slot (deleted slots included, as
+tombstones) and field, so writers can send the version they started from
+and only real conflicts are rejected.
+
+Past weeks can be moved out to a PlanArchive (plan_archive.py); "archive"
+operations then drop those slots and their tombstones from the live plan.
+"""
+
+import atexit
+import copy
+import fcntl
+import json
+import os
+import threading
+from contextlib import ExitStack, contextmanager
+
+from timestamps import utc_now
+
+# Top-level fields a client may overwrite besides the slots themselves
+PLAN_FIELDS = ('currentWeekOffset', 'servingsCount', 'favoriteRecipes', 'customGroceryItems')
+
+# View state where the latest write should simply win instead of conflicting
+LAST_WRITER_WINS_FIELDS = ('currentWeekOffset',)
+
+# How writes reach the disk: fsync each one before acknowledging it, or
+# acknowledge from memory and write everything from a short window at once
+DURABILITY_MODES = ('fsync', 'coalesce')
+
+
+class VersionConflict(Exception):
+    """A write touched slots or fields that changed after its expected version"""
+
+    def __init__(self, conflicts, version):
+        super().__init__(f"{len(conflicts)} conflicting changes (plan is at version {version})")
+        self.conflicts = conflicts
+        self.version = version
+
+
+class UnknownRecipes(Exception):
+    """A write added slots referencing recipes that neither the plan nor the write stores"""
+
+    def __init__(self, recipe_ids):
+        super().__init__(f"Unknown recipe ids: {', '.join(recipe_ids)}")
+        self.recipe_ids = recipe_ids
+
+
+def normalize_meal(meal, recipes):
+    """
+    Slot reference for a planned meal
+
+    A full recipe object becomes {"recipeId": id} plus only the fields that
+    differ from the stored recipe (per-slot overrides). Returns
+    (slot, new_recipe) where new_recipe is set when the id isn't stored yet
+    and should be added. References and meals without an id pass through.
+    """
+    if not isinstance(meal, dict) or 'recipeId' in meal or meal.get('id') is None:
+        return meal, None
+
+    base = recipes.get(str(meal['id']))
+    if base is None:
+        return {"recipeId": meal['id']}, meal
+
+    slot = {"recipeId": meal['id']}
+    slot.update((field, value) for field, value in meal.items() if base.get(field) != value)
+    return slot, None
+
+
+def resolve_meal(slot, recipes):
+    """Full meal for a slot reference: the stored recipe with the overrides applied"""
+    if not isinstance(slot, dict) or 'recipeId' not in slot:
+        return slot
+    base = recipes.get(str(slot['recipeId']))
+    if base is None:
+        return slot
+    meal = dict(base)
+    meal.update((field, value) for field, value in slot.items() if field != 'recipeId')
+    return meal
+
+
+def referenced_recipes(data):
+    """The stored recipes that some slot points at, keyed by id"""
+    recipes = data.get('recipes', {})
+    keys = {str(slot['recipeId']) for slot in data.get('mealPlan', {}).values()
+            if isinstance(slot, dict) and 'recipeId' in slot}
+    return {key: recipes[key] for key in keys if key in recipes}
+
+
+def diff_ops(current, new_data, base_version=None):
+    """
+    Journal operations that turn current into new_data
+
+    Only fields present in new_data are considered, and only slots whose
+    contents differ produce an upsert or delete. Slots may be full recipe
+    objects or {"recipeId": ...} references; new_data["recipes"] may carry
+    recipes the store doesn't have yet. With base_version, slots added
+    after it are missing from new_data because the writer never saw them,
+    so they are kept rather than deleted.
+    """
+    ops = []
+    recipes = dict(current.get('recipes', {}))
+
+    for recipe in (new_data.get('recipes') or {}).values():
+        if isinstance(recipe, dict) and recipe.get('id') is not None and recipes.get(str(recipe['id'])) != recipe:
+            ops.append({"op": "recipe", "recipe": recipe})
+            recipes[str(recipe['id'])] = recipe
+
+    if 'mealPlan' in new_data:
+        old_plan = current.get('mealPlan', {})
+        new_plan = new_data['mealPlan'] or {}
+        for slot_key, meal in new_plan.items():
+            slot, new_recipe = normalize_meal(meal, recipes)
+            if new_recipe is not None:
+                ops.append({"op": "recipe", "recipe": new_recipe})
+                recipes[str(new_recipe['id'])] = new_recipe
+            if old_plan.get(slot_key) != slot:
+                ops.append({"op": "upsert", "slot": slot_key, "meal": slot})
+        slot_versions = current.get('slotVersions', {})
+        for slot_key in old_plan:
+            if slot_key in new_plan:
+                continue
+            if base_version is not None and slot_versions.get(slot_key, 0) > base_version:
+                continue
+            ops.append({"op": "delete", "slot": slot_key})
+
+    for field in PLAN_FIELDS:
+        if field in new_data and new_data[field] != current.get(field):
+            ops.append({"op": "set", "field": field, "value": new_data[field]})
+
+    return ops
+
+
+def require_recipes(data, ops):
+    """
+    Raise UnknownRecipes if an upserted reference points at no stored recipe
+
+    A reference is fine when the plan already stores its recipe or a
+    "recipe" operation in the same write adds it. Returns ops unchanged.
+    """
+    known = set(data.get('recipes', {}))
+    known.update(str(op['recipe']['id']) for op in ops if op.get('op') == 'recipe')
+    missing = {
+        str(op['meal']['recipeId']) for op in ops
+        if op.get('op') == 'upsert' and isinstance(op.get('meal'), dict) and 'recipeId' in op['meal']
+    } - known
+    if missing:
+        raise UnknownRecipes(sorted(missing))
+    return ops
+
+
+def check_ops(data, ops, expected_version):
+    """
+    Merge operations written against expected_version into the current plan
+
+    Operations on slots and fields nobody changed since expected_version are
+    kept. Where someone did, operations that would leave the value as it is
+    are dropped and anything else is a conflict, which raises
+    VersionConflict with the current values. Without expected_version every
+    operation is kept (last writer wins).
+    """
+    if expected_version is None:
+        return ops
+
+    plan = data.get('mealPlan', {})
+    recipes = data.get('recipes', {})
+    slot_versions = data.get('slotVersions', {})
+    field_versions = data.get('fieldVersions', {})
+    accepted = []
+    conflicts = []
+
+    for op in ops:
+        kind = op.get('op')
+        if kind in ('upsert', 'delete'):
+            slot_key = op['slot']
+            if slot_versions.get(slot_key, 0) <= expected_version:
+                accepted.append(op)
+                continue
+            current = plan.get(slot_key)
+            wanted = normalize_meal(op['meal'], recipes)[0] if kind == 'upsert' else None
+            if wanted != current:
+                conflicts.append({"slot": slot_key, "current": resolve_meal(current, recipes)})
+        elif kind == 'set':
+            field = op.get('field')
+            if field_versions.get(field, 0) <= expected_version or field in LAST_WRITER_WINS_FIELDS:
+                accepted.append(op)
+            elif data.get(field) != op['value']:
+                conflicts.append({"field": field, "current": data.get(field)})
+        else:
+            accepted.append(op)
+
+    if conflicts:
+        raise VersionConflict(conflicts, data.get('version', 0))
+    return accepted
+
+
+def apply_ops(data, ops, version=None):
+    """
+    Apply journal operations in place, as plan version `version` if given
+
+    Returns [(slot_key, old_meal, new_meal)] with both meals resolved to
+    full recipes, including slots whose stored recipe was replaced.
+    """
+    changes = []
+    plan = data.setdefault('mealPlan', {})
+    recipes = data.setdefault('recipes', {})
+    slot_versions = data.setdefault('slotVersions', {})
+    field_versions = data.setdefault('fieldVersions', {})
+
+    for op in ops:
+        kind = op.get('op')
+        if version is not None and kind in ('upsert', 'delete'):
+            slot_versions[op['slot']] = version
+        elif version is not None and kind == 'set':
+            field_versions[op.get('field')] = version
+
+        if kind == 'upsert':
+            old_meal = resolve_meal(plan.get(op['slot']), recipes)
+            slot, new_recipe = normalize_meal(op['meal'], recipes)
+            if new_recipe is not None:
+                recipes[str(new_recipe['id'])] = new_recipe
+            plan[op['slot']] = slot
+            changes.append((op['slot'], old_meal, resolve_meal(slot, recipes)))
+        elif kind == 'delete':
+            old_meal = plan.pop(op['slot'], None)
+            if old_meal is not None:
+                changes.append((op['slot'], resolve_meal(old_meal, recipes), None))
+        elif kind == 'recipe':
+            key = str(op['recipe']['id'])
+            old_recipe = recipes.get(key)
+            recipes[key] = op['recipe']
+            if old_recipe is not None and old_recipe != op['recipe']:
+                for slot_key, slot in plan.items():
+                    if isinstance(slot, dict) and str(slot.get('recipeId')) == key:
+                        changes.append((slot_key, resolve_meal(slot, {key: old_recipe}), resolve_meal(slot, recipes)))
+        elif kind == 'archive':
+            # Moved to the week archive: gone from the live plan, tombstone included
+            slot_versions.pop(op['slot'], None)
+            old_meal = plan.pop(op['slot'], None)
+            if old_meal is not None:
+                changes.append((op['slot'], resolve_meal(old_meal, recipes), None))
+        elif kind == 'set' and op.get('field') in PLAN_FIELDS:
+            data[op['field']] = op['value']
+
+    if version is not None:
+        data['version'] = max(data.get('version', 0), version)
+    return changes
+
+
+@contextmanager
+def file_lock(path, blocking=True):
+    """
+    Exclusive flock on path, shared with other processes and other threads
+
+    Each call opens its own descriptor, so threads of one process exclude
+    each other too. Yields False instead of waiting when blocking is off
+    and someone else holds it.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+    finally:
+        os.close(fd)
+
+
+def migrate_plan(data):
+    """Convert slots holding full recipe objects to references, returns the number converted"""
+    plan = data.setdefault('mealPlan', {})
+    recipes = data.setdefault('recipes', {})
+    converted = 0
+    for slot_key, meal in list(plan.items()):
+        slot, new_recipe = normalize_meal(meal, recipes)
+        if new_recipe is not None:
+            recipes[str(new_recipe['id'])] = new_recipe
+        if slot is not meal:
+            plan[slot_key] = slot
+            converted += 1
+    return converted
+
+
+class PlanStoreBase:
+    """
+    In-memory meal plan shared by the storage engines
+
+    Subclasses load self.data and implement _exclusive() (cross-process
+    write lock), _commit(), _replace(), _changed_externally() and
+    _reload(). Listeners are called once per change with
+    [(slot_key, old_meal, new_meal)], meals fully resolved (an empty list
+    when only other fields changed), inside the store lock and in write
+    order.
+    self.version counts changes seen by this process, so anything derived
+    from the plan can be cached against it.
+    """
+
+    def __init__(self, defaults):
+        self.defaults = defaults
+        self.lock = threading.RLock()
+        self.listeners = []
+        self.data = copy.deepcopy(defaults)
+        self.version = 0
+
+    def subscribe(self, listener):
+        """Register a callback for slot changes"""
+        self.listeners.append(listener)
+
+    def snapshot(self):
+        """Copy of the stored data (slots and recipes themselves are shared, never mutated)"""
+        with self.lock:
+            return {key: dict(value) if isinstance(value, dict) else value for key, value in self.data.items()}
+
+    def resolved(self):
+        """Copy of the data with every slot expanded to its full meal and no recipe table"""
+        with self.lock:
+            recipes = self.data.get('recipes', {})
+            data = {key: value for key, value in self.data.items() if key != 'recipes'}
+            data['mealPlan'] = {
+                slot_key: resolve_meal(slot, recipes)
+                for slot_key, slot in self.data.get('mealPlan', {}).items()
+            }
+            return data
+
+    def slots_between(self, start, end):
+        """Stored slots whose date falls in [start, end] (YYYY-MM-DD strings), keyed by slot"""
+        with self.lock:
+            return {
+                slot_key: slot for slot_key, slot in self.data.get('mealPlan', {}).items()
+                if start <= slot_key[:10] <= end
+            }
+
+    def deleted_between(self, start, end):
+        """Slots dated in [start, end] that were deleted (tombstones), which hide archived ones"""
+        with self.lock:
+            plan = self.data.get('mealPlan', {})
+            return {
+                slot_key for slot_key in self.data.get('slotVersions', {})
+                if slot_key not in plan and start <= slot_key[:10] <= end
+            }
+
+    def revalidate(self):
+        """Reload if the stored plan was changed outside this store, returns True if it was"""
+        with self.lock:
+            if not self._changed_externally():
+                return False
+            with self._exclusive():
+                return self._refresh()
+
+    def apply(self, ops, expected_version=None):
+        """
+        Apply operations as one new plan version, returns the slot changes
+
+        With expected_version the operations are merged by check_ops and
+        VersionConflict is raised on a real conflict, leaving the plan as
+        it was. UnknownRecipes is raised, also without writing anything,
+        when a slot would reference a recipe the plan doesn't store.
+        """
+        if not ops:
+            return []
+        return self._write(lambda data: require_recipes(data, check_ops(data, ops, expected_version)))
+
+    def update(self, new_data, expected_version=None):
+        """Apply whatever differs between the current data and new_data"""
+        return self._write(lambda data: require_recipes(
+            data, check_ops(data, diff_ops(data, new_data, expected_version), expected_version)
+        ))
+
+    def archive(self, archive, before):
+        """Move slots dated before `before` (YYYY-MM-DD) into a PlanArchive, returns the slot changes"""
+        return self._write(lambda data: archive.archive_ops(data, before))
+
+    def reset(self):
+        """Replace everything with the defaults, as a new version that tombstones every slot"""
+        with self.lock:
+            with self._exclusive():
+                self._refresh()
+                version = self.data.get('version', 0) + 1
+                old_plan = self.resolved()['mealPlan']
+                data = copy.deepcopy(self.defaults)
+                data.update(
+                    version=version,
+                    lastUpdated=utc_now(),
+                    slotVersions=dict.fromkeys(self.data.get('slotVersions', {}), version),
+                    fieldVersions=dict.fromkeys(PLAN_FIELDS, version)
+                )
+                self._replace(data)
+                self.data = data
+                self.version += 1
+                self._notify([(slot_key, meal, None) for slot_key, meal in old_plan.items()])
+
+    def _write(self, make_ops):
+        """Build operations against fresh data and commit them, all under the write locks"""
+        with self.lock:
+            with self._exclusive():
+                self._refresh()
+                ops = make_ops(self.data)
+                if not ops:
+                    return []
+                changes = self._commit(ops, self.data.get('version', 0) + 1, utc_now())
+                self.version += 1
+                self._notify(changes)
+            self._committed()
+        return changes
+
+    def _refresh(self):
+        """Reload and notify if changed externally (caller holds both locks)"""
+        if not self._changed_externally():
+            return False
+        old_plan = self.resolved()['mealPlan']
+        self.data = self._reload()
+        self.version += 1
+        new_plan = self.resolved()['mealPlan']
+        self._notify([
+            (slot_key, old_plan.get(slot_key), new_plan.get(slot_key))
+            for slot_key in old_plan.keys() | new_plan.keys()
+            if old_plan.get(slot_key) != new_plan.get(slot_key)
+        ])
+        return True
+
+    def _committed(self):
+        """Hook run after a write has released the locks"""
+
+    def _notify(self, changes):
+        for listener in self.listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                print(f"Error in meal plan listener: {e}")
+
+
+class MealPlanStore(PlanStoreBase):
+    """
+    Meal plan persisted as a snapshot plus an fsynced append-only journal
+
+    Each write appends one line describing only the slots and fields that
+    changed, so its cost follows the size of the change. Once the journal
+    has compact_every entries a background thread folds it into a new
+    snapshot. On startup the snapshot is loaded and the journal replayed.
+
+    Several processes can share the files: writes hold an flock on
+    <journal>.lock and first reload anything another process wrote, and
+    compaction and reset hold <journal>.compact.lock.
+
+    With durability='coalesce' a write is acknowledged once applied in
+    memory, and the entries of the next flush_window seconds are appended
+    with one write and one fsync. The journal lock stays held until that
+    flush so other processes never read a plan missing buffered writes.
+    A crash can lose up to one window of acknowledged writes; pending
+    entries are flushed on close and at interpreter exit.
+    """
+
+    def __init__(self, snapshot_file, journal_file, defaults, compact_every=200,
+                 durability='fsync', flush_window=0.25):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        super().__init__(defaults)
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file
+        self.rotated_journal_file = journal_file + '.old'
+        self.lock_file = journal_file + '.lock'
+        self.compact_lock_file = journal_file + '.compact.lock'
+        self.compact_every = compact_every
+        self.compacting = False
+        self.journal_entries = 0
+        self.durability = durability
+        self.flush_window = flush_window
+        self.pending = []
+        self.window_lock = None
+        self.flush_timer = None
+        with self._exclusive():
+            self.data = self.recover()
+            self.journal = open(self.journal_file, 'a')
+            self.file_state = self._file_state()
+        if durability == 'coalesce':
+            atexit.register(self.flush)
+
+    def recover(self):
+        """Load the snapshot and replay any journal written after it"""
+        data = copy.deepcopy(self.defaults)
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, 'r') as f:
+                    data.update(json.load(f))
+            except Exception as e:
+                print(f"Error loading meal plan: {e}")
+
+        # Older files store the whole recipe in every slot
+        converted = migrate_plan(data)
+        if converted:
+            self._write_snapshot(data)
+            print(f"Migrated {converted} meal plan slots to recipe references")
+
+        # A rotated journal only survives if compaction was interrupted; its
+        # operations are idempotent so replaying them again is safe
+        for path in (self.rotated_journal_file, self.journal_file):
+            if not os.path.exists(path):
+                continue
+            good_bytes = 0
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn write from a crash; nothing after it was acknowledged
+                        print(f"Dropping damaged journal entry in {os.path.basename(path)}")
+                        break
+                    apply_ops(data, record['ops'], record.get('version') or data.get('version', 0) + 1)
+                    data['lastUpdated'] = record['at']
+                    self.journal_entries += 1
+                    good_bytes += len(line)
+            # Cut the damaged tail so new entries aren't appended after it
+            if good_bytes < os.path.getsize(path):
+                os.truncate(path, good_bytes)
+
+        return data
+
+    @contextmanager
+    def _exclusive(self):
+        if self.durability == 'fsync':
+            with file_lock(self.lock_file):
+                yield
+            return
+
+        # Coalescing keeps the lock from the first buffered write until the flush
+        if self.window_lock is None:
+            self.window_lock = ExitStack()
+            self.window_lock.enter_context(file_lock(self.lock_file))
+        try:
+            yield
+        finally:
+            if not self.pending:
+                self._release_window()
+
+    def _commit(self, ops, version, at):
+        line = json.dumps({"at": at, "version": version, "ops": ops}, separators=(',', ':')) + '\n'
+        if self.durability == 'fsync':
+            self.journal.write(line)
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+        else:
+            self.pending.append(line)
+            if self.flush_timer is None:
+                self.flush_timer = threading.Timer(self.flush_window, self.flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+
+        changes = apply_ops(self.data, ops, version)
+        self.data['lastUpdated'] = at
+        self.journal_entries += 1
+        self._record(self.journal_file)
+        return changes
+
+    def flush(self):
+        """Write any coalesced journal entries with one fsync and release the journal lock"""
+        with self.lock:
+            try:
+                self._write_pending()
+            except Exception as e:
+                # Keep the entries (and the lock) and try again next window
+                print(f"Error flushing meal plan journal: {e}")
+                self.flush_timer = threading.Timer(self.flush_window, self.flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+                return
+            self._release_window()
+
+    def _write_pending(self):
+        """Append the coalesced entries (caller holds the store lock)"""
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        if not self.pending:
+            return
+        self.journal.write(''.join(self.pending))
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        self.pending = []
+        self._record(self.journal_file)
+
+    def _release_window(self):
+        if self.window_lock is not None:
+            self.window_lock.close()
+            self.window_lock = None
+
+    def _committed(self):
+        with self.lock:
+            if self.journal_entries < self.compact_every or self.compacting:
+                return
+            self.compacting = True
+        threading.Thread(target=self.compact, name='meal-plan-compaction', daemon=True).start()
+
+    def reset(self):
+        # Wait out any compaction so it can't write its older snapshot over ours
+        with file_lock(self.compact_lock_file):
+            super().reset()
+
+    def _replace(self, data):
+        """Write data as the snapshot and start an empty journal (caller holds both locks)"""
+        # Buffered entries predate data and would only be thrown away with the journal
+        self.pending = []
+        self._write_snapshot(data)
+        self.journal.close()
+        self.journal = open(self.journal_file, 'w')
+        self.journal_entries = 0
+        if os.path.exists(self.rotated_journal_file):
+            os.remove(self.rotated_journal_file)
+        self.file_state = self._file_state()
+
+    def compact(self):
+        """Fold the journal into a new snapshot without blocking writers for the write itself"""
+        try:
+            with file_lock(self.compact_lock_file, blocking=False) as locked:
+                if not locked:
+                    # Another process is compacting the same files
+                    return
+
+                with self.lock:
+                    with self._exclusive():
+                        self._write_pending()
+                        self._refresh()
+                        data = self.snapshot()
+                        self.journal.close()
+                        if os.path.exists(self.rotated_journal_file):
+                            # An earlier compaction didn't finish; keep its entries too
+                            with open(self.journal_file, 'r') as src, open(self.rotated_journal_file, 'a') as dst:
+                                dst.write(src.read())
+                            os.remove(self.journal_file)
+                        else:
+                            os.replace(self.journal_file, self.rotated_journal_file)
+                        self.journal = open(self.journal_file, 'a')
+                        self.journal_entries = 0
+                        self.file_state = self._file_state()
+
+                # Only this process may write the snapshot while it holds the compaction lock
+                self._write_snapshot(data)
+                self._record(self.snapshot_file)
+                # Same order as writers (store lock, then file lock) to avoid deadlock
+                with self.lock:
+                    with self._exclusive():
+                        os.remove(self.rotated_journal_file)
+                        self._record(self.rotated_journal_file)
+        except Exception as e:
+            print(f"Error compacting meal plan journal: {e}")
+        finally:
+            with self.lock:
+                self.compacting = False
+
+    def _file_state(self, *paths):
+        """(mtime, size) per file, to notice writes by other processes"""
+        state = {}
+        for path in paths or (self.snapshot_file, self.journal_file, self.rotated_journal_file):
+            try:
+                stat = os.stat(path)
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                state[path] = None
+        return state
+
+    def _record(self, *paths):
+        """Remember the state of files this process just wrote"""
+        with self.lock:
+            self.file_state.update(self._file_state(*paths))
+
+    def _changed_externally(self):
+        return self._file_state() != self.file_state
+
+    def _reload(self):
+        self.journal.close()
+        self.journal_entries = 0
+        data = self.recover()
+        self.journal = open(self.journal_file, 'a')
+        self.file_state = self._file_state()
+        return data
+
+    def close(self):
+        """Flush and close the journal (the store can't be written afterwards)"""
+        with self.lock:
+            self.flush()
+            self.journal.close()
+
+    def _write_snapshot(self, data):
+        """Write the snapshot atomically (temp file plus rename)"""
+        tmp_file = self.snapshot_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+
+def create_store(data_dir, defaults):
+    """
+    Build the meal plan store selected by MEAL_PLAN_BACKEND (json or sqlite)
+
+    json keeps meal_plan.json plus a journal, compacted every
+    MEAL_PLAN_COMPACT_EVERY entries. sqlite uses MEAL_PLAN_DB (default
+    meal_plan.db) and imports meal_plan.json the first time it is empty.
+    MEAL_PLAN_DURABILITY picks fsync (default) or coalesce, with writes
+    gathered for MEAL_PLAN_FLUSH_MS milliseconds.
+    """
+    backend = os.environ.get('MEAL_PLAN_BACKEND', 'json')
+    durability = os.environ.get('MEAL_PLAN_DURABILITY', 'fsync')
+    flush_window = int(os.environ.get('MEAL_PLAN_FLUSH_MS', 250)) / 1000
+    snapshot_file = os.path.join(data_dir, 'meal_plan.json')
+    journal_file = os.path.join(data_dir, 'meal_plan.journal')
+
+    if backend == 'json':
+        return MealPlanStore(snapshot_file, journal_file, defaults,
+                             compact_every=int(os.environ.get('MEAL_PLAN_COMPACT_EVERY', 200)),
+                             durability=durability, flush_window=flush_window)
+    elif backend == 'sqlite':
+        from plan_sqlite import SQLiteMealPlanStore
+
+        def import_json():
+            if not os.path.exists(snapshot_file):
+                return copy.deepcopy(defaults)
+            store = MealPlanStore(snapshot_file, journal_file, defaults)
+            store.close()
+            return store.snapshot()
+
+        return SQLiteMealPlanStore(
+            os.environ.get('MEAL_PLAN_DB', os.path.join(data_dir, 'meal_plan.db')), defaults,
+            import_data=import_json, durability=durability
+        )
+    else:
+        raise ValueError(f"Unknown MEAL_PLAN_BACKEND: {backend}")
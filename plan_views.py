@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Materialized Meal Plan Views
+Per-ISO-week ingredient totals and per-day macros, updated slot by slot
+"""
+
+import threading
+from collections import Counter
+from datetime import date
+
+from ingredients import normalize_ingredient_name
+from shopping import display_amount, ingredient_cost, price_rows, slot_date, unit_info
+
+MACROS = ('calories', 'protein', 'carbs', 'fat')
+
+
+def week_key(day):
+    """ISO week key for a date, e.g. "2026-W08\""""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def parse_week(value):
+    """Accept "2026-W08" or any YYYY-MM-DD inside the week, returns the week key"""
+    if 'W' in value:
+        year, week = value.split('-W')
+        return week_key(date.fromisocalendar(int(year), int(week), 1))
+    return week_key(date.fromisoformat(value))
+
+
+def weeks_between(first, last):
+    """All week keys from first to last inclusive"""
+    start = date.fromisocalendar(*map(int, first.split('-W')), 1)
+    end = date.fromisocalendar(*map(int, last.split('-W')), 1)
+    keys = []
+    while start <= end:
+        keys.append(week_key(start))
+        start = date.fromordinal(start.toordinal() + 7)
+    return keys
+
+
+class WeekAggregate:
+    """Running totals for one ISO week"""
+
+    def __init__(self):
+        self.ingredients = {}
+        self.days = {}
+        self.slots = 0
+
+
+class PlanViews:
+    """
+    Materialized shopping and macro aggregates per ISO week
+
+    Each slot change subtracts the old meal's contribution and adds the new
+    one, so reading a week costs the size of that week rather than the size
+    of the whole plan history. Per-serving and fixed amounts are kept apart
+    so any servings count can be applied when the view is read.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.weeks = {}
+        self.loaded = False
+
+    def rebuild(self, meal_plan):
+        """Recompute every week from scratch"""
+        with self.lock:
+            self.weeks = {}
+            for slot_key, meal in meal_plan.items():
+                self._apply(slot_key, meal, 1)
+            self.loaded = True
+
+    def ensure_loaded(self, load_meal_plan):
+        """Build the views on first use"""
+        if not self.loaded:
+            self.rebuild(load_meal_plan())
+
+    def update_slot(self, slot_key, old_meal, new_meal):
+        """Replace one slot's contribution"""
+        with self.lock:
+            self._apply(slot_key, old_meal, -1)
+            self._apply(slot_key, new_meal, 1)
+
+    def apply_changes(self, changes):
+        """Meal plan store listener: apply [(slot_key, old_meal, new_meal)] once loaded"""
+        if not self.loaded:
+            return
+        with self.lock:
+            for slot_key, old_meal, new_meal in changes:
+                self._apply(slot_key, old_meal, -1)
+                self._apply(slot_key, new_meal, 1)
+
+    def _apply(self, slot_key, meal, sign):
+        """Add (sign=1) or remove (sign=-1) a meal's contribution (caller holds the lock)"""
+        day = slot_date(slot_key)
+        if not isinstance(meal, dict) or day is None:
+            return
+
+        key = week_key(day)
+        week = self.weeks.setdefault(key, WeekAggregate())
+        week.slots += sign
+        meal_name = meal.get('name', '')
+
+        for ing in meal.get('ingredients') or []:
+            name = normalize_ingredient_name(ing.get('name', ''))
+            unit = (ing.get('unit') or '').strip().lower()
+            dimension, factor = unit_info(unit)
+            row_key = (name.lower().replace(' ', '_'), dimension)
+
+            row = week.ingredients.get(row_key)
+            if row is None:
+                row = week.ingredients[row_key] = {
+                    "name": name,
+                    "dimension": dimension,
+                    "perServing": 0.0,
+                    "fixed": 0.0,
+                    "units": Counter(),
+                    "meals": Counter(),
+                    "contributions": 0
+                }
+
+            amount = float(ing.get('amount') or 0) * factor * sign
+            if ing.get('perServing', True) is not False:
+                row['perServing'] += amount
+            else:
+                row['fixed'] += amount
+            row['units'][unit] += sign
+            row['meals'][meal_name] += sign
+            row['contributions'] += sign
+
+            if row['contributions'] <= 0:
+                del week.ingredients[row_key]
+
+        day_key = day.isoformat()
+        totals = week.days.setdefault(day_key, dict.fromkeys(MACROS + ('meals',), 0))
+        for macro in MACROS:
+            totals[macro] += (meal.get(macro) or 0) * sign
+        totals['meals'] += sign
+        if totals['meals'] <= 0:
+            del week.days[day_key]
+
+        if week.slots <= 0:
+            del self.weeks[key]
+
+    def view(self, week_keys, servings=1, unit_prices=None):
+        """Merged shopping list and daily macros for a set of weeks, priced when unit_prices is given"""
+        with self.lock:
+            merged = {}
+            days = {}
+            for key in week_keys:
+                week = self.weeks.get(key)
+                if week is None:
+                    continue
+                for row_key, row in week.ingredients.items():
+                    target = merged.get(row_key)
+                    if target is None:
+                        target = merged[row_key] = {
+                            "name": row['name'],
+                            "dimension": row['dimension'],
+                            "total": 0.0,
+                            "units": Counter(),
+                            "meals": Counter()
+                        }
+                    target['total'] += row['perServing'] * servings + row['fixed']
+                    target['units'].update(row['units'])
+                    target['meals'].update(row['meals'])
+                days.update({day: dict(totals) for day, totals in week.days.items()})
+
+        ingredients = []
+        costs = []
+        for row in sorted(merged.values(), key=lambda r: r['total'], reverse=True):
+            amount, unit = display_amount(row['total'], row['dimension'], {u for u, n in row['units'].items() if n > 0})
+            ingredients.append({
+                "name": row['name'],
+                "amount": round(amount, 1),
+                "unit": unit,
+                "meals": [name for name, count in row['meals'].items() if count > 0]
+            })
+            if unit_prices is not None:
+                costs.append(ingredient_cost(unit_prices, row['name'], row['dimension'], row['total']))
+
+        meal_count = sum(totals['meals'] for totals in days.values())
+        macro_totals = {macro: sum(totals[macro] for totals in days.values()) for macro in MACROS}
+        daily_average = {
+            macro: round(value / len(days)) if days else 0
+            for macro, value in macro_totals.items()
+        }
+
+        result = {
+            "weeks": list(week_keys),
+            "mealCount": meal_count,
+            "servings": servings,
+            "ingredients": ingredients,
+            "macros": {
+                "days": dict(sorted(days.items())),
+                "totals": macro_totals,
+                "dailyAverage": daily_average
+            }
+        }
+        if unit_prices is not None:
+            result['estimatedCost'] = price_rows(ingredients, costs)
+        return result
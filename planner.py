@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Meal Plan Generator
+Fills empty slots toward daily calorie and protein targets, avoiding repeats and reusing ingredients
+"""
+
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+from ingredients import normalize_ingredient_name
+
+MEAL_TYPES = ('breakfast', 'lunch', 'dinner', 'snacks')
+
+# Share of the day's calories and protein each meal aims for
+MEAL_SHARES = {'breakfast': 0.25, 'lunch': 0.3, 'dinner': 0.35, 'snacks': 0.1}
+
+# Tags that make a recipe a snack; snacks go in the snacks slot, meals everywhere else
+SNACK_TAGS = {'snack', 'dessert'}
+
+DEFAULT_TARGETS = {"calories": 2000, "protein": 150}
+
+# Score weights: calorie miss and protein shortfall (as fractions of the daily
+# target), share of ingredients already on the shopping list, wrong meal type
+WEIGHTS = {"calories": 4.0, "protein": 2.0, "reuse": 1.0, "mealType": 1.0}
+
+
+def meal_ingredients(meal):
+    """Canonical ingredient names of a recipe or full meal"""
+    return {normalize_ingredient_name(ing.get('name', '')) for ing in meal.get('ingredients') or []} - {''}
+
+
+class RecipeFeatures:
+    """
+    Feature vectors of the recipe library, kept in step with a RecipeCatalog
+
+    Calories, protein and a snack flag are NumPy arrays indexed by row;
+    ingredients are one row index per (recipe, ingredient) pair, so the
+    number of already-bought ingredients in every recipe is one bincount.
+    Catalog changes only mark the arrays stale; they are rebuilt on the
+    next plan, once per catalog change rather than per request.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.recipes = {}
+        self.stale = True
+
+    def apply_changes(self, changes):
+        """RecipeCatalog listener: [(recipe_id, old_recipe, new_recipe)]"""
+        with self.lock:
+            for recipe_id, _, recipe in changes:
+                if recipe is None:
+                    self.recipes.pop(str(recipe_id), None)
+                else:
+                    self.recipes[str(recipe_id)] = recipe
+            self.stale = True
+
+    def build(self):
+        """Rebuild the arrays if the catalog changed (caller holds self.lock)"""
+        if not self.stale:
+            return
+        self.ids = list(self.recipes)
+        self.rows = {recipe_id: row for row, recipe_id in enumerate(self.ids)}
+        self.calories = np.array([float(r.get('calories') or 0) for r in self.recipes.values()])
+        self.protein = np.array([float(r.get('protein') or 0) for r in self.recipes.values()])
+        self.snack = np.array([bool(SNACK_TAGS & {tag.lower() for tag in r.get('tags') or []})
+                               for r in self.recipes.values()], dtype=bool)
+
+        self.ingredient_ids = {}
+        entry_rows = []
+        entry_ingredients = []
+        for row, recipe in enumerate(self.recipes.values()):
+            for name in meal_ingredients(recipe):
+                entry_rows.append(row)
+                entry_ingredients.append(self.ingredient_ids.setdefault(name, len(self.ingredient_ids)))
+        self.entry_rows = np.array(entry_rows, dtype=np.intp)
+        self.entry_ingredients = np.array(entry_ingredients, dtype=np.intp)
+        self.ingredient_counts = np.bincount(self.entry_rows, minlength=len(self.ids))
+        # Entries are in row order, so a recipe's ingredients are one slice
+        self.offsets = np.concatenate([[0], np.cumsum(self.ingredient_counts)])
+        self.stale = False
+
+    def plan(self, start, days, filled=None, targets=None, no_repeat_days=3, seed=None):
+        """
+        Recipe ids for the empty slots of `days` days from `start`
+
+        filled maps slot keys to the meals already planned (full meals or
+        {"recipeId": id} references) in and just before the range; they
+        count toward each day's targets, the ingredients already bought and
+        the repeat window. Returns {slot_key: recipe_id}.
+        """
+        with self.lock:
+            self.build()
+            return GreedyPlanner(self, targets, no_repeat_days, seed).plan(start, days, filled or {})
+
+
+class GreedyPlanner:
+    """
+    One greedy pass over the empty slots, day by day
+
+    Each slot aims for its meal's share of what is left of the day's
+    targets. Every candidate recipe is scored at once from the feature
+    arrays: calorie miss, protein shortfall, share of its ingredients
+    already bought and meal type fit; recipes eaten within no_repeat_days
+    days of the slot are excluded, counting meals already planned after
+    it as well as before. A little noise breaks ties, so
+    plans vary from run to run unless a seed is given.
+    """
+
+    def __init__(self, features, targets=None, no_repeat_days=3, seed=None):
+        self.features = features
+        self.targets = dict(DEFAULT_TARGETS, **(targets or {}))
+        self.no_repeat_days = no_repeat_days
+        self.rng = np.random.default_rng(seed)
+        self.last_day = np.full(len(features.ids), np.iinfo(np.int64).min // 2, dtype=np.int64)
+        self.bought = np.zeros(len(features.ingredient_ids), dtype=bool)
+        # Rows and day numbers of the meals already planned, before or after the range
+        self.filled_rows = []
+        self.filled_days = []
+
+    def meal_macros(self, meal):
+        """(calories, protein) of a planned meal, looked up in the library for references"""
+        row = self.features.rows.get(str(meal.get('recipeId', meal.get('id'))))
+        if 'calories' not in meal and row is not None:
+            return self.features.calories[row], self.features.protein[row]
+        return float(meal.get('calories') or 0), float(meal.get('protein') or 0)
+
+    def record(self, day_number, meal):
+        """Count an already planned meal toward the repeat window and the ingredients bought"""
+        features = self.features
+        row = features.rows.get(str(meal.get('recipeId', meal.get('id'))))
+        if row is not None:
+            self.filled_rows.append(row)
+            self.filled_days.append(day_number)
+        names = meal_ingredients(meal) if meal.get('ingredients') else (
+            meal_ingredients(features.recipes[features.ids[row]]) if row is not None else set()
+        )
+        for name in names:
+            ingredient = features.ingredient_ids.get(name)
+            if ingredient is not None:
+                self.bought[ingredient] = True
+
+    def choose(self, day_number, meal_type, calories, protein):
+        """Row of the best recipe for one slot aiming at calories and protein"""
+        features = self.features
+        score = -WEIGHTS['calories'] * np.abs(features.calories - calories) / self.targets['calories']
+        score -= WEIGHTS['protein'] * np.maximum(protein - features.protein, 0) / self.targets['protein']
+
+        reused = np.bincount(features.entry_rows, weights=self.bought[features.entry_ingredients],
+                             minlength=len(features.ids))
+        score += WEIGHTS['reuse'] * reused / np.maximum(features.ingredient_counts, 1)
+        score -= WEIGHTS['mealType'] * (features.snack != (meal_type == 'snacks'))
+        score += self.rng.uniform(0, 0.05, len(features.ids))
+
+        # Days to each recipe's nearest use; planned meals may come after this slot
+        gap = day_number - self.last_day
+        np.minimum.at(gap, self.filled_rows, np.abs(self.filled_days - day_number))
+        recent = gap < self.no_repeat_days
+        if recent.all():
+            # Too few recipes for the window: take the one eaten furthest from this day
+            return int(np.argmax(gap))
+        score[recent] = -np.inf
+        return int(np.argmax(score))
+
+    def plan(self, start, days, filled):
+        features = self.features
+        if not features.ids:
+            return {}
+
+        planned = {}
+        for slot_key, meal in filled.items():
+            if not isinstance(meal, dict):
+                continue
+            try:
+                day_number = (date.fromisoformat(slot_key[:10]) - start).days
+            except ValueError:
+                continue
+            self.record(day_number, meal)
+            planned.setdefault(slot_key[:10], []).append(meal)
+        self.filled_rows = np.array(self.filled_rows, dtype=np.intp)
+        self.filled_days = np.array(self.filled_days, dtype=np.int64)
+
+        result = {}
+        for day_number in range(days):
+            day = (start + timedelta(days=day_number)).isoformat()
+            calories = self.targets['calories']
+            protein = self.targets['protein']
+            for meal in planned.get(day, []):
+                meal_calories, meal_protein = self.meal_macros(meal)
+                calories -= meal_calories
+                protein -= meal_protein
+
+            empty = [meal_type for meal_type in MEAL_TYPES if not filled.get(f"{day}-{meal_type}")]
+            for position, meal_type in enumerate(empty):
+                share = MEAL_SHARES[meal_type] / sum(MEAL_SHARES[rest] for rest in empty[position:])
+                row = self.choose(day_number, meal_type, max(calories, 0) * share, max(protein, 0) * share)
+                result[f"{day}-{meal_type}"] = features.recipes[features.ids[row]]['id']
+                calories -= features.calories[row]
+                protein -= features.protein[row]
+                self.last_day[row] = day_number
+                self.bought[features.entry_ingredients[features.offsets[row]:features.offsets[row + 1]]] = True
+        return result
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Recipe Catalog
+Recipes served from data/recipes.json, paged and projected for the recipe list
+"""
+
+import json
+import os
+import threading
+
+# Fields a list request may project to
+RECIPE_FIELDS = ('id', 'name', 'image', 'calories', 'protein', 'carbs', 'fat', 'servings',
+                 'tags', 'source', 'url', 'ingredients', 'directions')
+
+
+class RecipeCatalog:
+    """
+    The recipe library, loaded from a JSON list of recipe objects
+
+    The file is reloaded when its mtime changes, so it can be edited while
+    the server runs. self.version changes with every reload, for caching
+    responses built from the catalog. Listeners are called with
+    [(recipe_id, old_recipe, new_recipe)] for the recipes a reload added,
+    changed or removed (None for the missing side).
+    """
+
+    def __init__(self, recipes_file):
+        self.recipes_file = recipes_file
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.mtime = None
+        self.recipes = []
+        self.by_id = {}
+        self.positions = {}
+        self.version = 0
+
+    def subscribe(self, listener):
+        """Register a callback for recipe changes, called at once with every current recipe"""
+        self.load()
+        with self.lock:
+            self.listeners.append(listener)
+            listener([(recipe_id, None, recipe) for recipe_id, recipe in self.by_id.items()])
+
+    def load(self):
+        """Reload the file if it changed, returns the recipes in file order"""
+        with self.lock:
+            try:
+                mtime = os.stat(self.recipes_file).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if mtime != self.mtime:
+                recipes = []
+                if mtime is not None:
+                    try:
+                        with open(self.recipes_file, 'r') as f:
+                            recipes = json.load(f)
+                    except Exception as e:
+                        print(f"Error loading recipes: {e}")
+                        recipes = self.recipes
+                by_id = {str(recipe['id']): recipe for recipe in recipes}
+                changes = [
+                    (recipe_id, self.by_id.get(recipe_id), by_id.get(recipe_id))
+                    for recipe_id in self.by_id.keys() | by_id.keys()
+                    if self.by_id.get(recipe_id) != by_id.get(recipe_id)
+                ]
+                self.mtime = mtime
+                self.recipes = recipes
+                self.by_id = by_id
+                self.positions = {recipe_id: position for position, recipe_id in enumerate(by_id)}
+                self.version += 1
+                self._notify(changes)
+            return self.recipes
+
+    def _notify(self, changes):
+        if not changes:
+            return
+        for listener in self.listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                print(f"Error in recipe listener: {e}")
+
+    def ordered(self, recipe_ids):
+        """Recipe ids in catalog (file) order"""
+        self.load()
+        return sorted(recipe_ids, key=lambda recipe_id: self.positions.get(str(recipe_id), len(self.positions)))
+
+    def get(self, recipe_id):
+        """One full recipe by id, or None"""
+        self.load()
+        return self.by_id.get(str(recipe_id))
+
+    def page(self, offset=0, limit=50, fields=None, ids=None):
+        """
+        A page of recipes, returns (recipes, total)
+
+        fields limits each recipe to those keys (see RECIPE_FIELDS) and
+        ids to the recipes with those ids, in the order given. The file is
+        checked once per page, not once per id.
+        """
+        recipes = self.load()
+        if ids is not None:
+            with self.lock:
+                by_id = self.by_id
+            recipes = [recipe for recipe in (by_id.get(str(recipe_id)) for recipe_id in ids) if recipe is not None]
+
+        selected = recipes[offset:offset + limit]
+        if fields:
+            selected = [{field: recipe[field] for field in fields if field in recipe} for recipe in selected]
+        return selected, len(recipes)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Recipe Costs
+Per-serving recipe costs from scraped supermarket prices, recomputed only where prices change
+"""
+
+import json
+import os
+import threading
+
+from ingredients import normalize_ingredient_name
+from shopping import unit_info
+
+# Stores in prices_cache.json, as written by the scrapers
+STORES = ('coles', 'woolworths')
+
+
+def product_price(entry):
+    """Shelf price of one scraped product, the special price when it is on special (None for demo prices)"""
+    if not isinstance(entry, dict) or entry.get('demo'):
+        return None
+    price = entry.get('special_price') if entry.get('special') and entry.get('special_price') else entry.get('price')
+    return float(price) if isinstance(price, (int, float)) and price > 0 else None
+
+
+def load_json(path, default):
+    """(mtime, parsed file), the default when it is missing or unreadable"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None, default
+    try:
+        with open(path, 'r') as f:
+            return mtime, json.load(f)
+    except Exception as e:
+        print(f"Error loading {os.path.basename(path)}: {e}")
+        return mtime, default
+
+
+class RecipeCosts:
+    """
+    Materialized per-serving cost of every recipe in a RecipeCatalog
+
+    The mapping file links ingredient names (any alias) to a tracked product
+    and the quantity its price buys, e.g. {"Chicken Breast": {"product":
+    "chicken-breast", "amount": 1, "unit": "kg"}}. The cheaper store's
+    price from the price cache gives each ingredient a price per base unit
+    (g, ml or each). Products, ingredients and recipes form a dependency
+    graph, so a scrape that changes a few prices, a mapping edit or a
+    recipe edit recomputes only the recipes downstream of the change.
+
+    A recipe's cost is {"perServing", "fixed", "pricedIngredients",
+    "unpriced"}: perServing sums the per-person ingredients, fixed the ones
+    used once per meal, so a meal for n people costs perServing * n + fixed.
+    """
+
+    def __init__(self, prices_file, mapping_file):
+        self.prices_file = prices_file
+        self.mapping_file = mapping_file
+        self.lock = threading.Lock()
+        self.prices_mtime = self.mapping_mtime = None
+        self.products = {}
+        self.mapping = {}
+        self.unit_prices = {}
+        self.product_ingredients = {}
+        self.ingredient_recipes = {}
+        self.recipe_ingredients = {}
+        self.recipes = {}
+        self.costs = {}
+
+    def apply_changes(self, changes):
+        """RecipeCatalog listener: [(recipe_id, old_recipe, new_recipe)]"""
+        with self.lock:
+            for recipe_id, _, recipe in changes:
+                recipe_id = str(recipe_id)
+                for name in self.recipe_ingredients.pop(recipe_id, ()):
+                    self.ingredient_recipes[name].discard(recipe_id)
+                self.recipes.pop(recipe_id, None)
+                self.costs.pop(recipe_id, None)
+                if recipe is None:
+                    continue
+
+                names = {normalize_ingredient_name(ing.get('name', '')) for ing in recipe.get('ingredients') or []}
+                for name in names:
+                    self.ingredient_recipes.setdefault(name, set()).add(recipe_id)
+                self.recipe_ingredients[recipe_id] = names
+                self.recipes[recipe_id] = recipe
+                self.costs[recipe_id] = self._recipe_cost(recipe)
+
+    def refresh(self):
+        """
+        Pick up new prices or mapping edits, returns how many recipes were recomputed
+
+        Only the ingredients whose product price or mapping changed get a
+        new unit price, and only the recipes using them are recomputed.
+        """
+        with self.lock:
+            changed = set()
+
+            mtime = self._mtime(self.mapping_file)
+            if mtime != self.mapping_mtime:
+                self.mapping_mtime, mapping = load_json(self.mapping_file, {})
+                # Keys may be any alias; the graph is keyed by canonical name
+                mapping = {normalize_ingredient_name(name): entry for name, entry in mapping.items()
+                           if isinstance(entry, dict)}
+                changed |= {name for name in self.mapping.keys() | mapping.keys()
+                            if self.mapping.get(name) != mapping.get(name)}
+                self.mapping = mapping
+                self.product_ingredients = {}
+                for name, entry in mapping.items():
+                    self.product_ingredients.setdefault(entry.get('product'), set()).add(name)
+
+            mtime = self._mtime(self.prices_file)
+            if mtime != self.prices_mtime:
+                self.prices_mtime, cache = load_json(self.prices_file, {})
+                products = {}
+                for store in STORES:
+                    for product_id, entry in (cache.get(store) or {}).items():
+                        price = product_price(entry)
+                        if price is not None and (product_id not in products or price < products[product_id][0]):
+                            products[product_id] = (price, store)
+                for product_id in self.products.keys() | products.keys():
+                    if self.products.get(product_id) != products.get(product_id):
+                        changed |= self.product_ingredients.get(product_id, set())
+                self.products = products
+
+            affected = set()
+            for name in changed:
+                self._update_unit_price(name)
+                affected |= self.ingredient_recipes.get(name, set())
+            for recipe_id in affected:
+                self.costs[recipe_id] = self._recipe_cost(self.recipes[recipe_id])
+            return len(affected)
+
+    def _mtime(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _update_unit_price(self, name):
+        """Recompute one ingredient's price per base unit (caller holds the lock)"""
+        entry = self.mapping.get(name)
+        product = self.products.get(entry.get('product')) if isinstance(entry, dict) else None
+        if product is None or not entry.get('amount'):
+            self.unit_prices.pop(name, None)
+            return
+        dimension, factor = unit_info(entry.get('unit'))
+        price, store = product
+        self.unit_prices[name] = (dimension, price / (float(entry['amount']) * factor), entry['product'], store)
+
+    def _recipe_cost(self, recipe):
+        """Cost entry for one recipe from the current unit prices (caller holds the lock)"""
+        per_serving = fixed = 0.0
+        priced = 0
+        unpriced = []
+        for ing in recipe.get('ingredients') or []:
+            name = normalize_ingredient_name(ing.get('name', ''))
+            dimension, factor = unit_info(ing.get('unit'))
+            unit_price = self.unit_prices.get(name)
+            if unit_price is None or unit_price[0] != dimension:
+                if name not in unpriced:
+                    unpriced.append(name)
+                continue
+            cost = float(ing.get('amount') or 0) * factor * unit_price[1]
+            if ing.get('perServing', True) is not False:
+                per_serving += cost
+            else:
+                fixed += cost
+            priced += 1
+        return {
+            "perServing": round(per_serving, 2),
+            "fixed": round(fixed, 2),
+            "pricedIngredients": priced,
+            "unpriced": unpriced
+        }
+
+    def cost(self, recipe_id):
+        """Cost entry of one recipe, or None"""
+        with self.lock:
+            return self.costs.get(str(recipe_id))
+
+    def costs_of(self, recipe_ids):
+        """{recipe_id: cost entry} for the recipes that have one"""
+        with self.lock:
+            return {str(recipe_id): self.costs[str(recipe_id)] for recipe_id in recipe_ids if str(recipe_id) in self.costs}
+
+    def ingredient_prices(self):
+        """{ingredient name: (dimension, price per base unit)} for pricing shopping lists"""
+        with self.lock:
+            return {name: (dimension, price) for name, (dimension, price, _, _) in self.unit_prices.items()}
+
+    def product_of(self, name):
+        """Tracked product id an ingredient name maps to, or None"""
+        with self.lock:
+            entry = self.mapping.get(normalize_ingredient_name(name))
+            return entry.get('product') if entry else None
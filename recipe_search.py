@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Recipe Search Index
+Inverted prefix index over names, tags and ingredients, plus sorted macro indexes
+"""
+
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from ingredients import normalize_ingredient_name
+
+# Text fields a query term can match
+SEARCH_FIELDS = ('name', 'tag', 'ingredient')
+
+# Macros with a sorted index for range filters
+NUMERIC_FIELDS = ('calories', 'protein')
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def words(text):
+    """Lowercase alphanumeric words of a string (emoji and punctuation dropped)"""
+    return WORD_RE.findall((text or '').lower())
+
+
+def recipe_terms(recipe):
+    """{field: set of words} indexed for one recipe"""
+    return {
+        "name": set(words(recipe.get('name'))),
+        "tag": {word for tag in recipe.get('tags') or [] for word in words(tag)},
+        "ingredient": {
+            word for ing in recipe.get('ingredients') or []
+            for word in words(normalize_ingredient_name(ing.get('name', '')))
+        }
+    }
+
+
+class TermIndex:
+    """Postings for one text field, with the terms kept sorted for prefix lookups"""
+
+    def __init__(self):
+        self.terms = []
+        self.postings = {}
+
+    def add(self, term, recipe_id):
+        ids = self.postings.get(term)
+        if ids is None:
+            ids = self.postings[term] = set()
+            insort(self.terms, term)
+        ids.add(recipe_id)
+
+    def remove(self, term, recipe_id):
+        ids = self.postings.get(term)
+        if ids is None:
+            return
+        ids.discard(recipe_id)
+        if not ids:
+            del self.postings[term]
+            del self.terms[bisect_left(self.terms, term)]
+
+    def prefix(self, prefix):
+        """Ids of recipes with any term starting with prefix"""
+        matches = set()
+        for term in self.terms[bisect_left(self.terms, prefix):bisect_left(self.terms, prefix + '\uffff')]:
+            matches |= self.postings[term]
+        return matches
+
+
+class RecipeSearchIndex:
+    """
+    Search index kept in step with a RecipeCatalog
+
+    Each text field has its own inverted index; every query word must
+    prefix-match some indexed word (AND across words). Calories and protein
+    are kept as sorted (value, id) lists, so range filters are two bisects.
+    Catalog changes are applied recipe by recipe through update(), so a
+    change to one recipe costs that recipe's terms, not a rebuild.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fields = {field: TermIndex() for field in SEARCH_FIELDS}
+        self.numeric = {field: [] for field in NUMERIC_FIELDS}
+        self.indexed = {}
+
+    def apply_changes(self, changes):
+        """RecipeCatalog listener: [(recipe_id, old_recipe, new_recipe)]"""
+        for recipe_id, _, recipe in changes:
+            self.update(recipe_id, recipe)
+
+    def update(self, recipe_id, recipe):
+        """Index a recipe, replacing its previous entry (recipe=None removes it)"""
+        recipe_id = str(recipe_id)
+        with self.lock:
+            old = self.indexed.pop(recipe_id, None)
+            if old is not None:
+                terms, values = old
+                for field, field_terms in terms.items():
+                    for term in field_terms:
+                        self.fields[field].remove(term, recipe_id)
+                for field, value in values.items():
+                    entries = self.numeric[field]
+                    del entries[bisect_left(entries, (value, recipe_id))]
+
+            if recipe is None:
+                return
+
+            terms = recipe_terms(recipe)
+            for field, field_terms in terms.items():
+                for term in field_terms:
+                    self.fields[field].add(term, recipe_id)
+            values = {}
+            for field in NUMERIC_FIELDS:
+                value = recipe.get(field)
+                if isinstance(value, (int, float)):
+                    values[field] = value
+                    insort(self.numeric[field], (value, recipe_id))
+            self.indexed[recipe_id] = (terms, values)
+
+    def match_text(self, query, fields=SEARCH_FIELDS):
+        """Ids where every word of query prefix-matches a word in one of fields, None for no words"""
+        result = None
+        for word in words(query):
+            matches = set()
+            for field in fields:
+                matches |= self.fields[field].prefix(word)
+            result = matches if result is None else result & matches
+            if not result:
+                break
+        return result
+
+    def match_range(self, field, low=None, high=None):
+        """Ids with low <= field <= high"""
+        entries = self.numeric[field]
+        start = 0 if low is None else bisect_left(entries, (low, ''))
+        end = len(entries) if high is None else bisect_right(entries, (high, '\uffff'))
+        return {recipe_id for _, recipe_id in entries[start:end]}
+
+    def sort(self, recipe_ids, field, descending=False):
+        """recipe_ids ordered by an indexed numeric field (missing values as 0), ties kept in order"""
+        with self.lock:
+            return sorted(
+                recipe_ids,
+                key=lambda recipe_id: self.indexed.get(recipe_id, ({}, {}))[1].get(field, 0),
+                reverse=descending
+            )
+
+    def search(self, query='', tags=(), ingredients=(), ranges=None):
+        """
+        Ids of recipes matching every filter given, unordered
+
+        query matches names, tags and ingredients; each of tags and
+        ingredients must match in that field only; ranges maps a numeric
+        field to (low, high), either end None for open.
+        """
+        with self.lock:
+            candidates = [self.match_text(query)]
+            candidates += [self.match_text(tag, ('tag',)) for tag in tags]
+            candidates += [self.match_text(ingredient, ('ingredient',)) for ingredient in ingredients]
+            candidates += [self.match_range(field, low, high) for field, (low, high) in (ranges or {}).items()]
+            candidates = sorted((ids for ids in candidates if ids is not None), key=len)
+            if not candidates:
+                return set(self.indexed)
+
+            result = set(candidates[0])
+            for ids in candidates[1:]:
+                result &= ids
+            return result
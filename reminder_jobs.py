@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Reminder Job Queue
+Durable outbox for Apple Reminders pushes with retry, backoff and progress events
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+
+from job_queue import JobQueueBase
+from plan_store import file_lock
+from timestamps import utc_now
+
+# Retry policy for items remindctl rejects or times out on
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 2
+BACKOFF_MAX_SECONDS = 60
+
+
+class ReminderJobQueue(JobQueueBase):
+    """
+    Queue of reminder push jobs backed by a JSON outbox file
+
+    Every item sits in the outbox until remindctl accepts it or it runs out of
+    attempts, so a restart picks up exactly where the last process stopped.
+    Progress events are kept in memory for streaming to clients.
+    on_result(list_name, title, sent) is called once per item when it is
+    sent or given up on.
+
+    Jobs and their events live in one process, so only one process may own
+    the outbox: start() takes a lock on it (kept until stop()) before
+    loading it, and in any other process start() returns False and
+    enqueue() raises RuntimeError, instead of pushing the same items twice
+    and overwriting each other's file.
+    """
+
+    def __init__(self, outbox_file, push, max_workers=8, on_result=None):
+        super().__init__()
+        self.outbox_file = outbox_file
+        self.push = push
+        self.on_result = on_result
+        self.max_workers = max(1, max_workers)
+        self.thread = None
+        self.stopping = False
+        self.outbox_lock = None
+
+    def load(self):
+        """Load pending jobs from the outbox file"""
+        if not os.path.exists(self.outbox_file):
+            return
+        try:
+            with open(self.outbox_file, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading reminder outbox: {e}")
+            return
+
+        for job in data.get('jobs', []):
+            # Anything in flight when the last process stopped gets retried
+            for item in job['items']:
+                if item['status'] == 'sending':
+                    item['status'] = 'pending'
+            self.add_job(job)
+
+    def save(self):
+        """Write the outbox atomically (caller holds the lock)"""
+        tmp_file = self.outbox_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump({"jobs": list(self.jobs.values())}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.outbox_file)
+
+    def claim_outbox(self):
+        """Lock the outbox for this process and load it, False if another process holds it (caller holds the lock)"""
+        if self.outbox_lock is not None:
+            return True
+        stack = ExitStack()
+        if not stack.enter_context(file_lock(self.outbox_file + '.lock', blocking=False)):
+            stack.close()
+            return False
+        self.outbox_lock = stack
+        self.load()
+        return True
+
+    def start(self):
+        """Start the outbox worker if it isn't already running, False if another process owns the outbox"""
+        with self.cond:
+            if self.thread and self.thread.is_alive():
+                return True
+            if not self.claim_outbox():
+                return False
+            self.stopping = False
+            self.thread = threading.Thread(target=self.run, name='reminder-outbox', daemon=True)
+            self.thread.start()
+            return True
+
+    def require_owner(self):
+        """Start the worker, raising RuntimeError when another process owns the outbox"""
+        if not self.start():
+            raise RuntimeError("Another server process owns the reminders outbox; run a single server process")
+
+    def stop(self, timeout=None):
+        """Stop the worker after its current batch and let another process own the outbox"""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout)
+        with self.cond:
+            if self.outbox_lock is not None:
+                self.outbox_lock.close()
+                self.outbox_lock = None
+                self.jobs.clear()
+                self.events.clear()
+
+    def enqueue(self, list_name, entries, kind='items'):
+        """
+        Queue reminders for a list and return the new job
+
+        entries: [{"title": "🍗 Chicken: 640g", "label": "Chicken"}, ...]
+        Raises RuntimeError when another process owns the outbox.
+        """
+        self.require_owner()
+
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "kind": kind,
+            "listName": list_name,
+            "status": "queued",
+            "createdAt": utc_now(),
+            "finishedAt": None,
+            "items": [{
+                "title": entry['title'],
+                "label": entry.get('label', entry['title']),
+                "status": "pending",
+                "attempts": 0,
+                "nextAttemptAt": now,
+                "message": ""
+            } for entry in entries]
+        }
+
+        with self.cond:
+            self.add_job(job)
+            self.save()
+            self.cond.notify_all()
+
+        return self.snapshot(job['id'])
+
+    def snapshot(self, job_id):
+        """Return a copy of a job with its summary, or None if unknown"""
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+
+            items = job['items']
+            successful = sum(1 for item in items if item['status'] == 'sent')
+            failed = sum(1 for item in items if item['status'] == 'failed')
+
+            return {
+                "id": job['id'],
+                "kind": job['kind'],
+                "listName": job['listName'],
+                "status": job['status'],
+                "createdAt": job['createdAt'],
+                "finishedAt": job['finishedAt'],
+                "summary": {
+                    "total": len(items),
+                    "successful": successful,
+                    "failed": failed,
+                    "pending": len(items) - successful - failed
+                },
+                "results": [{
+                    "item": item['label'],
+                    "title": item['title'],
+                    "status": item['status'],
+                    "success": item['status'] == 'sent',
+                    "attempts": item['attempts'],
+                    "message": item['message']
+                } for item in items]
+            }
+
+    def run(self):
+        """Worker loop: push due items, record outcomes, persist the outbox"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                with self.cond:
+                    if self.stopping:
+                        return
+                    due, wait = self.claim_due_items()
+                    if not due:
+                        self.cond.wait(timeout=wait)
+                        continue
+
+                futures = {
+                    pool.submit(self.push, item['title'], job['listName']): (job, index)
+                    for job, index, item in due
+                }
+                for future in as_completed(futures):
+                    job, index = futures[future]
+                    try:
+                        success, message = future.result()
+                    except Exception as e:
+                        success, message = False, str(e)
+                    with self.cond:
+                        self.record(job, index, success, message)
+
+                with self.cond:
+                    try:
+                        self.save()
+                    except Exception as e:
+                        print(f"Error saving reminder outbox: {e}")
+
+    def claim_due_items(self):
+        """
+        Mark due items as sending (caller holds the lock)
+
+        Returns (items, seconds until the next retry is due or None)
+        """
+        now = time.time()
+        due = []
+        next_due = None
+
+        for job in self.jobs.values():
+            if job['status'] == 'done':
+                continue
+            for index, item in enumerate(job['items']):
+                if item['status'] != 'pending':
+                    continue
+                if item['nextAttemptAt'] > now:
+                    wait = item['nextAttemptAt'] - now
+                    next_due = wait if next_due is None else min(next_due, wait)
+                    continue
+                if len(due) < self.max_workers * 4:
+                    item['status'] = 'sending'
+                    job['status'] = 'running'
+                    due.append((job, index, item))
+
+        return due, next_due
+
+    def record(self, job, index, success, message):
+        """Record one push outcome and schedule a retry if needed (caller holds the lock)"""
+        item = job['items'][index]
+        item['attempts'] += 1
+        item['message'] = message
+
+        if success:
+            item['status'] = 'sent'
+        elif item['attempts'] >= MAX_ATTEMPTS:
+            item['status'] = 'failed'
+        else:
+            delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (item['attempts'] - 1))
+            item['status'] = 'pending'
+            item['nextAttemptAt'] = time.time() + delay
+
+        self.add_event(
+            job,
+            index=index,
+            item=item['label'],
+            title=item['title'],
+            status=item['status'],
+            success=success,
+            attempts=item['attempts'],
+            message=message
+        )
+
+        if self.on_result and item['status'] in ('sent', 'failed'):
+            try:
+                self.on_result(job['listName'], item['title'], item['status'] == 'sent')
+            except Exception as e:
+                print(f"Error recording reminder result: {e}")
+
+        if all(i['status'] in ('sent', 'failed') for i in job['items']):
+            job['status'] = 'done'
+            job['finishedAt'] = utc_now()
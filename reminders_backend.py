@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Apple Reminders Backends
+remindctl CLI backend plus a file-backed fake for Linux hosts and benchmarks
+"""
+
+import json
+import os
+import random
+import re
+import subprocess
+import threading
+import time
+import uuid
+
+
+class RemindctlBackend:
+    """Talks to Apple Reminders through the remindctl CLI"""
+
+    name = 'remindctl'
+
+    def add(self, title, list_name):
+        """Add a reminder, returns (success, message)"""
+        try:
+            result = subprocess.run(
+                ['remindctl', 'add', '--title', title, '--list', list_name],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+
+            if result.returncode == 0:
+                return True, result.stdout.strip()
+            else:
+                return False, result.stderr.strip()
+        except Exception as e:
+            return False, str(e)
+
+    def list(self, list_name):
+        """
+        List the reminders in a list using JSON output
+
+        Returns (reminders, error) where reminders is [{"id": ..., "title": ...}]
+        """
+        try:
+            result = subprocess.run(
+                ['remindctl', 'list', list_name, '--json'],
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+        except Exception as e:
+            return [], str(e)
+
+        if result.returncode != 0:
+            # List might not exist, that's ok
+            if "not found" in result.stderr.lower() or "no reminders" in result.stdout.lower():
+                return [], None
+            return [], result.stderr
+
+        if not result.stdout.strip() or "no reminders" in result.stdout.lower():
+            # Empty list
+            return [], None
+        try:
+            reminders = json.loads(result.stdout)
+        except json.JSONDecodeError as e:
+            # Anything else isn't an empty list; callers would delete or re-add everything
+            return [], f"Unreadable remindctl output: {e}"
+
+        items = []
+        for reminder in reminders or []:
+            if isinstance(reminder, dict) and 'id' in reminder:
+                items.append({"id": reminder['id'], "title": reminder.get('title', '')})
+            elif isinstance(reminder, str):
+                # Try to extract ID from string format
+                parts = reminder.split(None, 1)
+                if parts:
+                    items.append({"id": parts[0], "title": parts[1] if len(parts) > 1 else ''})
+
+        return items, None
+
+    def list_lists(self):
+        """Returns (lists, error) where lists is [{"name": ..., "itemCount": ...}]"""
+        result = subprocess.run(
+            ['remindctl', 'list-lists'],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+
+        if result.returncode != 0:
+            return [], result.stderr
+
+        # Parse output (assuming format: "List Name (X items)")
+        lists = []
+        for line in result.stdout.strip().split('\n'):
+            match = re.match(r'(.+?)\s*\((\d+)\s*item', line)
+            if match:
+                lists.append({
+                    "name": match.group(1).strip(),
+                    "itemCount": int(match.group(2))
+                })
+
+        return lists, None
+
+    def delete(self, reminder_id):
+        """Delete a single reminder by ID, returns True on success"""
+        try:
+            result = subprocess.run(
+                ['remindctl', 'delete', reminder_id, '--force'],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            return result.returncode == 0
+        except Exception:
+            return False
+
+
+class FakeRemindersBackend:
+    """
+    In-process stand-in for Apple Reminders stored in a JSON file
+
+    latency is slept outside the lock on every call, roughly like a remindctl
+    process spawn, so batching and concurrency show up in benchmarks.
+    failure_rate makes that fraction of adds and deletes fail.
+    """
+
+    name = 'fake'
+
+    def __init__(self, path, latency=0.0, failure_rate=0.0):
+        self.path = path
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.lock = threading.Lock()
+        self.lists = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.lists = json.load(f)
+            except Exception as e:
+                print(f"Error loading fake reminders: {e}")
+
+    def _simulate_call(self):
+        if self.latency:
+            time.sleep(self.latency)
+        return random.random() >= self.failure_rate
+
+    def _save(self):
+        tmp_file = self.path + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self.lists, f)
+        os.replace(tmp_file, self.path)
+
+    def add(self, title, list_name):
+        if not self._simulate_call():
+            return False, "Simulated failure"
+        reminder_id = uuid.uuid4().hex[:16]
+        with self.lock:
+            self.lists.setdefault(list_name, []).append({"id": reminder_id, "title": title})
+            self._save()
+        return True, f"Added {reminder_id}"
+
+    def list(self, list_name):
+        self._simulate_call()
+        with self.lock:
+            return [dict(r) for r in self.lists.get(list_name, [])], None
+
+    def list_lists(self):
+        self._simulate_call()
+        with self.lock:
+            return [{"name": name, "itemCount": len(items)} for name, items in self.lists.items()], None
+
+    def delete(self, reminder_id):
+        if not self._simulate_call():
+            return False
+        with self.lock:
+            for name, items in self.lists.items():
+                remaining = [r for r in items if r['id'] != reminder_id]
+                if len(remaining) != len(items):
+                    self.lists[name] = remaining
+                    self._save()
+                    return True
+        return False
+
+
+class CachedListsBackend:
+    """
+    Wraps a backend with a TTL cache of list names and item counts
+
+    The server's own adds, deletes and list reads update the cached counts
+    write-through, so polling list state doesn't spawn remindctl. Deletes of
+    reminders the cache can't place in a list mark the cache stale instead.
+    """
+
+    def __init__(self, backend, ttl=60):
+        self.backend = backend
+        self.name = backend.name
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.counts = None
+        self.loaded_at = 0
+        self.reminder_lists = {}
+
+    def _fresh(self):
+        return self.counts is not None and time.monotonic() - self.loaded_at < self.ttl
+
+    def add(self, title, list_name):
+        success, message = self.backend.add(title, list_name)
+        if success:
+            with self.lock:
+                if self.counts is not None:
+                    self.counts[list_name] = self.counts.get(list_name, 0) + 1
+        return success, message
+
+    def list(self, list_name):
+        reminders, error = self.backend.list(list_name)
+        if not error:
+            with self.lock:
+                for reminder in reminders:
+                    self.reminder_lists[reminder['id']] = list_name
+                # Only lists already known: an unknown name reads as empty, not as a new list
+                if self.counts is not None and list_name in self.counts:
+                    self.counts[list_name] = len(reminders)
+        return reminders, error
+
+    def list_lists(self, refresh=False):
+        """Returns (lists, error), re-reading only when stale or refresh is set"""
+        with self.lock:
+            if not refresh and self._fresh():
+                return [{"name": name, "itemCount": count} for name, count in self.counts.items()], None
+
+        lists, error = self.backend.list_lists()
+        if not error:
+            with self.lock:
+                self.counts = {entry['name']: entry['itemCount'] for entry in lists}
+                self.loaded_at = time.monotonic()
+        return lists, error
+
+    def delete(self, reminder_id):
+        deleted = self.backend.delete(reminder_id)
+        if deleted:
+            with self.lock:
+                list_name = self.reminder_lists.pop(reminder_id, None)
+                if self.counts is not None and list_name in self.counts:
+                    self.counts[list_name] = max(0, self.counts[list_name] - 1)
+                else:
+                    self.counts = None
+        return deleted
+
+    def is_cached(self):
+        """Whether list_lists would currently be served from the cache"""
+        with self.lock:
+            return self._fresh()
+
+
+def create_backend(data_dir):
+    """
+    Build the backend selected by REMINDERS_BACKEND (remindctl or fake)
+
+    The fake reads REMINDERS_FAKE_FILE, REMINDERS_FAKE_LATENCY (seconds) and
+    REMINDERS_FAKE_FAILURE_RATE. Either is wrapped in a list cache that lives
+    for REMINDERS_LISTS_TTL seconds.
+    """
+    backend = os.environ.get('REMINDERS_BACKEND', 'remindctl')
+    if backend == 'fake':
+        inner = FakeRemindersBackend(
+            os.environ.get('REMINDERS_FAKE_FILE', os.path.join(data_dir, 'fake_reminders.json')),
+            latency=float(os.environ.get('REMINDERS_FAKE_LATENCY', 0)),
+            failure_rate=float(os.environ.get('REMINDERS_FAKE_FAILURE_RATE', 0))
+        )
+    elif backend == 'remindctl':
+        inner = RemindctlBackend()
+    else:
+        raise ValueError(f"Unknown REMINDERS_BACKEND: {backend}")
+
+    return CachedListsBackend(inner, ttl=float(os.environ.get('REMINDERS_LISTS_TTL', 60)))
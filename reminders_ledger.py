@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Reminders Push Ledger
+Remembers what has been pushed to each list so repeated pushes skip unchanged items, and diffs a list read back against what it should hold
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+from shopping import unit_info
+
+# "chicken thighs: 640g (2 meals)" -> name and unit
+INGREDIENT_TITLE_RE = re.compile(r'^(.+?):\s*\d+(?:\.\d+)?\s*([^\d\s(]*)')
+
+
+def normalize_title(title):
+    """Lowercase a title and drop its leading emoji and extra whitespace"""
+    title = re.sub(r'^\W+', '', title)
+    return re.sub(r'\s+', ' ', title).strip().lower()
+
+
+def ingredient_key(title):
+    """
+    Ingredient and unit dimension of a generated shopping list title
+
+    "🍗 Chicken Thighs: 640g (2 meals)" -> "chicken thighs mass". The
+    shopping list has a row per dimension ("Garlic: 3pc" and "Garlic: 10g"),
+    so each gets its own key. Returns None for titles that weren't generated
+    from ingredients (e.g. meals and manual grocery items)
+    """
+    match = INGREDIENT_TITLE_RE.match(normalize_title(title))
+    if not match:
+        return None
+    return f"{match.group(1).strip()} {unit_info(match.group(2))[0]}"
+
+
+def ledger_key(title):
+    """
+    What a reminder is about, ignoring its amount
+
+    Ingredients are keyed by ingredient_key; anything else by its whole
+    title, unless the push gives it a key (meals are keyed by slot date).
+    """
+    return ingredient_key(title) or normalize_title(title)
+
+
+def diff_reminders(existing, desired_titles):
+    """
+    Work out the adds and deletes that turn a list into the desired titles
+
+    Reminders are matched on their exact title first, so the shopping
+    list's rows for one ingredient in two dimensions ("Garlic: 3pc" and
+    "Garlic: 10g") each keep their reminder. Any other generated title
+    (ingredient_key) is a changed amount, a duplicate or an ingredient no
+    longer on the plan, and is deleted; other reminders are left alone.
+    Returns (titles_to_add, ids_to_delete, unchanged_count)
+    """
+    desired = list(dict.fromkeys(desired_titles))
+    wanted = set(desired)
+    matched = set()
+    ids_to_delete = []
+    for reminder in existing:
+        title = reminder['title']
+        if title in wanted and title not in matched:
+            matched.add(title)
+            continue
+        if ingredient_key(title) is not None:
+            ids_to_delete.append(reminder['id'])
+
+    titles_to_add = [title for title in desired if title not in matched]
+    return titles_to_add, ids_to_delete, len(matched)
+
+
+def title_hash(title):
+    """Hash of the normalized ingredient and amount"""
+    return hashlib.sha1(normalize_title(title).encode('utf-8')).hexdigest()[:16]
+
+
+class ReminderLedger:
+    """
+    Per-list map of title hash -> pushed reminder, persisted to a JSON file
+
+    Entries are recorded as pending when queued, so a second push that arrives
+    before the first has finished is still skipped. Reminder IDs are filled in
+    from list output when they're needed for a delete.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.lists = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.lists = json.load(f)
+            except Exception as e:
+                print(f"Error loading reminders ledger: {e}")
+
+    def save(self):
+        """Write the ledger atomically (caller holds the lock)"""
+        tmp_file = self.path + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self.lists, f)
+        os.replace(tmp_file, self.path)
+
+    def prepare(self, list_name, titles, keys=None):
+        """
+        Decide which titles actually need pushing and record them as pending
+
+        keys optionally maps a title to what it is about (ledger_key(title)
+        otherwise). An entry is stale when an earlier push recorded it under
+        a key this push has a new title for, and this push no longer has it;
+        titles sharing a key within one push are all kept.
+
+        Returns (titles_to_add, stale_entries, skipped) where stale_entries are
+        earlier versions of changed items that should be deleted
+        """
+        keys = keys or {}
+        with self.lock:
+            entries = self.lists.setdefault(list_name, {})
+            earlier = {}
+            for h, entry in entries.items():
+                earlier.setdefault(entry['key'], []).append(h)
+
+            pushed = set()
+            changed_keys = set()
+            titles_to_add = []
+            skipped = 0
+
+            for title in titles:
+                h = title_hash(title)
+                if h in pushed:
+                    continue
+                pushed.add(h)
+                if h in entries:
+                    skipped += 1
+                    continue
+
+                key = keys.get(title) or ledger_key(title)
+                entries[h] = {"key": key, "title": title, "id": None, "status": "pending"}
+                changed_keys.add(key)
+                titles_to_add.append(title)
+
+            stale_entries = [
+                entries.pop(h)
+                for key in changed_keys
+                for h in earlier.get(key, ())
+                if h not in pushed
+            ]
+
+            self.save()
+            return titles_to_add, stale_entries, skipped
+
+    def record_result(self, list_name, title, sent):
+        """Mark a pushed title as sent, or drop it if it was given up on"""
+        with self.lock:
+            entries = self.lists.get(list_name, {})
+            h = title_hash(title)
+            if h not in entries:
+                return
+            if sent:
+                entries[h]['status'] = 'sent'
+            else:
+                del entries[h]
+            self.save()
+
+    def rebuild(self, list_name, reminders):
+        """Replace a list's entries with reminders read back from the list"""
+        with self.lock:
+            self.lists[list_name] = {
+                title_hash(r['title']): {
+                    "key": ledger_key(r['title']),
+                    "title": r['title'],
+                    "id": r['id'],
+                    "status": "sent"
+                }
+                for r in reminders
+            }
+            self.save()
+
+    def forget(self, list_name):
+        """Invalidate a list, e.g. after it has been cleared"""
+        with self.lock:
+            if self.lists.pop(list_name, None) is not None:
+                self.save()
@@ -24,7 +24,8 @@ PRODUCTS = {
     'bananas': {'name': 'Bananas (per kg)', 'category': 'produce'},
     'chicken-breast': {'name': 'Chicken Breast (per kg)', 'category': 'meat'},
     'pasta': {'name': 'Spaghetti Pasta 500g', 'category': 'pantry'},
-    'yogurt': {'name': 'Greek Yogurt', 'category': 'dairy'}
+    'yogurt': {'name': 'Greek Yogurt', 'category': 'dairy'},
+    'sweet-baby-rays': {'name': "Sweet Baby Ray's BBQ Sauce", 'category': 'pantry'}
 }
 
 # Woolworths product URLs
@@ -36,7 +37,8 @@ WOOLIES_URLS = {
     'bananas': 'https://www.woolworths.com.au/shop/productdetails/133211/bananas',
     'chicken-breast': 'https://www.woolworths.com.au/shop/productdetails/721121/woolworths-chicken-breast-fillet',
     'pasta': 'https://www.woolworths.com.au/shop/productdetails/723538/woolworths-spaghetti-pasta',
-    'yogurt': 'https://www.woolworths.com.au/shop/productdetails/666530/chobani-fit-high-protein-greek-yoghurt'
+    'yogurt': 'https://www.woolworths.com.au/shop/productdetails/666530/chobani-fit-high-protein-greek-yoghurt',
+    'sweet-baby-rays': 'https://www.woolworths.com.au/shop/productdetails/802036/sweet-baby-ray-s-hickory-brown-sugar-bbq-sauce'
 }
 
 # Coles product URLs
@@ -48,7 +50,8 @@ COLES_URLS = {
     'bananas': 'https://www.coles.com.au/product/fresh-bananas-approx-180g-each-317465',
     'chicken-breast': 'https://www.coles.com.au/product/coles-chicken-breast-fillet-approx-500g-220617',
     'pasta': 'https://www.coles.com.au/product/coles-spaghetti-500g-72711',
-    'yogurt': 'https://www.coles.com.au/product/chobani-fit-high-protein-greek-yoghurt-850g-5433123'
+    'yogurt': 'https://www.coles.com.au/product/chobani-fit-high-protein-greek-yoghurt-850g-5433123',
+    'sweet-baby-rays': 'https://www.coles.com.au/product/sweet-baby-rays-hickory-bbq-sauce-425ml-7361470'
 }
 
 # Default/demo prices
@@ -60,7 +63,8 @@ DEFAULT_PRICES = {
     'bananas': {'coles': 3.90, 'woolies': 3.50, 'special_coles': True, 'special_woolies': False},
     'chicken-breast': {'coles': 12.00, 'woolies': 13.50, 'special_coles': True, 'special_woolies': False},
     'pasta': {'coles': 1.40, 'woolies': 1.40, 'special_coles': False, 'special_woolies': True},
-    'yogurt': {'coles': 6.50, 'woolies': 6.50, 'special_coles': False, 'special_woolies': False}
+    'yogurt': {'coles': 6.50, 'woolies': 6.50, 'special_coles': False, 'special_woolies': False},
+    'sweet-baby-rays': {'coles': 6.00, 'woolies': 6.00, 'special_coles': False, 'special_woolies': False}
 }
 
 def load_cache():
@@ -15,6 +15,8 @@ import os
 from datetime import datetime, timedelta
 from functools import lru_cache
 
+from ingredients import TermMatcher
+
 app = Flask(__name__)
 
 # Cache file path
@@ -74,6 +76,11 @@ TRACKED_ITEMS = {
     }
 }
 
+# Product names are matched against every item's search terms at once
+TRACKED_MATCHER = TermMatcher({
+    term: item_id for item_id, item in TRACKED_ITEMS.items() for term in item['search_terms']
+})
+
 def load_cached_prices():
     """Load prices from cache file"""
     if os.path.exists(CACHE_FILE):
@@ -164,44 +171,44 @@ def parse_coles_html(html):
                     
                     name = name_elem.get_text(strip=True).lower()
                     
-                    # Check if this matches any tracked items
-                    for item_id, item_data in TRACKED_ITEMS.items():
-                        if any(term.lower() in name for term in item_data['search_terms']):
-                            # Extract price
-                            price = None
-                            special_price = None
-                            
-                            # Look for price elements
-                            price_selectors = [
-                                '.price',
-                                '[class*="price"]',
-                                '[data-testid*="price"]',
-                                '.special-price',
-                                '.sale-price'
-                            ]
-                            
-                            for ps in price_selectors:
-                                price_elem = item.select_one(ps)
-                                if price_elem:
-                                    price_text = price_elem.get_text(strip=True)
-                                    # Extract numbers
-                                    matches = re.findall(r'\$?(\d+\.?\d*)', price_text)
-                                    if matches:
-                                        price = float(matches[0])
-                                        break
-                            
-                            # Check for special/clearance indicators
-                            is_special = bool(item.select_one('.special-badge, .clearance, .sale-badge, [class*="special"], [class*="sale"]'))
-                            
-                            products[item_id] = {
-                                'name': item_data['name'],
-                                'price': price or 0,
-                                'special': is_special,
-                                'special_price': special_price if is_special else None,
-                                'store': 'coles',
-                                'found_name': name
-                            }
-                            break
+                    # Tracked item with the longest search term in the name
+                    item_id = TRACKED_MATCHER.match(name)
+                    if item_id is not None:
+                        item_data = TRACKED_ITEMS[item_id]
+                        # Extract price
+                        price = None
+                        special_price = None
+                        
+                        # Look for price elements
+                        price_selectors = [
+                            '.price',
+                            '[class*="price"]',
+                            '[data-testid*="price"]',
+                            '.special-price',
+                            '.sale-price'
+                        ]
+                        
+                        for ps in price_selectors:
+                            price_elem = item.select_one(ps)
+                            if price_elem:
+                                price_text = price_elem.get_text(strip=True)
+                                # Extract numbers
+                                matches = re.findall(r'\$?(\d+\.?\d*)', price_text)
+                                if matches:
+                                    price = float(matches[0])
+                                    break
+                        
+                        # Check for special/clearance indicators
+                        is_special = bool(item.select_one('.special-badge, .clearance, .sale-badge, [class*="special"], [class*="sale"]'))
+                        
+                        products[item_id] = {
+                            'name': item_data['name'],
+                            'price': price or 0,
+                            'special': is_special,
+                            'special_price': special_price if is_special else None,
+                            'store': 'coles',
+                            'found_name': name
+                        }
                             
                 except Exception as e:
                     continue
@@ -380,72 +387,64 @@ def parse_woolworths_html(html):
                     
                     name = name_elem.get_text(strip=True).lower()
                     
-                    # Check if this matches any tracked items (more flexible matching)
-                    for item_id, item_data in TRACKED_ITEMS.items():
-                        # Check for any search term in the product name
-                        matched = False
-                        for term in item_data['search_terms']:
-                            if term.lower() in name:
-                                matched = True
-                                break
+                    # Tracked item with the longest search term in the name
+                    item_id = TRACKED_MATCHER.match(name)
+                    
+                    # For coke zero, also accept "coca" or "coke" with "zero" anywhere
+                    if item_id is None and ('coca' in name or 'coke' in name) and 'zero' in name:
+                        item_id = 'coke-zero'
+                    
+                    if item_id is not None:
+                        item_data = TRACKED_ITEMS[item_id]
+                        # Extract price - try more selectors
+                        price = None
+                        special_price = None
+                        is_special = False
                         
-                        # Also check if key words match
-                        if not matched:
-                            # For coke zero, check for both "coca" and "zero"
-                            if item_id == 'coke-zero' and ('coca' in name or 'coke' in name) and 'zero' in name:
-                                matched = True
+                        price_selectors = [
+                            '[data-testid="price"]',
+                            '.price',
+                            '[class*="price"]',
+                            '.primary-price',
+                            '.sale-price',
+                            '.special-price',
+                            '[class*="current-price"]'
+                        ]
                         
-                        if matched:
-                            # Extract price - try more selectors
-                            price = None
-                            special_price = None
-                            is_special = False
-                            
-                            price_selectors = [
-                                '[data-testid="price"]',
-                                '.price',
-                                '[class*="price"]',
-                                '.primary-price',
-                                '.sale-price',
-                                '.special-price',
-                                '[class*="current-price"]'
-                            ]
-                            
-                            for ps in price_selectors:
-                                price_elem = item.select_one(ps)
-                                if price_elem:
-                                    price_text = price_elem.get_text(strip=True)
-                                    print(f"Found price text: {price_text}")  # Debug
-                                    # Extract dollar amount
-                                    matches = re.findall(r'\$?([\d]+\.?\d*)', price_text.replace(',', ''))
-                                    if matches:
-                                        price = float(matches[0])
-                                        break
-                            
-                            # Look for special/clearance pricing
-                            special_elem = item.select_one('.was-price, .original-price, [class*="was"], [class*="original"]')
-                            if special_elem:
-                                is_special = True
-                                special_text = special_elem.get_text(strip=True)
-                                special_matches = re.findall(r'\$?([\d]+\.?\d*)', special_text.replace(',', ''))
-                                if special_matches:
-                                    special_price = price
-                                    price = float(special_matches[0])  # Original/was price
-                            
-                            # Check for special badges
-                            if not is_special:
-                                is_special = bool(item.select_one('.badge--special, .special-badge, .on-special, [class*="special"], [class*="sale"], [class*="clearance"]'))
-                            
-                            products[item_id] = {
-                                'name': item_data['name'],
-                                'price': price or 0,
-                                'special': is_special,
-                                'special_price': special_price,
-                                'store': 'woolworths',
-                                'found_name': name
-                            }
-                            print(f"Matched {item_id}: ${price} (special: {is_special})")
-                            break
+                        for ps in price_selectors:
+                            price_elem = item.select_one(ps)
+                            if price_elem:
+                                price_text = price_elem.get_text(strip=True)
+                                print(f"Found price text: {price_text}")  # Debug
+                                # Extract dollar amount
+                                matches = re.findall(r'\$?([\d]+\.?\d*)', price_text.replace(',', ''))
+                                if matches:
+                                    price = float(matches[0])
+                                    break
+                        
+                        # Look for special/clearance pricing
+                        special_elem = item.select_one('.was-price, .original-price, [class*="was"], [class*="original"]')
+                        if special_elem:
+                            is_special = True
+                            special_text = special_elem.get_text(strip=True)
+                            special_matches = re.findall(r'\$?([\d]+\.?\d*)', special_text.replace(',', ''))
+                            if special_matches:
+                                special_price = price
+                                price = float(special_matches[0])  # Original/was price
+                        
+                        # Check for special badges
+                        if not is_special:
+                            is_special = bool(item.select_one('.badge--special, .special-badge, .on-special, [class*="special"], [class*="sale"], [class*="clearance"]'))
+                        
+                        products[item_id] = {
+                            'name': item_data['name'],
+                            'price': price or 0,
+                            'special': is_special,
+                            'special_price': special_price,
+                            'store': 'woolworths',
+                            'found_name': name
+                        }
+                        print(f"Matched {item_id}: ${price} (special: {is_special})")
                             
                 except Exception as e:
                     print(f"Error parsing item: {e}")
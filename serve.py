@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Meal Planner Server (gevent)
+Serves the API from gevent's WSGI server, so open Server-Sent Event streams are greenlets instead of threads
+"""
+
+# Must run before anything imports threading, socket or subprocess
+from gevent import monkey
+monkey.patch_all()
+
+import os
+
+from gevent.pywsgi import WSGIServer
+
+import server
+
+if __name__ == '__main__':
+    PORT = int(os.environ.get('PORT', 3002))
+    print(f"🍽️ Meal Planner API (gevent) starting on http://localhost:{PORT}")
+    
+    server.archive_old_weeks()
+    server.reminder_jobs.start()
+    
+    # One process: the reminders outbox and plan change feed live in it
+    WSGIServer(('0.0.0.0', PORT), server.app, log=None).serve_forever()
@@ -4,14 +4,34 @@ Meal Planner Backend API
 Handles shopping list generation and Apple Reminders integration
 """
 
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from flask import Flask, Response, request, jsonify, send_from_directory, send_file, stream_with_context
 from flask_cors import CORS
-import subprocess
 import json
 import re
 import os
 import glob
+import time
 import urllib.parse
+import hashlib
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from reminder_jobs import ReminderJobQueue
+from video_jobs import VideoDownloadQueue
+from stream_slots import StreamSlots
+from reminders_backend import create_backend
+from reminders_ledger import ReminderLedger, diff_reminders
+from shopping import build_shopping_list
+from ingredients import describe_ingredients, ingredient_emoji
+from plan_views import PlanViews, parse_week, week_key, weeks_between
+from plan_store import PLAN_FIELDS, UnknownRecipes, VersionConflict, create_store, referenced_recipes, resolve_meal
+from plan_feed import PlanChangeFeed
+from plan_archive import PlanArchive, week_start
+from recipe_catalog import RECIPE_FIELDS, RecipeCatalog
+from recipe_search import NUMERIC_FIELDS, RecipeSearchIndex
+from recipe_costs import RecipeCosts
+from nutrition import GROUPS, nutrition_summary
+from planner import DEFAULT_TARGETS, RecipeFeatures
 
 app = Flask(__name__)
 CORS(app, resources={
@@ -27,139 +47,21 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 VIDEOS_DIR = os.path.join(BASE_DIR, 'videos')
 os.makedirs(VIDEOS_DIR, exist_ok=True)
 
-# Emoji mapping for ingredients
-EMOJI_MAP = {
-    'chicken': '🍗',
-    'beef': '🥩',
-    'steak': '🥩',
-    'pork': '🥓',
-    'turkey': '🦃',
-    'salmon': '🐟',
-    'shrimp': '🦐',
-    'fish': '🐟',
-    'egg': '🥚',
-    'eggs': '🥚',
-    'rice': '🍚',
-    'pasta': '🍝',
-    'noodle': '🍜',
-    'bread': '🍞',
-    'tortilla': '🌯',
-    'wrap': '🌯',
-    'cheese': '🧀',
-    'cheddar': '🧀',
-    'mozzarella': '🧀',
-    'feta': '🧀',
-    'parmesan': '🧀',
-    'milk': '🥛',
-    'yogurt': '🥛',
-    'butter': '🧈',
-    'cream': '🥛',
-    'onion': '🧅',
-    'garlic': '🧄',
-    'tomato': '🍅',
-    'tomatoes': '🍅',
-    'pepper': '🫑',
-    'peppers': '🫑',
-    'capsicum': '🫑',
-    'cucumber': '🥒',
-    'lettuce': '🥬',
-    'spinach': '🥬',
-    'kale': '🥬',
-    'cabbage': '🥬',
-    'broccoli': '🥦',
-    'carrot': '🥕',
-    'carrots': '🥕',
-    'potato': '🥔',
-    'potatoes': '🥔',
-    'sweet potato': '🍠',
-    'corn': '🌽',
-    'avocado': '🥑',
-    'eggplant': '🍆',
-    'mushroom': '🍄',
-    'olive': '🫒',
-    'olives': '🫒',
-    'lemon': '🍋',
-    'lime': '🍋',
-    'apple': '🍎',
-    'banana': '🍌',
-    'orange': '🍊',
-    'berry': '🫐',
-    'berries': '🫐',
-    'grape': '🍇',
-    'watermelon': '🍉',
-    'pineapple': '🍍',
-    'coconut': '🥥',
-    'kiwi': '🥝',
-    'mango': '🥭',
-    'peach': '🍑',
-    'cherry': '🍒',
-    'strawberry': '🍓',
-    'blueberry': '🫐',
-    'oil': '🫒',
-    'olive oil': '🫒',
-    'vinegar': '🍶',
-    'soy sauce': '🍶',
-    'sugar': '🧂',
-    'salt': '🧂',
-    'pepper_spice': '🌶️',
-    'chili': '🌶️',
-    'chilli': '🌶️',
-    'spice': '🌶️',
-    'herb': '🌿',
-    'cilantro': '🌿',
-    'coriander': '🌿',
-    'parsley': '🌿',
-    'basil': '🌿',
-    'rosemary': '🌿',
-    'thyme': '🌿',
-    'oregano': '🌿',
-    'honey': '🍯',
-    'peanut butter': '🥜',
-    'nut': '🥜',
-    'almond': '🥜',
-    'seed': '🌱',
-    'sesame': '🌱',
-    'chocolate': '🍫',
-    'coffee': '☕',
-    'tea': '🍵',
-    'juice': '🧃',
-    'water': '💧',
-    'wine': '🍷',
-    'beer': '🍺',
-    'soda': '🥤',
-    'mayo': '🥄',
-    'mayonnaise': '🥄',
-    'ketchup': '🍅',
-    'mustard': '🌭',
-    'sriracha': '🌶️',
-    'hot sauce': '🌶️',
-    'tahini': '🥣',
-    'quinoa': '🌾',
-    'oats': '🌾',
-    'flour': '🌾',
-    'bean': '🫘',
-    'beans': '🫘',
-    'chickpea': '🫘',
-    'lentil': '🫘',
-    'tofu': '🧊',
-    'edamame': '🫛',
-    'asparagus': '🌱',
-    'ginger': '🫚',
-    'cinnamon': '🧂',
-    'cumin': '🧂',
-    'paprika': '🧂',
-    'seaweed': '🌿',
-}
+# Server-side data storage for shared meal plans and the reminders outbox
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+os.makedirs(DATA_DIR, exist_ok=True)
+REMINDERS_OUTBOX_FILE = os.path.join(DATA_DIR, 'reminders_outbox.json')
+REMINDERS_LEDGER_FILE = os.path.join(DATA_DIR, 'reminders_ledger.json')
+
+# Apple Reminders access (REMINDERS_BACKEND=fake for Linux hosts and benchmarks)
+reminders_backend = create_backend(DATA_DIR)
+
+# Max concurrent remindctl processes for bulk pushes (1 = old serial loop)
+REMINDERS_MAX_WORKERS = int(os.environ.get('REMINDERS_MAX_WORKERS', 8))
 
 def get_emoji(ingredient_name):
     """Find appropriate emoji for ingredient"""
-    name_lower = ingredient_name.lower()
-    
-    for key, emoji in EMOJI_MAP.items():
-        if key in name_lower:
-            return emoji
-    
-    return '🛒'  # Default shopping cart
+    return ingredient_emoji(ingredient_name)
 
 def format_amount(amount, unit):
     """Format amount with unit"""
@@ -170,22 +72,145 @@ def format_amount(amount, unit):
     
     return f"{amount_str}{unit}"
 
+def format_ingredient_title(ing):
+    """Build the reminder title for an aggregated ingredient"""
+    name = ing.get('name', '')
+    meals = ing.get('meals', [])
+    
+    emoji = get_emoji(name)
+    amount_str = format_amount(ing.get('amount', 0), ing.get('unit', 'g'))
+    meal_count = len(meals)
+    
+    # Format: "🍗 Chicken: 640g (2 meals)"
+    title = f"{emoji} {name}: {amount_str}"
+    if meal_count > 1:
+        title += f" ({meal_count} meals)"
+    elif meal_count == 1:
+        title += f" ({meals[0]})"
+    
+    return title
+
+def format_meal_title(meal, servings=1):
+    """Build the reminder title for a planned meal"""
+    emoji = meal.get('emoji', '🍽️')
+    day = meal.get('day', '')
+    meal_type = meal.get('type', '')
+    
+    # Format: "🌯 Mon Dinner: Chicken Fajitas (serves 2)"
+    title = f"{emoji} {day} {meal_type.capitalize()}: {meal.get('name', '')}"
+    if servings > 1:
+        title += f" (serves {servings})"
+    
+    return title
+
+def meal_key(meal):
+    """
+    What a meal reminder is about: its slot, e.g. "2026-10-19 dinner"
+    
+    The page pushes every planned meal across weeks, so "Mon Dinner" alone
+    isn't one slot. None without a date (the ledger then keys the whole title).
+    """
+    if not meal.get('date'):
+        return None
+    return f"{meal['date']} {meal.get('type', '')}".strip().lower()
+
 def add_to_reminders(title, list_name="Shopping List"):
-    """Add item to Apple Reminders using remindctl"""
-    try:
-        result = subprocess.run(
-            ['remindctl', 'add', '--title', title, '--list', list_name],
-            capture_output=True,
-            text=True,
-            timeout=10
+    """Add item to Apple Reminders through the configured backend"""
+    return reminders_backend.add(title, list_name)
+
+def add_many_to_reminders(titles, list_name="Shopping List"):
+    """
+    Add several items to Apple Reminders using a bounded pool of remindctl calls
+
+    Returns a list of (success, message) tuples in the same order as titles
+    """
+    if not titles:
+        return []
+    
+    workers = max(1, min(REMINDERS_MAX_WORKERS, len(titles)))
+    if workers == 1:
+        return [add_to_reminders(title, list_name) for title in titles]
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda title: add_to_reminders(title, list_name), titles))
+
+# What has already been pushed to each list, so repeat pushes skip unchanged items
+reminder_ledger = ReminderLedger(REMINDERS_LEDGER_FILE)
+
+# Durable outbox for the shopping list and meals pushes
+reminder_jobs = ReminderJobQueue(
+    REMINDERS_OUTBOX_FILE, add_to_reminders, REMINDERS_MAX_WORKERS,
+    on_result=reminder_ledger.record_result
+)
+
+@app.before_request
+def resume_reminder_outbox():
+    """
+    Make sure the outbox worker runs in whichever process serves requests
+    
+    Covers runners that never reach __main__ (gunicorn and the like); the
+    reloader's parent serves no requests, so it never starts one. Only one
+    process can own the outbox; in any other, reminder pushes get a 503.
+    """
+    if reminder_jobs.thread is None:
+        reminder_jobs.start()
+
+def queue_reminders(list_name, entries, kind):
+    """
+    Queue reminders, skipping titles the ledger says are already on the list
+    
+    Earlier versions of changed items are deleted first; ones that couldn't
+    be are counted in "replaceFailed", with "error" set when the list
+    couldn't be read to find them.
+    Returns (job or None, response summary); raises RuntimeError before
+    touching the ledger when another process owns the outbox
+    """
+    reminder_jobs.require_owner()
+    labels = {entry['title']: entry['label'] for entry in entries}
+    keys = {entry['title']: entry.get('key') for entry in entries}
+    titles_to_add, stale_entries, skipped = reminder_ledger.prepare(list_name, list(labels), keys)
+    replaced, replace_failed, error = delete_stale_reminders(list_name, stale_entries)
+    
+    job = None
+    summary = {"total": 0, "successful": 0, "failed": 0, "pending": 0}
+    if titles_to_add:
+        job = reminder_jobs.enqueue(
+            list_name,
+            [{"title": title, "label": labels[title]} for title in titles_to_add],
+            kind=kind
         )
-        
-        if result.returncode == 0:
-            return True, result.stdout.strip()
-        else:
-            return False, result.stderr.strip()
-    except Exception as e:
-        return False, str(e)
+        summary = dict(job['summary'])
+    
+    summary["skipped"] = skipped
+    summary["replaced"] = replaced
+    summary["replaceFailed"] = replace_failed
+    if error:
+        summary["error"] = error
+    return job, summary
+
+def delete_stale_reminders(list_name, stale_entries):
+    """
+    Delete ledger entries superseded by a new amount
+    
+    Returns (deleted, failed, error); error is set when the list couldn't
+    be read to find entries without an id, which then count as failed.
+    """
+    if not stale_entries:
+        return 0, 0, None
+    
+    ids = [entry['id'] for entry in stale_entries if entry['id']]
+    
+    # IDs aren't known until the list has been read back once
+    missing_titles = {entry['title'] for entry in stale_entries if not entry['id']}
+    error = None
+    if missing_titles:
+        existing, error = list_reminders(list_name)
+        if error:
+            print(f"Error listing {list_name} to replace changed items: {error}")
+        ids.extend(r['id'] for r in existing if r['title'] in missing_titles)
+    
+    deleted, _ = delete_many_reminders(ids)
+    return deleted, len(stale_entries) - deleted, error
 
 @app.route('/')
 def index():
@@ -226,9 +251,11 @@ def add_shopping_items():
         successful = 0
         failed = 0
         
-        for item in items:
-            success, message = add_to_reminders(item, list_name)
-            
+        started = time.monotonic()
+        outcomes = add_many_to_reminders(items, list_name)
+        elapsed_ms = int((time.monotonic() - started) * 1000)
+        
+        for item, (success, message) in zip(items, outcomes):
             if success:
                 successful += 1
             else:
@@ -245,7 +272,8 @@ def add_shopping_items():
             "summary": {
                 "total": len(items),
                 "successful": successful,
-                "failed": failed
+                "failed": failed,
+                "elapsedMs": elapsed_ms
             },
             "results": results
         })
@@ -260,7 +288,7 @@ def add_shopping_items():
 @app.route('/api/shopping-list', methods=['POST'])
 def generate_shopping_list():
     """
-    Receive aggregated ingredients and add to Apple Reminders
+    Queue aggregated ingredients for Apple Reminders
     
     Expected JSON:
     {
@@ -269,6 +297,11 @@ def generate_shopping_list():
             ...
         ]
     }
+    
+    Returns a job id straight away; progress is available from
+    /api/reminders/jobs/<id> and /api/reminders/jobs/<id>/events.
+    Items already pushed with the same amount are skipped (jobId is null
+    when nothing changed).
     """
     try:
         data = request.json
@@ -281,51 +314,21 @@ def generate_shopping_list():
                 "error": "No ingredients provided"
             }), 400
         
-        results = []
-        successful = 0
-        failed = 0
-        
-        for ing in ingredients:
-            name = ing.get('name', '')
-            amount = ing.get('amount', 0)
-            unit = ing.get('unit', 'g')
-            meals = ing.get('meals', [])
-            
-            emoji = get_emoji(name)
-            amount_str = format_amount(amount, unit)
-            meal_count = len(meals)
-            
-            # Format: "🍗 Chicken: 640g (2 meals)"
-            title = f"{emoji} {name}: {amount_str}"
-            if meal_count > 1:
-                title += f" ({meal_count} meals)"
-            elif meal_count == 1:
-                title += f" ({meals[0]})"
-            
-            success, message = add_to_reminders(title, list_name)
-            
-            if success:
-                successful += 1
-            else:
-                failed += 1
-            
-            results.append({
-                "ingredient": name,
-                "title": title,
-                "success": success,
-                "message": message
-            })
+        entries = [
+            {"title": format_ingredient_title(ing), "label": ing.get('name', '')}
+            for ing in ingredients
+        ]
+        job, summary = queue_reminders(list_name, entries, 'shopping-list')
         
         return jsonify({
             "success": True,
-            "summary": {
-                "total": len(ingredients),
-                "successful": successful,
-                "failed": failed
-            },
-            "results": results
-        })
+            "jobId": job['id'] if job else None,
+            "status": job['status'] if job else "done",
+            "summary": summary
+        }), 202 if job else 200
         
+    except RuntimeError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
     except Exception as e:
         return jsonify({
             "success": False,
@@ -335,16 +338,18 @@ def generate_shopping_list():
 @app.route('/api/meals', methods=['POST'])
 def add_meals_to_reminders():
     """
-    Add meals to the Meals list in Apple Reminders
+    Queue meals for the Meals list in Apple Reminders
     
     Expected JSON:
     {
         "meals": [
-            {"name": "Chicken Fajitas", "emoji": "🌯", "day": "Mon", "type": "dinner"},
+            {"name": "Chicken Fajitas", "emoji": "🌯", "day": "Mon", "type": "dinner", "date": "2026-10-19"},
             ...
         ],
         "servings": 2
     }
+    
+    Returns a job id straight away, like /api/shopping-list
     """
     try:
         data = request.json
@@ -358,77 +363,118 @@ def add_meals_to_reminders():
                 "error": "No meals provided"
             }), 400
         
-        results = []
-        successful = 0
-        failed = 0
-        
-        for meal in meals:
-            name = meal.get('name', '')
-            emoji = meal.get('emoji', '🍽️')
-            day = meal.get('day', '')
-            meal_type = meal.get('type', '')
-            
-            # Format: "🌯 Mon Dinner: Chicken Fajitas (serves 2)"
-            title = f"{emoji} {day} {meal_type.capitalize()}: {name}"
-            if servings > 1:
-                title += f" (serves {servings})"
-            
-            success, message = add_to_reminders(title, list_name)
-            
-            if success:
-                successful += 1
-            else:
-                failed += 1
-            
-            results.append({
-                "meal": name,
-                "title": title,
-                "success": success,
-                "message": message
-            })
+        entries = [
+            {"title": format_meal_title(meal, servings), "label": meal.get('name', ''), "key": meal_key(meal)}
+            for meal in meals
+        ]
+        job, summary = queue_reminders(list_name, entries, 'meals')
         
         return jsonify({
             "success": True,
-            "summary": {
-                "total": len(meals),
-                "successful": successful,
-                "failed": failed
-            },
-            "results": results
-        })
+            "jobId": job['id'] if job else None,
+            "status": job['status'] if job else "done",
+            "summary": summary
+        }), 202 if job else 200
         
+    except RuntimeError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
     except Exception as e:
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
 
+@app.route('/api/reminders/jobs/<job_id>', methods=['GET'])
+def get_reminder_job(job_id):
+    """Poll the progress of a queued reminders job"""
+    job = reminder_jobs.snapshot(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    
+    return jsonify({"success": True, "job": job})
+
+# Open Server-Sent Event streams: a thread each under the built-in server, a greenlet under serve.py
+stream_slots = StreamSlots(int(os.environ.get('STREAM_MAX_CLIENTS', 64)))
+
+def too_many_streams_response():
+    """503 for a stream past STREAM_MAX_CLIENTS; clients (EventSource included) retry later"""
+    return jsonify({"success": False, "error": "Too many open streams"}), 503, {"Retry-After": "30"}
+
+def job_event_stream(queue, job_id, event_name):
+    """
+    Stream one job of a background queue as Server-Sent Events
+    
+    Sends a "snapshot" event first, one `event_name` event per progress
+    event (with its seq as the id) and a final "done" event with the
+    finished job. Reconnecting clients resume via Last-Event-ID.
+    """
+    job = queue.snapshot(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    
+    try:
+        last_seq = int(request.headers.get('Last-Event-ID') or request.args.get('since', 0))
+    except ValueError:
+        last_seq = 0
+    
+    if not stream_slots.acquire():
+        return too_many_streams_response()
+    
+    def generate(seq):
+        if seq == 0:
+            yield f"event: snapshot\ndata: {json.dumps(job)}\n\n"
+        
+        while True:
+            events, finished = queue.wait_for_events(job_id, seq)
+            if events is None:
+                return
+            
+            for event in events:
+                seq = event['seq']
+                yield f"id: {seq}\nevent: {event_name}\ndata: {json.dumps(event)}\n\n"
+            
+            if finished:
+                yield f"event: done\ndata: {json.dumps(queue.snapshot(job_id))}\n\n"
+                return
+            
+            if not events:
+                yield ": keep-alive\n\n"
+    
+    response = Response(
+        stream_with_context(generate(last_seq)),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    response.call_on_close(stream_slots.release)
+    return response
+
+@app.route('/api/reminders/jobs/<job_id>/events', methods=['GET'])
+def stream_reminder_job(job_id):
+    """
+    Stream per-item progress of a reminders job as Server-Sent Events
+    
+    Sends a "snapshot" event first, one "item" event per push attempt and a
+    final "done" event. Reconnecting clients resume via Last-Event-ID.
+    """
+    return job_event_stream(reminder_jobs, job_id, 'item')
+
 @app.route('/api/reminders/lists', methods=['GET'])
 def get_reminder_lists():
-    """Get available reminder lists"""
+    """
+    Get available reminder lists with item counts
+    
+    Served from an in-process cache kept current by the server's own adds and
+    deletes; pass ?refresh=1 to force a re-read from Reminders.
+    """
     try:
-        result = subprocess.run(
-            ['remindctl', 'list-lists'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+        cached = not refresh and reminders_backend.is_cached()
+        lists, error = reminders_backend.list_lists(refresh=refresh)
         
-        if result.returncode == 0:
-            # Parse output (assuming format: "List Name (X items)")
-            lines = result.stdout.strip().split('\n')
-            lists = []
-            for line in lines:
-                match = re.match(r'(.+?)\s*\((\d+)\s*item', line)
-                if match:
-                    lists.append({
-                        "name": match.group(1).strip(),
-                        "itemCount": int(match.group(2))
-                    })
-            
-            return jsonify({"success": True, "lists": lists})
-        else:
-            return jsonify({"success": False, "error": result.stderr}), 500
+        if error:
+            return jsonify({"success": False, "error": error}), 500
+        
+        return jsonify({"success": True, "lists": lists, "cached": cached})
             
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -462,15 +508,13 @@ def clear_reminders_list():
 def clear_all_meal_reminders():
     """Clear both meal plan and shopping list reminders"""
     try:
-        results = []
+        list_names = ['Shopping List', 'Meals']
         
-        # Clear Shopping List
-        shopping_result = clear_reminders_list_internal('Shopping List')
-        results.append({"list": "Shopping List", **shopping_result})
+        # Clear Shopping List and Meals in parallel
+        with ThreadPoolExecutor(max_workers=len(list_names)) as pool:
+            cleared = list(pool.map(clear_reminders_list_internal, list_names))
         
-        # Clear Meal Plan list
-        meal_result = clear_reminders_list_internal("Meals")
-        results.append({"list": "Meals", **meal_result})
+        results = [{"list": name, **result} for name, result in zip(list_names, cleared)]
         
         total_deleted = sum(r.get('deleted', 0) for r in results)
         total_failed = sum(r.get('failed', 0) for r in results)
@@ -487,80 +531,112 @@ def clear_all_meal_reminders():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+def delete_reminder(reminder_id):
+    """Delete a single reminder by ID, returns True on success"""
+    return reminders_backend.delete(reminder_id)
+
+def list_reminders(list_name):
+    """
+    List the reminders in a list
+    
+    Returns (reminders, error) where reminders is [{"id": ..., "title": ...}]
+    """
+    return reminders_backend.list(list_name)
+
+def delete_many_reminders(reminder_ids):
+    """Delete reminders through a bounded pool, returns (deleted, failed)"""
+    if not reminder_ids:
+        return 0, 0
+    
+    workers = max(1, min(REMINDERS_MAX_WORKERS, len(reminder_ids)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(delete_reminder, reminder_ids))
+    
+    deleted_count = sum(1 for ok in outcomes if ok)
+    return deleted_count, len(outcomes) - deleted_count
+
 def clear_reminders_list_internal(list_name):
     """Internal function to clear a reminders list using JSON output"""
     try:
-        # Get all items in the list with JSON output
-        result = subprocess.run(
-            ['remindctl', 'list', list_name, '--json'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if result.returncode != 0:
-            # List might not exist, that's ok
-            if "not found" in result.stderr.lower() or "no reminders" in result.stdout.lower():
-                return {"deleted": 0, "failed": 0}
-            return {"deleted": 0, "failed": 0, "error": result.stderr}
+        # Whatever happens next, the ledger no longer describes this list
+        reminder_ledger.forget(list_name)
         
-        # Parse JSON output to get reminder IDs
-        try:
-            reminders = json.loads(result.stdout)
-        except json.JSONDecodeError:
-            # No reminders or empty list
-            return {"deleted": 0, "failed": 0}
-        
-        if not reminders or len(reminders) == 0:
-            return {"deleted": 0, "failed": 0}
-        
-        # Collect all reminder IDs
-        ids_to_delete = []
-        for reminder in reminders:
-            if isinstance(reminder, dict) and 'id' in reminder:
-                ids_to_delete.append(reminder['id'])
-            elif isinstance(reminder, str):
-                # Try to extract ID from string format
-                parts = reminder.split()
-                if parts:
-                    ids_to_delete.append(parts[0])
-        
-        if not ids_to_delete:
-            return {"deleted": 0, "failed": 0}
+        reminders, error = list_reminders(list_name)
+        if error:
+            return {"deleted": 0, "failed": 0, "error": error}
         
         # Delete all reminders by ID
-        deleted_count = 0
-        failed_count = 0
-        
-        for reminder_id in ids_to_delete:
-            try:
-                delete_result = subprocess.run(
-                    ['remindctl', 'delete', reminder_id, '--force'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                
-                if delete_result.returncode == 0:
-                    deleted_count += 1
-                else:
-                    failed_count += 1
-            except Exception:
-                failed_count += 1
-                continue
+        deleted_count, failed_count = delete_many_reminders([r['id'] for r in reminders])
         
         return {"deleted": deleted_count, "failed": failed_count}
         
     except Exception as e:
         return {"deleted": 0, "failed": 0, "error": str(e)}
 
+@app.route('/api/reminders/sync', methods=['POST'])
+def sync_shopping_list():
+    """
+    Bring a reminders list in line with the aggregated ingredients
+    
+    Expected JSON: same as /api/shopping-list. The list is read once and only
+    new or changed ingredients are added (as a background job) and stale ones
+    deleted. Reminders that aren't generated ingredient titles are left alone.
+    """
+    try:
+        data = request.json
+        ingredients = data.get('ingredients', [])
+        list_name = data.get('listName', 'Shopping List')
+        
+        reminder_jobs.require_owner()
+        existing, error = list_reminders(list_name)
+        if error:
+            return jsonify({"success": False, "error": error}), 500
+        
+        entries = {format_ingredient_title(ing): ing.get('name', '') for ing in ingredients}
+        titles_to_add, ids_to_delete, unchanged = diff_reminders(existing, list(entries))
+        
+        deleted, delete_failed = delete_many_reminders(ids_to_delete)
+        
+        # The list was just read back, so reseed the ledger from it
+        removed = set(ids_to_delete)
+        reminder_ledger.rebuild(list_name, [r for r in existing if r['id'] not in removed])
+        reminder_ledger.prepare(list_name, titles_to_add)
+        
+        job = None
+        if titles_to_add:
+            job = reminder_jobs.enqueue(
+                list_name,
+                [{"title": title, "label": entries[title]} for title in titles_to_add],
+                kind='sync'
+            )
+        
+        return jsonify({
+            "success": True,
+            "jobId": job['id'] if job else None,
+            "summary": {
+                "total": len(entries),
+                "unchanged": unchanged,
+                "added": len(titles_to_add),
+                "deleted": deleted,
+                "deleteFailed": delete_failed
+            }
+        }), 202 if job else 200
+        
+    except RuntimeError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
 
 # Video Download and Serving Endpoints
 
+# Background video downloads (VIDEO_DOWNLOAD_WORKERS at a time), drained on shutdown
+video_downloads = VideoDownloadQueue(VIDEOS_DIR, max_workers=int(os.environ.get('VIDEO_DOWNLOAD_WORKERS', 2)))
+
 @app.route('/api/videos/download', methods=['POST'])
 def download_video():
     """
-    Download a video from TikTok/Instagram/Reels URL
+    Queue a video download from a TikTok/Instagram/Reels URL
     
     Expected JSON:
     {
@@ -568,105 +644,61 @@ def download_video():
         "recipeId": 1,
         "recipeName": "Chicken Fajitas"
     }
+    
+    Returns a job id straight away; progress is available from
+    /api/videos/jobs/<id> and /api/videos/jobs/<id>/events. A URL that is
+    already downloading for the same recipe returns the running job
+    (deduplicated: true).
     """
     try:
-        data = request.json
+        data = request.json or {}
         url = data.get('url')
-        recipe_id = data.get('recipeId')
-        recipe_name = data.get('recipeName', 'recipe')
         
         if not url:
             return jsonify({"success": False, "error": "No URL provided"}), 400
         
-        # Sanitize recipe name for filename
-        safe_name = re.sub(r'[^\w\-_.]', '_', recipe_name.lower())
-        output_template = os.path.join(VIDEOS_DIR, f"{recipe_id}_{safe_name}_%(title).50s.%(ext)s")
-        
-        # Download with yt-dlp - use absolute path and set working directory
-        result = subprocess.run(
-            [
-                'yt-dlp',
-                '--no-playlist',
-                '--format', 'best[height<=720]',  # Max 720p for smaller files
-                '--output', output_template,
-                '--write-thumbnail',  # Save thumbnail too
-                '--convert-thumbnails', 'jpg',
-                '--no-warnings',
-                '--cookies-from-browser', 'chrome',  # Use Chrome cookies for TikTok/Instagram auth
-                url
-            ],
-            capture_output=True,
-            text=True,
-            timeout=120,
-            cwd=VIDEOS_DIR  # Run from videos directory
-        )
-        
-        if result.returncode != 0:
-            return jsonify({
-                "success": False,
-                "error": "Download failed",
-                "details": result.stderr
-            }), 500
-        
-        # Find the downloaded file
-        pattern = os.path.join(VIDEOS_DIR, f"{recipe_id}_{safe_name}_*")
-        downloaded_files = glob.glob(pattern)
-        
-        video_file = None
-        thumbnail_file = None
-        
-        for f in downloaded_files:
-            if f.endswith(('.mp4', '.webm', '.mkv')):
-                video_file = f
-            elif f.endswith('.jpg'):
-                thumbnail_file = f
-        
-        if not video_file:
-            return jsonify({
-                "success": False,
-                "error": "Video file not found after download"
-            }), 500
-        
-        # Generate thumbnail from video if yt-dlp didn't provide one
-        video_filename = os.path.basename(video_file)
-        base_name = os.path.splitext(video_filename)[0]
-        generated_thumbnail = os.path.join(VIDEOS_DIR, f"{base_name}_thumb.jpg")
-        
-        if not thumbnail_file or not os.path.exists(thumbnail_file):
-            try:
-                # Extract frame at 2 seconds using ffmpeg
-                subprocess.run(
-                    [
-                        'ffmpeg',
-                        '-i', video_file,
-                        '-ss', '00:00:02',  # 2 seconds in
-                        '-vframes', '1',     # 1 frame
-                        '-q:v', '2',         # High quality
-                        '-y',                # Overwrite if exists
-                        generated_thumbnail
-                    ],
-                    capture_output=True,
-                    timeout=30
-                )
-                if os.path.exists(generated_thumbnail):
-                    thumbnail_file = generated_thumbnail
-            except Exception as e:
-                print(f"Thumbnail generation failed: {e}")
-        
-        thumbnail_filename = os.path.basename(thumbnail_file) if thumbnail_file else None
+        job, deduplicated = video_downloads.enqueue(url, data.get('recipeId'), data.get('recipeName', 'recipe'))
         
         return jsonify({
             "success": True,
-            "videoPath": f"/videos/{video_filename}",
-            "thumbnailPath": f"/videos/{thumbnail_filename}" if thumbnail_filename else None,
-            "filename": video_filename
-        })
+            "jobId": job['id'],
+            "status": job['status'],
+            "deduplicated": deduplicated
+        }), 202
         
-    except subprocess.TimeoutExpired:
-        return jsonify({"success": False, "error": "Download timed out"}), 500
+    except RuntimeError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/videos/jobs/<job_id>', methods=['GET'])
+def get_video_job(job_id):
+    """Poll the progress of a video download"""
+    job = video_downloads.snapshot(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    
+    return jsonify({"success": True, "job": job})
+
+@app.route('/api/videos/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_video_job(job_id):
+    """Cancel a queued or running video download"""
+    job = video_downloads.cancel(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    
+    return jsonify({"success": True, "job": job})
+
+@app.route('/api/videos/jobs/<job_id>/events', methods=['GET'])
+def stream_video_job(job_id):
+    """
+    Stream the progress of a video download as Server-Sent Events
+    
+    Sends a "snapshot" event first, a "progress" event per status change or
+    whole percent downloaded and a final "done" event with the finished
+    job. Reconnecting clients resume via Last-Event-ID.
+    """
+    return job_event_stream(video_downloads, job_id, 'progress')
 
 @app.route('/api/videos/list', methods=['GET'])
 def list_videos():
@@ -779,9 +811,7 @@ def serve_video(filename):
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-# Server-side data storage for shared meal plans
-DATA_DIR = os.path.join(BASE_DIR, 'data')
-os.makedirs(DATA_DIR, exist_ok=True)
+# Shared meal plan storage: JSON snapshot plus journal, or SQLite (MEAL_PLAN_BACKEND)
 MEAL_PLAN_FILE = os.path.join(DATA_DIR, 'meal_plan.json')
 
 # Default empty meal plan structure
@@ -791,83 +821,734 @@ default_meal_plan = {
     "servingsCount": 1,
     "favoriteRecipes": [],
     "customGroceryItems": [],
-    "lastUpdated": None
+    "recipes": {},
+    "lastUpdated": None,
+    "version": 0,
+    "slotVersions": {},
+    "fieldVersions": {}
 }
 
-def load_meal_plan_data():
-    """Load meal plan data from server storage"""
+meal_plan_store = create_store(DATA_DIR, default_meal_plan)
+
+# Per-week shopping and macro aggregates, kept current by the store
+plan_views = PlanViews()
+meal_plan_store.subscribe(plan_views.apply_changes)
+
+# Recent plan versions for /api/data/mealplan/stream (max open streams from the env)
+plan_changes = PlanChangeFeed(meal_plan_store)
+
+# Weeks older than MEAL_PLAN_LIVE_WEEKS before this one move to gzipped per-week files
+meal_plan_archive = PlanArchive(os.path.join(DATA_DIR, 'archive'))
+MEAL_PLAN_LIVE_WEEKS = int(os.environ.get('MEAL_PLAN_LIVE_WEEKS', 12))
+
+def archive_cutoff():
+    """First day (a Monday) still kept in the live meal plan"""
+    today = date.today()
+    return (today - timedelta(days=today.weekday() + 7 * MEAL_PLAN_LIVE_WEEKS)).isoformat()
+
+def archive_old_weeks(before=None):
+    """
+    Move slots dated before `before` (default: archive_cutoff()) to the archive, returns how many moved
+    
+    `before` is rounded down to its Monday so only whole weeks are
+    archived, which keeps archivedBefore equal to the cutoff used.
+    """
     try:
-        if os.path.exists(MEAL_PLAN_FILE):
-            with open(MEAL_PLAN_FILE, 'r') as f:
-                return json.load(f)
-        return default_meal_plan.copy()
+        if before:
+            day = date.fromisoformat(before)
+            before = (day - timedelta(days=day.weekday())).isoformat()
+        return len(meal_plan_store.archive(meal_plan_archive, before or archive_cutoff()))
     except Exception as e:
-        print(f"Error loading meal plan: {e}")
-        return default_meal_plan.copy()
+        print(f"Error archiving meal plan weeks: {e}")
+        return 0
+
+# Serialized GET /api/data/mealplan body and its ETag, for one store version
+meal_plan_response_cache = {"version": None, "body": None, "etag": None}
+
+def load_meal_plan_data():
+    """Load meal plan data from server storage, with every slot expanded to its full meal"""
+    meal_plan_store.revalidate()
+    return meal_plan_store.resolved()
+
+def meal_plan_response_body():
+    """JSON body and strong ETag for the current meal plan, serialized once per version"""
+    meal_plan_store.revalidate()
+    with meal_plan_store.lock:
+        cache = meal_plan_response_cache
+        if cache['version'] != meal_plan_store.version:
+            data = meal_plan_store.snapshot()
+            data['recipes'] = referenced_recipes(data)
+            # Writers only need the plan version, the per-slot versions stay server-side
+            data.pop('slotVersions', None)
+            data.pop('fieldVersions', None)
+            data['archivedBefore'] = meal_plan_archive.archived_before()
+            body = json.dumps({"success": True, "data": data}, separators=(',', ':')).encode('utf-8')
+            cache.update(version=meal_plan_store.version, body=body, etag=hashlib.sha1(body).hexdigest())
+        return cache['body'], cache['etag']
+
+def meal_plan_range(start, end):
+    """
+    Slot references and their recipes between two YYYY-MM-DD dates
 
-def save_meal_plan_data(data):
-    """Save meal plan data to server storage"""
+    Archived weeks are read from their partitions only when the range
+    covers them; live slots and deletions override what was archived.
+    """
+    meal_plan_store.revalidate()
+    slots, recipes = meal_plan_archive.slots_between(start, end)
+    live = meal_plan_store.slots_between(start, end)
+    for slot_key in meal_plan_store.deleted_between(start, end):
+        slots.pop(slot_key, None)
+    slots.update(live)
+    recipes.update(referenced_recipes({"mealPlan": live, "recipes": meal_plan_store.snapshot()['recipes']}))
+    return slots, referenced_recipes({"mealPlan": slots, "recipes": recipes})
+
+def resolved_meal_plan_range(start, end):
+    """Meals between two YYYY-MM-DD dates, archive included, expanded to full recipes"""
+    slots, recipes = meal_plan_range(start, end)
+    return {slot_key: resolve_meal(slot, recipes) for slot_key, slot in slots.items()}
+
+def save_meal_plan_data(data, expected_version=None):
+    """
+    Save meal plan data to server storage (only what changed is written)
+    
+    Raises VersionConflict when expected_version is given and another
+    writer changed the same slots or fields since then.
+    """
     try:
-        data['lastUpdated'] = subprocess.run(['date', '-u', '+%Y-%m-%dT%H:%M:%SZ'], 
-                                            capture_output=True, text=True).stdout.strip()
-        with open(MEAL_PLAN_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Hold the store lock so the version reported is the one this write created
+        with meal_plan_store.lock:
+            meal_plan_store.update(data, expected_version)
+            data['lastUpdated'] = meal_plan_store.data.get('lastUpdated')
+            data['version'] = meal_plan_store.data.get('version', 0)
         return True
+    except (VersionConflict, UnknownRecipes):
+        raise
     except Exception as e:
         print(f"Error saving meal plan: {e}")
         return False
 
+def conflict_response(conflict):
+    """409 listing the conflicting slots and fields with their current values"""
+    return jsonify({
+        "success": False,
+        "error": "Meal plan changed on another device",
+        "version": conflict.version,
+        "conflicts": conflict.conflicts
+    }), 409
+
+def add_catalog_recipes(meals, recipes):
+    """
+    Fill in the recipes of slot references that neither the plan nor the request stores
+    
+    Missing ids are looked up in the recipe catalog and added to recipes
+    (the request's "recipes" object) in place. Returns the ids the
+    catalog doesn't have either.
+    """
+    with meal_plan_store.lock:
+        known = set(meal_plan_store.data.get('recipes', {}))
+    known.update(str(recipe.get('id')) for recipe in recipes.values() if isinstance(recipe, dict))
+    
+    unknown = set()
+    for meal in meals:
+        if not isinstance(meal, dict) or 'recipeId' not in meal or str(meal['recipeId']) in known:
+            continue
+        recipe = recipe_catalog.get(meal['recipeId'])
+        if recipe is None:
+            unknown.add(str(meal['recipeId']))
+        else:
+            recipes[str(recipe['id'])] = recipe
+            known.add(str(recipe['id']))
+    return sorted(unknown)
+
+def unknown_recipes_response(recipe_ids):
+    """400 naming the recipe ids that slots referenced but no recipe exists for"""
+    return jsonify({
+        "success": False,
+        "error": f"Unknown recipe ids: {', '.join(recipe_ids)}",
+        "unknownRecipeIds": recipe_ids
+    }), 400
+
 @app.route('/api/data/mealplan', methods=['GET'])
 def get_meal_plan():
-    """Get the shared meal plan data"""
+    """
+    Get the shared meal plan data
+    
+    Slots are {"recipeId": id, ...overrides}; data.recipes holds each
+    referenced recipe once, keyed by id. Responses carry a strong ETag and
+    If-None-Match returns 304 with no body while the plan is unchanged.
+    
+    Weeks before data.archivedBefore are left out; with from/to
+    (YYYY-MM-DD) only that range is returned, archived weeks included,
+    as by /api/data/mealplan/range.
+    """
+    if request.args.get('from'):
+        return get_meal_plan_range()
     try:
-        data = load_meal_plan_data()
-        return jsonify({
-            "success": True,
-            "data": data
-        })
+        body, etag = meal_plan_response_body()
+        
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        # Browsers may keep the body but must check back before using it
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/data/mealplan', methods=['POST'])
 def update_meal_plan():
-    """Update the shared meal plan data"""
+    """
+    Update the shared meal plan data
+    
+    Only the fields provided are updated, and only slots that differ from
+    the stored plan are written to the journal. Slots may be references
+    ({"recipeId": id, ...overrides}) or full recipe objects; "recipes" can
+    carry recipes, keyed by id, that the server hasn't seen yet.
+    
+    With "expectedVersion" (the version the client loaded), changes by
+    other devices since then are kept: slots the client never saw aren't
+    deleted, and only slots both sides changed differently return 409.
+    """
     try:
         new_data = request.json
-        current_data = load_meal_plan_data()
-        
-        # Update only the fields provided
-        if 'mealPlan' in new_data:
-            current_data['mealPlan'] = new_data['mealPlan']
-        if 'currentWeekOffset' in new_data:
-            current_data['currentWeekOffset'] = new_data['currentWeekOffset']
-        if 'servingsCount' in new_data:
-            current_data['servingsCount'] = new_data['servingsCount']
-        if 'favoriteRecipes' in new_data:
-            current_data['favoriteRecipes'] = new_data['favoriteRecipes']
-        if 'customGroceryItems' in new_data:
-            current_data['customGroceryItems'] = new_data['customGroceryItems']
-        
-        if save_meal_plan_data(current_data):
+        current_data = {field: new_data[field] for field in PLAN_FIELDS + ('mealPlan', 'recipes') if field in new_data}
+        
+        if isinstance(current_data.get('mealPlan'), dict):
+            current_data['recipes'] = dict(current_data.get('recipes') or {})
+            unknown = add_catalog_recipes(current_data['mealPlan'].values(), current_data['recipes'])
+            if unknown:
+                return unknown_recipes_response(unknown)
+        
+        if save_meal_plan_data(current_data, new_data.get('expectedVersion')):
             return jsonify({
                 "success": True,
                 "message": "Meal plan saved",
-                "lastUpdated": current_data['lastUpdated']
+                "lastUpdated": current_data['lastUpdated'],
+                "version": current_data['version']
             })
         else:
             return jsonify({"success": False, "error": "Failed to save"}), 500
             
+    except VersionConflict as e:
+        return conflict_response(e)
+    except UnknownRecipes as e:
+        return unknown_recipes_response(e.recipe_ids)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/data/mealplan/slots', methods=['POST'])
+def update_meal_plan_slots():
+    """
+    Upsert and delete individual meal plan slots
+    
+    Expects JSON: {
+        "upsert": {"2026-02-16-dinner": {"recipeId": 17}},
+        "delete": ["2026-02-15-lunch"],
+        "recipes": {"17": {...recipe...}},  (optional, recipes not stored yet)
+        "set": {"servingsCount": 2},        (optional, other plan fields)
+        "expectedVersion": 41               (optional, version the client loaded)
+    }
+    Deletes are applied before upserts, so moving a meal is one request.
+    With expectedVersion, the write returns 409 without changing anything
+    if another device changed one of these slots or fields differently.
+    """
+    try:
+        data = request.json or {}
+        upserts = data.get('upsert') or {}
+        deletes = data.get('delete') or []
+        recipes = data.get('recipes') or {}
+        fields = data.get('set') or {}
+        
+        if not all(isinstance(value, dict) for value in (upserts, recipes, fields)) or not isinstance(deletes, list):
+            return jsonify({"success": False, "error": "upsert, recipes and set must be objects and delete a list"}), 400
+        
+        recipes = dict(recipes)
+        unknown = add_catalog_recipes(upserts.values(), recipes)
+        if unknown:
+            return unknown_recipes_response(unknown)
+        
+        ops = [{"op": "recipe", "recipe": recipe} for recipe in recipes.values()
+               if isinstance(recipe, dict) and recipe.get('id') is not None]
+        ops += [{"op": "delete", "slot": slot_key} for slot_key in deletes]
+        ops += [{"op": "upsert", "slot": slot_key, "meal": meal} for slot_key, meal in upserts.items()]
+        ops += [{"op": "set", "field": field, "value": value} for field, value in fields.items() if field in PLAN_FIELDS]
+        with meal_plan_store.lock:
+            changes = meal_plan_store.apply(ops, data.get('expectedVersion'))
+            last_updated = meal_plan_store.data.get('lastUpdated')
+            version = meal_plan_store.data.get('version', 0)
+        
+        return jsonify({
+            "success": True,
+            "changed": len(changes),
+            "lastUpdated": last_updated,
+            "version": version
+        })
+        
+    except VersionConflict as e:
+        return conflict_response(e)
+    except UnknownRecipes as e:
+        return unknown_recipes_response(e.recipe_ids)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/data/mealplan/stream', methods=['GET'])
+def stream_meal_plan():
+    """
+    Stream meal plan changes as Server-Sent Events
+    
+    Each "change" event carries the new plan version as its id, the
+    version it follows ("since"), the changed slots as stored references
+    (null when deleted) with the recipes they use, and any changed
+    top-level fields. Clients resume with Last-Event-ID or ?since=<version>
+    (the version they loaded); a cursor too old for the server's history
+    gets a "reload" event and should fetch GET /api/data/mealplan again.
+    
+    An idle stream blocks on a shared condition and wakes every 15 seconds
+    to pick up writes from other processes and send a keep-alive. Under the
+    built-in server that holds a thread per stream; serve.py runs the app
+    on gevent, where it is a greenlet. Open streams, job progress streams
+    included, are capped by STREAM_MAX_CLIENTS either way.
+    """
+    try:
+        cursor = int(request.headers.get('Last-Event-ID') or request.args.get('since', 0))
+    except ValueError:
+        return jsonify({"success": False, "error": "since must be a plan version"}), 400
+    
+    if not stream_slots.acquire():
+        return too_many_streams_response()
+    
+    def generate(cursor):
+        # Sent straight away so the client sees the stream open before any change
+        yield "retry: 3000\n\n"
+        while True:
+            events = plan_changes.wait_for_events(cursor)
+            if events is None:
+                with meal_plan_store.lock:
+                    cursor = meal_plan_store.data.get('version', 0)
+                yield f"id: {cursor}\nevent: reload\ndata: {json.dumps({'version': cursor})}\n\n"
+                continue
+            
+            for event in events:
+                cursor = event['version']
+                yield f"id: {cursor}\nevent: change\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+            
+            if not events:
+                # Writes by other processes only show up once the store looks
+                meal_plan_store.revalidate()
+                yield ": keep-alive\n\n"
+    
+    response = Response(
+        stream_with_context(generate(cursor)),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    response.call_on_close(stream_slots.release)
+    return response
+
+@app.route('/api/data/mealplan/range', methods=['GET'])
+def get_meal_plan_range():
+    """
+    Get the meal plan slots between two dates
+    
+    Query parameters:
+        from: YYYY-MM-DD (required)
+        to: YYYY-MM-DD, inclusive (defaults to from)
+    
+    Returns slot references plus each referenced recipe once, like
+    GET /api/data/mealplan. Only the archived weeks inside the range are
+    opened.
+    """
+    try:
+        try:
+            start = parse_date_arg('from')
+            end = parse_date_arg('to') or start
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid parameter: {e}"}), 400
+        if start is None:
+            return jsonify({"success": False, "error": "from is required"}), 400
+        
+        slots, recipes = meal_plan_range(start.isoformat(), end.isoformat())
+        
+        return jsonify({
+            "success": True,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "mealPlan": slots,
+            "recipes": recipes
+        })
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/data/mealplan/archive', methods=['POST'])
+def archive_meal_plan():
+    """
+    Move past weeks out of the live meal plan into the week archive
+    
+    Optional JSON: {"before": "YYYY-MM-DD", rounded down to its Monday}
+    (defaults to MEAL_PLAN_LIVE_WEEKS weeks before this one). Also done
+    when the server starts.
+    """
+    try:
+        before = (request.get_json(silent=True) or {}).get('before')
+        if before:
+            try:
+                before = date.fromisoformat(before).isoformat()
+            except ValueError as e:
+                return jsonify({"success": False, "error": f"Invalid parameter: {e}"}), 400
+        
+        archived = archive_old_weeks(before)
+        return jsonify({
+            "success": True,
+            "archived": archived,
+            "archivedBefore": meal_plan_archive.archived_before()
+        })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/data/mealplan/clear', methods=['POST'])
 def clear_meal_plan():
-    """Clear all meal plan data"""
+    """Clear all meal plan data, archived weeks included"""
     try:
-        if save_meal_plan_data(default_meal_plan.copy()):
-            return jsonify({"success": True, "message": "Meal plan cleared"})
-        else:
-            return jsonify({"success": False, "error": "Failed to clear"}), 500
+        meal_plan_store.reset()
+        meal_plan_archive.clear()
+        return jsonify({"success": True, "message": "Meal plan cleared"})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+def parse_date_arg(name):
+    """Parse an optional YYYY-MM-DD query parameter (raises ValueError)"""
+    value = request.args.get(name)
+    return date.fromisoformat(value) if value else None
+
+@app.route('/api/shopping-list/aggregate', methods=['GET'])
+def aggregate_shopping_list():
+    """
+    Build the aggregated shopping list for part of the stored meal plan
+    
+    Query parameters (all optional):
+        from, to: YYYY-MM-DD, inclusive
+        servings: people to cook for (defaults to the saved servingsCount)
+    
+    The ingredients can be passed straight to /api/reminders/sync. Rows
+    with a scraped price carry a "cost", summed in "estimatedCost".
+    """
+    try:
+        try:
+            start = parse_date_arg('from')
+            end = parse_date_arg('to')
+            servings = request.args.get('servings', type=int)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid parameter: {e}"}), 400
+        
+        plan_data = load_meal_plan_data()
+        archived_before = meal_plan_archive.archived_before()
+        if archived_before and (start is None or start.isoformat() < archived_before):
+            plan_data['mealPlan'] = resolved_meal_plan_range((start or date.min).isoformat(), (end or date.max).isoformat())
+        shopping_list = build_shopping_list(plan_data, start, end, servings, ingredient_prices())
+        return jsonify({"success": True, **shopping_list})
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/data/mealplan/weeks', methods=['GET'])
+def get_week_views():
+    """
+    Shopping list and per-day macros for one or more ISO weeks
+    
+    Query parameters (all optional):
+        from, to: "2026-W08" or any YYYY-MM-DD in the week (default: this week)
+        servings: people to cook for (defaults to the saved servingsCount)
+    
+    Served from materialized per-week aggregates, so the cost depends on the
+    weeks requested rather than the whole plan history. Archived weeks are
+    aggregated from their partitions when asked for. Priced rows carry a
+    "cost", summed in "estimatedCost".
+    """
+    try:
+        try:
+            first = parse_week(request.args['from']) if request.args.get('from') else week_key(date.today())
+            last = parse_week(request.args['to']) if request.args.get('to') else first
+            servings = request.args.get('servings', type=int)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid parameter: {e}"}), 400
+        
+        if servings is None:
+            servings = load_meal_plan_data().get('servingsCount', 1) or 1
+        
+        archived_before = meal_plan_archive.archived_before()
+        if archived_before and first < week_key(date.fromisoformat(archived_before)):
+            # Archived weeks aren't materialized; aggregate them from their partitions
+            views = PlanViews()
+            views.rebuild(resolved_meal_plan_range(
+                week_start(first).isoformat(), (week_start(last) + timedelta(days=6)).isoformat()
+            ))
+            return jsonify({"success": True, **views.view(weeks_between(first, last), servings, ingredient_prices())})
+        
+        # Build under the store lock so no change slips in between the read and the rebuild
+        with meal_plan_store.lock:
+            plan_views.ensure_loaded(lambda: load_meal_plan_data().get('mealPlan', {}))
+        
+        return jsonify({"success": True, **plan_views.view(weeks_between(first, last), servings, ingredient_prices())})
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/nutrition', methods=['GET'])
+def get_nutrition():
+    """
+    Macro totals and averages per day, ISO week and month for a date range
+    
+    Query parameters (all optional):
+        from, to: YYYY-MM-DD, inclusive (default: this week; to defaults
+                  to the Sunday of from's week)
+        servings: people to cook for (defaults to the saved servingsCount)
+        group: comma separated day, week and/or month (default: all three)
+    
+    Totals are for `servings` people; daily averages are per person over
+    the days that have meals. Archived weeks are included, so a year-long
+    trend is one call.
+    """
+    try:
+        try:
+            start = parse_date_arg('from') or date.today() - timedelta(days=date.today().weekday())
+            end = parse_date_arg('to') or start + timedelta(days=6 - start.weekday())
+            servings = request.args.get('servings', type=int)
+        except ValueError as e:
+            return jsonify({"success": False, "error": f"Invalid parameter: {e}"}), 400
+        groups = [group for group in request.args.get('group', ','.join(GROUPS)).split(',') if group]
+        if any(group not in GROUPS for group in groups):
+            return jsonify({"success": False, "error": f"group must be among {', '.join(GROUPS)}"}), 400
+        
+        if servings is None:
+            servings = load_meal_plan_data().get('servingsCount', 1) or 1
+        slots, recipes = meal_plan_range(start.isoformat(), end.isoformat())
+        
+        return jsonify({
+            "success": True,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            **nutrition_summary(slots, recipes, servings, groups)
+        })
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# Recipe library, served in pages so the front page only loads what the list shows
+recipe_catalog = RecipeCatalog(os.path.join(DATA_DIR, 'recipes.json'))
+
+# Name, tag, ingredient and macro indexes, updated recipe by recipe as the catalog changes
+recipe_index = RecipeSearchIndex()
+recipe_catalog.subscribe(recipe_index.apply_changes)
+
+# Per-serving recipe costs from the scraped prices and data/ingredient_products.json
+recipe_costs = RecipeCosts(os.path.join(BASE_DIR, 'prices_cache.json'), os.path.join(DATA_DIR, 'ingredient_products.json'))
+recipe_catalog.subscribe(recipe_costs.apply_changes)
+
+def ingredient_prices():
+    """Current {ingredient: (dimension, price per base unit)}, after picking up a new scrape"""
+    recipe_costs.refresh()
+    return recipe_costs.ingredient_prices()
+
+# Largest page /api/recipes returns
+RECIPES_MAX_LIMIT = 500
+
+@app.route('/api/recipes', methods=['GET'])
+def list_recipes():
+    """
+    List recipes, a page at a time
+    
+    Query parameters (all optional):
+        offset: first recipe to return (default 0)
+        limit: recipes per page (default 50, at most 500)
+        fields: comma separated fields to keep, e.g. id,name,calories,tags
+        ids: comma separated recipe ids to return instead of the whole list
+    
+    Responses carry an ETag, so an unchanged page comes back as 304.
+    """
+    try:
+        ids = [recipe_id for recipe_id in request.args.get('ids', '').split(',') if recipe_id] or None
+        return recipe_page_response(ids)
+        
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/recipes/search', methods=['GET'])
+def search_recipes():
+    """
+    Search recipes by text, tags, ingredients and macro ranges
+    
+    Query parameters (all optional, combined with AND):
+        q: words matched as prefixes of recipe names, tags and ingredients
+        tag: prefix-matched against tags only (repeatable)
+        ingredient: prefix-matched against canonical ingredient names (repeatable)
+        minCalories, maxCalories, minProtein, maxProtein: inclusive bounds
+        sort: calories, protein, -calories or -protein (default: catalog order)
+        offset, limit, fields: as for /api/recipes
+    
+    e.g. ?tag=high protein&maxCalories=500&ingredient=chicken
+    """
+    try:
+        ranges = {}
+        for field in NUMERIC_FIELDS:
+            low = request.args.get('min' + field.capitalize(), type=float)
+            high = request.args.get('max' + field.capitalize(), type=float)
+            if low is not None or high is not None:
+                ranges[field] = (low, high)
+        
+        sort = request.args.get('sort', '')
+        if sort and sort.lstrip('-') not in NUMERIC_FIELDS:
+            return jsonify({"success": False, "error": f"sort must be one of {', '.join(NUMERIC_FIELDS)} (- for descending)"}), 400
+        
+        recipe_catalog.load()
+        ids = recipe_index.search(
+            request.args.get('q', ''),
+            request.args.getlist('tag'),
+            request.args.getlist('ingredient'),
+            ranges
+        )
+        ids = recipe_catalog.ordered(ids)
+        if sort:
+            # Sorted on the values the index keeps, not by fetching each recipe
+            ids = recipe_index.sort(ids, sort.lstrip('-'), descending=sort.startswith('-'))
+        
+        return recipe_page_response(ids)
+        
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+def recipe_page_response(ids=None):
+    """
+    One page of recipes (all of them, or just ids) per the offset, limit and fields arguments
+    
+    Raises ValueError for bad arguments. "costs" holds the listed recipes'
+    costs by id (when id is among the fields). The response carries an
+    ETag, so an unchanged page comes back as 304.
+    """
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', 50, type=int)
+    if offset < 0 or not 0 < limit <= RECIPES_MAX_LIMIT:
+        raise ValueError(f"offset must be >= 0 and limit between 1 and {RECIPES_MAX_LIMIT}")
+    
+    fields = [field for field in request.args.get('fields', '').split(',') if field]
+    unknown = [field for field in fields if field not in RECIPE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    
+    recipes, total = recipe_catalog.page(offset, limit, fields, ids)
+    recipe_costs.refresh()
+    response = jsonify({
+        "success": True,
+        "recipes": recipes,
+        "costs": recipe_costs.costs_of(recipe['id'] for recipe in recipes if 'id' in recipe),
+        "total": total,
+        "offset": offset,
+        "limit": limit
+    })
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/api/recipes/<recipe_id>', methods=['GET'])
+def get_recipe(recipe_id):
+    """Get one full recipe, ingredients and directions included, with its cost per serving"""
+    recipe = recipe_catalog.get(recipe_id)
+    if recipe is None:
+        return jsonify({"success": False, "error": "Recipe not found"}), 404
+    
+    recipe_costs.refresh()
+    return jsonify({"success": True, "recipe": recipe, "cost": recipe_costs.cost(recipe_id)})
+
+
+# Most names one /api/ingredients/normalize request may send
+INGREDIENTS_MAX_BATCH = 1000
+
+@app.route('/api/ingredients/normalize', methods=['POST'])
+def normalize_ingredients():
+    """
+    Canonical names, emoji and tracked products for a batch of ingredient names
+    
+    Expects JSON: {"names": ["boneless chicken thighs", "Capsicum", ...]}
+    Returns {"ingredients": [{"name", "canonical", "emoji", "product"}]} in
+    the order sent; product is the tracked product id the ingredient is
+    priced from, or null.
+    """
+    try:
+        names = (request.json or {}).get('names')
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            return jsonify({"success": False, "error": "names must be a list of strings"}), 400
+        if len(names) > INGREDIENTS_MAX_BATCH:
+            return jsonify({"success": False, "error": f"At most {INGREDIENTS_MAX_BATCH} names per request"}), 400
+        
+        recipe_costs.refresh()
+        described = describe_ingredients(names)
+        for ingredient in described:
+            ingredient['product'] = recipe_costs.product_of(ingredient['canonical'])
+        return jsonify({"success": True, "ingredients": described})
+        
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+# Recipe feature vectors for the meal plan generator, rebuilt when the catalog changes
+recipe_features = RecipeFeatures()
+recipe_catalog.subscribe(recipe_features.apply_changes)
+
+# Longest range one generate request can fill
+PLANNER_MAX_DAYS = 31
+
+@app.route('/api/data/mealplan/generate', methods=['POST'])
+def generate_meal_plan():
+    """
+    Suggest recipes for the empty slots of a date range
+    
+    Expects JSON (all optional): {
+        "from": "2026-02-16",          (default: this week's Monday)
+        "days": 7,
+        "targets": {"calories": 2000, "protein": 150},  (per person per day)
+        "noRepeatDays": 3,             (don't plan a recipe again within this many days)
+        "seed": 42,                    (same seed, same plan)
+        "mealPlan": {"2026-02-16-dinner": {...meal...}}  (the client's slots; default: the stored plan)
+    }
+    Returns {"mealPlan": {slot_key: recipe_id}} for the empty slots only.
+    Nothing is saved; the client places the meals and saves them as usual.
+    """
+    try:
+        data = request.json or {}
+        try:
+            start = date.fromisoformat(data['from']) if data.get('from') else date.today() - timedelta(days=date.today().weekday())
+            days = int(data.get('days', 7))
+            no_repeat_days = int(data.get('noRepeatDays', 3))
+            targets = {macro: float(value) for macro, value in (data.get('targets') or {}).items() if macro in DEFAULT_TARGETS}
+            seed = data.get('seed')
+            seed = int(seed) if seed is not None else None
+        except (TypeError, ValueError) as e:
+            return jsonify({"success": False, "error": f"Invalid parameter: {e}"}), 400
+        if not 0 < days <= PLANNER_MAX_DAYS or no_repeat_days < 0 or any(value <= 0 for value in targets.values()):
+            return jsonify({"success": False, "error": f"days must be 1-{PLANNER_MAX_DAYS}, noRepeatDays >= 0 and targets positive"}), 400
+        
+        end = start + timedelta(days=days - 1)
+        filled = data.get('mealPlan')
+        if not isinstance(filled, dict):
+            filled = resolved_meal_plan_range((start - timedelta(days=no_repeat_days)).isoformat(), end.isoformat())
+        
+        recipe_catalog.load()
+        planned = recipe_features.plan(start, days, filled, targets, no_repeat_days, seed)
+        return jsonify({
+            "success": True,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "targets": dict(DEFAULT_TARGETS, **targets),
+            "mealPlan": planned
+        })
+        
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -877,4 +1558,13 @@ if __name__ == '__main__':
     print(f"🍽️ Meal Planner API starting on http://localhost:{PORT}")
     print(f"📹 Video downloads will be saved to: {VIDEOS_DIR}")
     print(f"💾 Shared data will be saved to: {DATA_DIR}")
-    app.run(debug=True, port=PORT)
\ No newline at end of file
+    
+    DEBUG = os.environ.get('FLASK_DEBUG', '1') != '0'
+    
+    # Archive old weeks and resume any reminders left in the outbox, in the
+    # serving process only (with the debug reloader, that is the child)
+    if not DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        archive_old_weeks()
+        reminder_jobs.start()
+    
+    app.run(debug=DEBUG, port=PORT)
\ No newline at end of file
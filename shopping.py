@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Shopping List Aggregation
+Builds an aggregated shopping list from stored meal plan slots with unit conversion
+"""
+
+from datetime import date
+
+import numpy as np
+
+from ingredients import normalize_ingredient_name
+
+# Unit registry: unit -> (dimension, factor to the dimension's base unit)
+UNITS = {
+    'mg': ('mass', 0.001),
+    'g': ('mass', 1),
+    'kg': ('mass', 1000),
+    'ml': ('volume', 1),
+    'l': ('volume', 1000),
+    'tsp': ('volume', 5),
+    'tbsp': ('volume', 15),
+    'cup': ('volume', 250),
+}
+
+# Spoon/cup measures read better than ml for small volumes
+KITCHEN_MEASURES = ('tsp', 'tbsp', 'cup')
+
+def unit_info(unit):
+    """(dimension, factor) for a unit; units not in the registry are their own dimension"""
+    unit = (unit or '').strip().lower()
+    return UNITS.get(unit, (f'count:{unit}', 1))
+
+
+def display_amount(base_amount, dimension, units_seen):
+    """Pick a readable unit for a total in base units, returns (amount, unit)"""
+    if dimension == 'mass':
+        return (base_amount / 1000, 'kg') if base_amount >= 1000 else (base_amount, 'g')
+
+    if dimension == 'volume':
+        if units_seen and units_seen <= set(KITCHEN_MEASURES):
+            for unit in ('cup', 'tbsp'):
+                if base_amount >= UNITS[unit][1]:
+                    return base_amount / UNITS[unit][1], unit
+            return base_amount / UNITS['tsp'][1], 'tsp'
+        return (base_amount / 1000, 'L') if base_amount >= 1000 else (base_amount, 'ml')
+
+    return base_amount, dimension.split(':', 1)[1]
+
+
+def ingredient_cost(unit_prices, name, dimension, base_amount):
+    """Cost of an amount in base units, None when the ingredient has no price in that dimension"""
+    unit_price = unit_prices.get(name)
+    if unit_price is None or unit_price[0] != dimension:
+        return None
+    return base_amount * unit_price[1]
+
+
+def price_rows(ingredients, costs):
+    """Add a "cost" to the priced shopping list rows, returns the estimated total"""
+    total = 0.0
+    for row, cost in zip(ingredients, costs):
+        if cost is not None:
+            row['cost'] = round(cost, 2)
+            total += row['cost']
+    return round(total, 2)
+
+
+def slot_date(slot_key):
+    """Date part of a "YYYY-MM-DD-slot" key, or None if it doesn't parse"""
+    try:
+        return date.fromisoformat(slot_key[:10])
+    except ValueError:
+        return None
+
+
+def planned_meals(meal_plan, start=None, end=None):
+    """Recipes planned between start and end (inclusive dates), in slot order"""
+    meals = []
+    for slot_key in sorted(meal_plan):
+        meal = meal_plan[slot_key]
+        day = slot_date(slot_key)
+        if not isinstance(meal, dict) or not meal.get('ingredients') or day is None:
+            continue
+        if (start and day < start) or (end and day > end):
+            continue
+        meals.append(meal)
+    return meals
+
+
+def aggregate_ingredients(meals, servings=1, unit_prices=None):
+    """
+    Aggregate ingredients across meals into shopping list rows
+
+    Amounts are converted to a base unit per dimension (g, ml, or the unit
+    itself for counts) so tsp and tbsp or g and kg add up correctly. Rows are
+    keyed by normalized name and dimension, and every contribution is summed
+    in one vectorized pass. With unit_prices ({name: (dimension, price per
+    base unit)}) rows that have a price get a "cost".
+    """
+    row_index = {}
+    rows = []
+    contrib_rows = []
+    contrib_amounts = []
+
+    for meal in meals:
+        meal_name = meal.get('name', '')
+        for ing in meal.get('ingredients', []):
+            name = normalize_ingredient_name(ing.get('name', ''))
+            unit = (ing.get('unit') or '').strip().lower()
+            dimension, factor = unit_info(unit)
+
+            key = (name.lower().replace(' ', '_'), dimension)
+            index = row_index.get(key)
+            if index is None:
+                index = row_index[key] = len(rows)
+                rows.append({"name": name, "dimension": dimension, "units": set(), "meals": []})
+
+            row = rows[index]
+            row['units'].add(unit)
+            if meal_name not in row['meals']:
+                row['meals'].append(meal_name)
+
+            # Multiply by servings count only if perServing is true
+            multiplier = servings if ing.get('perServing', True) is not False else 1
+            contrib_rows.append(index)
+            contrib_amounts.append(float(ing.get('amount') or 0) * factor * multiplier)
+
+    totals = np.bincount(
+        np.asarray(contrib_rows, dtype=np.intp),
+        weights=np.asarray(contrib_amounts, dtype=np.float64),
+        minlength=len(rows)
+    )
+
+    # Largest quantities first, compared in base units
+    ingredients = []
+    costs = []
+    for index in np.argsort(-totals, kind='stable').tolist():
+        row = rows[index]
+        amount, unit = display_amount(float(totals[index]), row['dimension'], row['units'])
+        ingredients.append({
+            "name": row['name'],
+            "amount": round(amount, 1),
+            "unit": unit,
+            "meals": row['meals']
+        })
+        if unit_prices is not None:
+            costs.append(ingredient_cost(unit_prices, row['name'], row['dimension'], float(totals[index])))
+
+    if unit_prices is not None:
+        price_rows(ingredients, costs)
+    return ingredients
+
+
+def build_shopping_list(plan_data, start=None, end=None, servings=None, unit_prices=None):
+    """Aggregated shopping list for a date range of a stored meal plan, priced when unit_prices is given"""
+    if servings is None:
+        servings = plan_data.get('servingsCount', 1) or 1
+
+    meals = planned_meals(plan_data.get('mealPlan', {}), start, end)
+    shopping_list = {
+        "mealCount": len(meals),
+        "servings": servings,
+        "ingredients": aggregate_ingredients(meals, servings, unit_prices)
+    }
+    if unit_prices is not None:
+        shopping_list['estimatedCost'] = round(sum(row.get('cost', 0) for row in shopping_list['ingredients']), 2)
+    return shopping_list
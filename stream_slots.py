@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Stream Slots
+Cap on the Server-Sent Event streams open at once, shared by every streaming endpoint
+"""
+
+import threading
+
+
+class StreamSlots:
+    """
+    Counter of open streams, refused past max_clients
+
+    Under the threaded server every open stream holds one thread (under
+    serve.py, a greenlet), so the plan stream and the job progress streams
+    all draw from one pool of slots; a request past the cap gets a 503
+    instead of another thread.
+    """
+
+    def __init__(self, max_clients=64):
+        self.max_clients = max_clients
+        self.clients = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Claim a slot, returns False when max_clients streams are open"""
+        with self.lock:
+            if self.clients >= self.max_clients:
+                return False
+            self.clients += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.clients = max(0, self.clients - 1)
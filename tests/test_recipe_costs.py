@@ -0,0 +1,62 @@
+"""Recipe costs from a scraped price cache and the shipped ingredient -> product mapping"""
+
+import json
+import os
+
+from recipe_costs import RecipeCosts, product_price
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'prices_cache.json')
+MAPPING = os.path.join(REPO_DIR, 'data', 'ingredient_products.json')
+
+RECIPE = {
+    "id": 1,
+    "name": "Chicken & Banana Bowl",
+    "ingredients": [
+        {"name": "chicken breast", "amount": 200, "unit": "g"},
+        {"name": "Banana", "amount": 120, "unit": "g"},
+        {"name": "Eggs", "amount": 100, "unit": "g"},
+        {"name": "Saffron", "amount": 1, "unit": "g", "perServing": False},
+    ]
+}
+
+
+def costs_for(prices_file):
+    costs = RecipeCosts(prices_file, MAPPING)
+    costs.refresh()
+    costs.apply_changes([(RECIPE['id'], None, RECIPE)])
+    return costs.cost(RECIPE['id'])
+
+
+def test_mapping_keys_are_canonical_names():
+    from ingredients import normalize_ingredient_name
+
+    with open(MAPPING) as f:
+        mapping = json.load(f)
+    assert all(normalize_ingredient_name(name) == name for name in mapping)
+    products = [entry['product'] for entry in mapping.values()]
+    assert len(products) == len(set(products))
+
+
+def test_scraped_prices_cost_the_recipe():
+    cost = costs_for(FIXTURE)
+
+    # Chicken breast at the cheaper $12/kg, bananas at $3.50/kg; eggs are
+    # priced per egg, so grams of egg can't be
+    assert cost['perServing'] == round(200 * 12 / 1000 + 120 * 3.5 / 1000, 2)
+    assert cost['pricedIngredients'] == 2
+    assert cost['unpriced'] == ['Eggs', 'Saffron']
+
+
+def test_demo_prices_are_never_used(tmp_path):
+    with open(FIXTURE) as f:
+        cache = json.load(f)
+    for store in ('coles', 'woolworths'):
+        for entry in cache[store].values():
+            entry['demo'] = True
+    prices_file = tmp_path / 'prices_cache.json'
+    prices_file.write_text(json.dumps(cache))
+
+    assert product_price(cache['coles']['eggs']) is None
+    cost = costs_for(str(prices_file))
+    assert cost['perServing'] == 0.0 and cost['pricedIngredients'] == 0
@@ -0,0 +1,79 @@
+"""Reminder outbox: one owner per outbox file, so items are pushed once"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from reminder_jobs import ReminderJobQueue
+
+
+class FakePush:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.titles = []
+
+    def __call__(self, title, list_name):
+        with self.lock:
+            self.titles.append(title)
+        return True, "ok"
+
+
+def wait_done(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if queue.snapshot(job_id)['status'] == 'done':
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_second_queue_on_same_outbox_refuses_jobs(tmp_path):
+    outbox = str(tmp_path / 'outbox.json')
+    first_push, second_push = FakePush(), FakePush()
+    first = ReminderJobQueue(outbox, first_push, max_workers=2)
+    second = ReminderJobQueue(outbox, second_push, max_workers=2)
+    try:
+        assert first.start()
+        assert not second.start()
+        with pytest.raises(RuntimeError):
+            second.enqueue('Shopping List', [{"title": "🥛 Milk: 2l"}])
+
+        job = first.enqueue('Shopping List', [{"title": "🥛 Milk: 2l"}, {"title": "🍞 Bread: 2slice"}])
+        assert wait_done(first, job['id'])
+        assert sorted(first_push.titles) == ["🍞 Bread: 2slice", "🥛 Milk: 2l"]
+        assert second_push.titles == []
+    finally:
+        first.stop(timeout=5)
+        second.stop(timeout=5)
+
+
+def test_outbox_passes_to_the_next_owner_after_stop(tmp_path):
+    outbox = tmp_path / 'outbox.json'
+    # An item in flight when the last process stopped
+    outbox.write_text(json.dumps({"jobs": [{
+        "id": "left-over", "kind": "items", "listName": "Shopping List", "status": "running",
+        "createdAt": None, "finishedAt": None,
+        "items": [{"title": "🧀 Cheese: 200g", "label": "Cheese", "status": "sending",
+                   "attempts": 0, "nextAttemptAt": 0, "message": ""}]
+    }]}))
+
+    # The owner holds the outbox without draining it
+    owner = ReminderJobQueue(str(outbox), FakePush(), max_workers=1)
+    with owner.cond:
+        assert owner.claim_outbox()
+    second_push = FakePush()
+    second = ReminderJobQueue(str(outbox), second_push, max_workers=1)
+    try:
+        assert not second.start()
+        assert second.snapshot('left-over') is None
+    finally:
+        owner.stop()
+
+    try:
+        assert second.start()
+        assert wait_done(second, 'left-over')
+        assert second_push.titles == ["🧀 Cheese: 200g"]
+    finally:
+        second.stop(timeout=5)
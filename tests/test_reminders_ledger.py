@@ -0,0 +1,70 @@
+"""Reminders push ledger: repeat pushes skip, changed items replace their earlier version"""
+
+from reminders_ledger import ReminderLedger, diff_reminders, ledger_key
+
+# Two weeks of meals as the page pushes them, keyed by slot like /api/meals
+MEALS = {
+    "🌯 Mon Dinner: Chicken Fajitas": "2026-10-19 dinner",
+    "🍛 Mon Dinner: Butter Chicken Curry": "2026-10-26 dinner",
+    "🍜 Tue Lunch: Chicken Pad Thai": "2026-10-20 lunch",
+}
+
+
+def test_same_multi_week_push_is_only_skips_the_second_time(tmp_path):
+    ledger = ReminderLedger(str(tmp_path / 'ledger.json'))
+
+    titles_to_add, stale, skipped = ledger.prepare('Meals', list(MEALS), MEALS)
+    assert titles_to_add == list(MEALS)
+    assert stale == [] and skipped == 0
+
+    titles_to_add, stale, skipped = ledger.prepare('Meals', list(MEALS), MEALS)
+    assert titles_to_add == [] and stale == []
+    assert skipped == len(MEALS)
+
+
+def test_changed_meal_replaces_only_its_slot(tmp_path):
+    ledger = ReminderLedger(str(tmp_path / 'ledger.json'))
+    ledger.prepare('Meals', list(MEALS), MEALS)
+
+    meals = dict(MEALS)
+    del meals["🌯 Mon Dinner: Chicken Fajitas"]
+    meals["🥗 Mon Dinner: Greek Salad"] = "2026-10-19 dinner"
+    titles_to_add, stale, skipped = ledger.prepare('Meals', list(meals), meals)
+
+    assert titles_to_add == ["🥗 Mon Dinner: Greek Salad"]
+    assert [entry['title'] for entry in stale] == ["🌯 Mon Dinner: Chicken Fajitas"]
+    assert skipped == 2
+
+
+def test_same_ingredient_in_two_dimensions_keeps_both(tmp_path):
+    ledger = ReminderLedger(str(tmp_path / 'ledger.json'))
+    titles = ["🧄 Garlic: 3pc (2 meals)", "🧄 Garlic: 10g (Pad Thai)"]
+    assert ledger_key(titles[0]) != ledger_key(titles[1])
+
+    ledger.prepare('Shopping List', titles)
+    titles_to_add, stale, skipped = ledger.prepare('Shopping List', titles)
+    assert titles_to_add == [] and stale == [] and skipped == 2
+
+    titles_to_add, stale, skipped = ledger.prepare('Shopping List', ["🧄 Garlic: 4pc (3 meals)", titles[1]])
+    assert titles_to_add == ["🧄 Garlic: 4pc (3 meals)"]
+    assert [entry['title'] for entry in stale] == [titles[0]]
+
+
+def test_sync_keeps_same_name_rows_in_two_dimensions():
+    desired = ["🧄 Garlic: 3pc (2 meals)", "🧄 Garlic: 10g (Pad Thai)", "🍗 Chicken Thighs: 640g (2 meals)"]
+    existing = [{"id": str(i), "title": title} for i, title in enumerate(desired)]
+    existing.append({"id": "manual", "title": "🧻 Paper towels"})
+
+    assert diff_reminders(existing, desired) == ([], [], 3)
+
+
+def test_sync_replaces_changed_and_duplicate_rows():
+    existing = [
+        {"id": "a", "title": "🧄 Garlic: 3pc (2 meals)"},
+        {"id": "b", "title": "🧄 Garlic: 3pc (2 meals)"},
+        {"id": "c", "title": "🧄 Garlic: 10g (Pad Thai)"},
+        {"id": "d", "title": "🥕 Carrots: 200g (Stir Fry)"},
+    ]
+    desired = ["🧄 Garlic: 3pc (2 meals)", "🧄 Garlic: 20g (2 meals)"]
+
+    assert diff_reminders(existing, desired) == (["🧄 Garlic: 20g (2 meals)"], ["b", "c", "d"], 1)
@@ -0,0 +1,101 @@
+"""Video download queue: exit drain and cancellation, against fake yt-dlp/ffmpeg scripts"""
+
+import os
+import stat
+import subprocess
+import sys
+import textwrap
+import time
+
+from video_jobs import EXIT_DRAIN_SECONDS, VideoDownloadQueue
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Logs each start, then sleeps as long as a slow download
+SLOW_YT_DLP = """
+import sys, time
+with open(sys.argv[0] + '.log', 'a') as f:
+    f.write(sys.argv[-1] + '\\n')
+time.sleep(30)
+"""
+
+# Writes the video at once, with no thumbnail, so ffmpeg has to make one
+QUICK_YT_DLP = """
+import sys
+template = sys.argv[sys.argv.index('--output') + 1]
+with open(template.replace('%(title).50s', 'clip').replace('%(ext)s', 'mp4'), 'w') as f:
+    f.write('video')
+"""
+
+SLOW_FFMPEG = """
+import time
+time.sleep(30)
+"""
+
+
+def write_tool(bin_dir, name, source):
+    path = os.path.join(bin_dir, name)
+    with open(path, 'w') as f:
+        f.write(f"#!{sys.executable}\n" + textwrap.dedent(source))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_exit_kills_running_download_and_drops_queued_one(tmp_path):
+    bin_dir = tmp_path / 'bin'
+    videos_dir = tmp_path / 'videos'
+    bin_dir.mkdir()
+    videos_dir.mkdir()
+    yt_dlp = write_tool(str(bin_dir), 'yt-dlp', SLOW_YT_DLP)
+
+    script = textwrap.dedent(f"""
+        import sys, time
+        sys.path.insert(0, {REPO_DIR!r})
+        from video_jobs import VideoDownloadQueue
+        queue = VideoDownloadQueue({str(videos_dir)!r}, max_workers=1)
+        first, _ = queue.enqueue('https://example.com/first', 1, 'first')
+        queue.enqueue('https://example.com/second', 2, 'second')
+        while queue.snapshot(first['id'])['status'] != 'downloading':
+            time.sleep(0.05)
+        time.sleep(0.5)
+    """)
+    env = dict(os.environ, PATH=f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    started = time.monotonic()
+    subprocess.run([sys.executable, '-c', script], env=env, timeout=60, check=True)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < EXIT_DRAIN_SECONDS + 10
+    with open(yt_dlp + '.log') as f:
+        assert f.read().split() == ['https://example.com/first']
+
+
+def test_cancel_while_processing_ends_cancelled(tmp_path, monkeypatch):
+    bin_dir = tmp_path / 'bin'
+    videos_dir = tmp_path / 'videos'
+    bin_dir.mkdir()
+    videos_dir.mkdir()
+    write_tool(str(bin_dir), 'yt-dlp', QUICK_YT_DLP)
+    write_tool(str(bin_dir), 'ffmpeg', SLOW_FFMPEG)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    queue = VideoDownloadQueue(str(videos_dir), max_workers=1)
+    try:
+        job, _ = queue.enqueue('https://example.com/clip', 7, 'clip')
+        assert wait_for(lambda: queue.snapshot(job['id'])['status'] == 'processing')
+        queue.cancel(job['id'])
+        assert wait_for(lambda: queue.finished(queue.snapshot(job['id'])))
+
+        assert queue.snapshot(job['id'])['status'] == 'cancelled'
+        assert os.listdir(videos_dir) == []
+    finally:
+        queue.drain(timeout=1)
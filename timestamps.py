@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Timestamps
+The one format used for createdAt, finishedAt and lastUpdated fields
+"""
+
+from datetime import datetime, timezone
+
+
+def utc_now():
+    """Current UTC time as an ISO 8601 string"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Video Download Queue
+Background yt-dlp downloads on a bounded worker pool, with progress, deduplication and cancellation
+"""
+
+import glob
+import os
+import re
+import subprocess
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from job_queue import JobQueueBase
+from timestamps import utc_now
+
+# yt-dlp gets this long per download, ffmpeg this long per thumbnail
+DOWNLOAD_TIMEOUT_SECONDS = 120
+THUMBNAIL_TIMEOUT_SECONDS = 30
+
+# How long interpreter exit waits for running downloads before killing them
+EXIT_DRAIN_SECONDS = 5
+
+RUNNING = ('downloading', 'processing')
+
+# "[download]  42.3% of ~12.34MiB at 1.23MiB/s ETA 00:07" (yt-dlp --newline)
+PROGRESS_RE = re.compile(
+    r'\[download\]\s+([\d.]+)%(?:\s+of\s+~?\s*(\S+))?(?:\s+at\s+(\S+))?(?:\s+ETA\s+(\S+))?'
+)
+
+
+def download_command(url, output_template):
+    """yt-dlp arguments for one recipe video"""
+    return [
+        'yt-dlp',
+        '--no-playlist',
+        '--newline',  # One progress line per update, so it can be read as it arrives
+        '--format', 'best[height<=720]',  # Max 720p for smaller files
+        '--output', output_template,
+        '--write-thumbnail',  # Save thumbnail too
+        '--convert-thumbnails', 'jpg',
+        '--no-warnings',
+        '--cookies-from-browser', 'chrome',  # Use Chrome cookies for TikTok/Instagram auth
+        url
+    ]
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class VideoDownloadQueue(JobQueueBase):
+    """
+    Video downloads run in the background, one job per URL and recipe
+
+    Jobs run on a pool of max_workers threads, so imports no longer hold a
+    request thread for the length of a download. A request for a URL and
+    recipe that already have a queued or running job gets that job back
+    instead of a second download; the same URL for another recipe is a
+    separate job, since the file is named after the recipe. yt-dlp progress lines are parsed as they arrive into
+    the job and its event list, for polling or streaming. cancel() kills a
+    running download (or drops a queued one) and removes its partial
+    files; drain() stops taking jobs and lets running ones finish.
+
+    The pool's workers are joined by threading's own shutdown, before any
+    atexit callback runs, so the exit drain is registered as a threading
+    exit hook instead: it runs first and gives running downloads
+    EXIT_DRAIN_SECONDS before killing them.
+    """
+
+    FINISHED = ('done', 'failed', 'cancelled')
+
+    def __init__(self, videos_dir, max_workers=2):
+        super().__init__()
+        self.videos_dir = videos_dir
+        self.max_workers = max(1, max_workers)
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='video-download')
+        self.active = {}
+        self.processes = {}
+        self.cancel_requested = set()
+        self.accepting = True
+        # Runs before the pool's own exit hook joins the workers (hooks run in reverse)
+        threading._register_atexit(self.drain_at_exit)
+
+    def enqueue(self, url, recipe_id, recipe_name='recipe'):
+        """
+        Queue a download, returns (job snapshot, deduplicated)
+
+        Raises RuntimeError once the queue is draining.
+        """
+        url = url.strip()
+        with self.cond:
+            if not self.accepting:
+                raise RuntimeError("Server is shutting down")
+            key = (url, str(recipe_id))
+            job_id = self.active.get(key)
+            if job_id is not None:
+                return dict(self.jobs[job_id]), True
+
+            job = {
+                "id": uuid.uuid4().hex[:12],
+                "url": url,
+                "recipeId": recipe_id,
+                "recipeName": recipe_name,
+                "status": "queued",
+                "progress": 0.0,
+                "size": None,
+                "speed": None,
+                "eta": None,
+                "createdAt": utc_now(),
+                "finishedAt": None,
+                "error": None,
+                "details": None,
+                "videoPath": None,
+                "thumbnailPath": None,
+                "filename": None
+            }
+            self.add_job(job)
+            self.active[key] = job['id']
+            self.pool.submit(self.run, job)
+            return dict(job), False
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job, returns its snapshot (None if unknown)"""
+        with self.cond:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if not self.finished(job):
+                self.cancel_requested.add(job_id)
+                process = self.processes.get(job_id)
+                if process is not None:
+                    process.terminate()
+                elif job['status'] == 'queued':
+                    # Never started; the worker skips it when it comes up
+                    self.finish(job, 'cancelled')
+            return dict(job)
+
+    def drain(self, timeout=DOWNLOAD_TIMEOUT_SECONDS):
+        """
+        Stop taking jobs, cancel queued ones and wait for running ones
+
+        Downloads still running after timeout seconds are cancelled too:
+        their yt-dlp or ffmpeg is killed and partial files removed. Safe to
+        call more than once (e.g. at exit after a manual drain).
+        """
+        with self.cond:
+            self.accepting = False
+            for job in list(self.jobs.values()):
+                if job['status'] == 'queued':
+                    self.finish(job, 'cancelled')
+            self.cond.wait_for(lambda: not any(job['status'] in RUNNING for job in self.jobs.values()), timeout=timeout)
+            for job in self.jobs.values():
+                if job['status'] in RUNNING:
+                    self.cancel_requested.add(job['id'])
+            for process in self.processes.values():
+                process.kill()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def drain_at_exit(self):
+        """drain() at interpreter exit: running downloads get EXIT_DRAIN_SECONDS, not the full download timeout"""
+        self.drain(timeout=EXIT_DRAIN_SECONDS)
+
+    def run(self, job):
+        """Worker: download one job, recording progress and the outcome"""
+        with self.cond:
+            if job['status'] != 'queued':
+                return
+            self.update(job, status='downloading')
+
+        try:
+            result = self.download(job)
+        except JobCancelled:
+            self.remove_partial_files(job)
+            with self.cond:
+                self.finish(job, 'cancelled')
+            return
+        except subprocess.TimeoutExpired:
+            self.remove_partial_files(job)
+            with self.cond:
+                self.finish(job, 'failed', error="Download timed out")
+            return
+        except Exception as e:
+            with self.cond:
+                self.finish(job, 'failed', error=str(e))
+            return
+
+        with self.cond:
+            if 'error' in result:
+                self.finish(job, 'failed', **result)
+            else:
+                self.finish(job, 'done', progress=100.0, **result)
+
+    def download(self, job):
+        """Run yt-dlp (and ffmpeg for a missing thumbnail), returns the job's result fields"""
+        prefix = self.file_prefix(job)
+        output_template = os.path.join(self.videos_dir, f"{prefix}%(title).50s.%(ext)s")
+
+        process = self.start_process(
+            job,
+            download_command(job['url'], output_template),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            cwd=self.videos_dir  # Run from videos directory
+        )
+
+        timed_out = threading.Event()
+
+        def kill_on_timeout():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(DOWNLOAD_TIMEOUT_SECONDS, kill_on_timeout)
+        timer.start()
+        output = deque(maxlen=20)
+        try:
+            for line in process.stdout:
+                line = line.rstrip()
+                match = PROGRESS_RE.search(line)
+                if not match:
+                    output.append(line)
+                    continue
+                percent, size, speed, eta = match.groups()
+                with self.cond:
+                    # One event per whole percent, not every progress line
+                    if int(float(percent)) != int(job['progress']) or float(percent) == 100:
+                        self.update(job, progress=float(percent), size=size, speed=speed, eta=eta)
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+            with self.cond:
+                self.processes.pop(job['id'], None)
+                self.cond.notify_all()
+
+        if job['id'] in self.cancel_requested:
+            raise JobCancelled()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(process.args, DOWNLOAD_TIMEOUT_SECONDS)
+        if returncode != 0:
+            return {"error": "Download failed", "details": '\n'.join(output)}
+
+        # Find the downloaded file
+        video_file = None
+        thumbnail_file = None
+        for f in glob.glob(os.path.join(self.videos_dir, f"{glob.escape(prefix)}*")):
+            if f.endswith(('.mp4', '.webm', '.mkv')):
+                video_file = f
+            elif f.endswith('.jpg'):
+                thumbnail_file = f
+
+        if not video_file:
+            return {"error": "Video file not found after download"}
+
+        # Generate thumbnail from video if yt-dlp didn't provide one
+        video_filename = os.path.basename(video_file)
+        base_name = os.path.splitext(video_filename)[0]
+        generated_thumbnail = os.path.join(self.videos_dir, f"{base_name}_thumb.jpg")
+
+        if not thumbnail_file or not os.path.exists(thumbnail_file):
+            with self.cond:
+                self.update(job, status='processing')
+            try:
+                # Extract frame at 2 seconds using ffmpeg
+                process = self.start_process(
+                    job,
+                    [
+                        'ffmpeg',
+                        '-i', video_file,
+                        '-ss', '00:00:02',  # 2 seconds in
+                        '-vframes', '1',     # 1 frame
+                        '-q:v', '2',         # High quality
+                        '-y',                # Overwrite if exists
+                        generated_thumbnail
+                    ],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+                try:
+                    process.wait(timeout=THUMBNAIL_TIMEOUT_SECONDS)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+                finally:
+                    with self.cond:
+                        self.processes.pop(job['id'], None)
+                        self.cond.notify_all()
+                if process.returncode == 0 and os.path.exists(generated_thumbnail):
+                    thumbnail_file = generated_thumbnail
+            except Exception as e:
+                print(f"Thumbnail generation failed: {e}")
+
+        # A cancel during processing only stops ffmpeg; the download itself is dropped here
+        if job['id'] in self.cancel_requested:
+            self.remove_files([video_file, thumbnail_file])
+            raise JobCancelled()
+
+        thumbnail_filename = os.path.basename(thumbnail_file) if thumbnail_file else None
+        return {
+            "videoPath": f"/videos/{video_filename}",
+            "thumbnailPath": f"/videos/{thumbnail_filename}" if thumbnail_filename else None,
+            "filename": video_filename
+        }
+
+    def start_process(self, job, args, **kwargs):
+        """Popen that cancel() and drain() can stop; terminated at once if the job is already being cancelled"""
+        process = subprocess.Popen(args, **kwargs)
+        with self.cond:
+            self.processes[job['id']] = process
+            if job['id'] in self.cancel_requested:
+                process.terminate()
+        return process
+
+    def file_prefix(self, job):
+        """Start of every file name a job writes: "<recipeId>_<sanitized name>_\""""
+        safe_name = re.sub(r'[^\w\-_.]', '_', str(job['recipeName']).lower())
+        return f"{job['recipeId']}_{safe_name}_"
+
+    def remove_partial_files(self, job):
+        """Delete the .part/.ytdl files a stopped yt-dlp leaves behind"""
+        pattern = os.path.join(self.videos_dir, f"{glob.escape(self.file_prefix(job))}*")
+        for f in glob.glob(pattern):
+            if f.endswith(('.part', '.ytdl')) or '.part-' in f:
+                try:
+                    os.remove(f)
+                except OSError as e:
+                    print(f"Error removing partial download {f}: {e}")
+
+    def remove_files(self, paths):
+        """Delete a cancelled job's finished video and thumbnail"""
+        for f in paths:
+            if f and os.path.exists(f):
+                try:
+                    os.remove(f)
+                except OSError as e:
+                    print(f"Error removing cancelled download {f}: {e}")
+
+    def update(self, job, **fields):
+        """Change job fields and record a progress event (caller holds the lock)"""
+        job.update(fields)
+        self.add_event(job, **{field: job[field] for field in ('status', 'progress', 'size', 'speed', 'eta')})
+
+    def finish(self, job, status, **fields):
+        """Record a job's outcome and free its URL and recipe for new downloads (caller holds the lock)"""
+        job['finishedAt'] = utc_now()
+        self.cancel_requested.discard(job['id'])
+        key = (job['url'], str(job['recipeId']))
+        if self.active.get(key) == job['id']:
+            del self.active[key]
+        self.update(job, status=status, **fields)